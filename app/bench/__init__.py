@@ -0,0 +1,6 @@
+"""Benchmarks reproducibles de la API contra SQLite (`python -m bench run`).
+
+Levanta `main:app` con uvicorn sobre una base `sqlite+aiosqlite` sembrada con
+datos deterministas, ejecuta los escenarios con un generador de carga async y
+escribe el resultado en JSON. Ver la sección "Benchmarks" del README.
+"""
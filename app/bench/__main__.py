@@ -0,0 +1,124 @@
+"""CLI de benchmarks.
+
+    python -m bench run --out bench.json
+    python -m bench run --scenarios browse,ws_menu --workers 2
+    python -m bench compare base.json bench.json
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+from bench.scenarios import HTTP_SCENARIOS, WS_SCENARIOS, run_all
+from bench.server import APP_DIR, BenchServer
+
+ALL_SCENARIOS = list(HTTP_SCENARIOS) + list(WS_SCENARIOS)
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=APP_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> dict:
+    names = [n for n in args.scenarios.split(",") if n]
+    unknown = set(names) - set(ALL_SCENARIOS)
+    if unknown:
+        sys.exit(f"bench: escenarios desconocidos: {sorted(unknown)}")
+
+    seed_args = ["--users", str(args.users), "--items", str(args.items), "--seed", str(args.seed)]
+    with BenchServer(workers=args.workers, seed_args=seed_args) as server:
+        results = asyncio.run(run_all(server.base_url, server.fixtures, names, args))
+
+    return {
+        "meta": {
+            "commit": _git("rev-parse", "HEAD"),
+            "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+            "started_at": datetime.datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("command", "out")},
+        },
+        "results": results,
+    }
+
+
+def _metric(result: dict):
+    """(nombre, valor, mayor es mejor) de las cifras que se comparan."""
+    if "rps" in result:
+        yield "rps", result["rps"], True
+        yield "p50_ms", result["latency_ms"]["p50"], False
+        yield "p99_ms", result["latency_ms"]["p99"], False
+    else:
+        yield "delivery_p50_ms", result["delivery_ms"]["p50"], False
+        yield "delivery_p99_ms", result["delivery_ms"]["p99"], False
+        yield "all_sockets_p99_ms", result["all_sockets_ms"]["p99"], False
+
+
+def compare(args):
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    if base["meta"]["params"] != new["meta"]["params"]:
+        print("aviso: las corridas usan parámetros distintos", file=sys.stderr)
+    print(f"{'escenario':<12} {'métrica':<20} {'base':>10} {'nuevo':>10} {'cambio':>8}")
+    for name, result in new["results"].items():
+        if name not in base["results"]:
+            continue
+        before = {m: v for m, v, _ in _metric(base["results"][name])}
+        for metric, value, higher_better in _metric(result):
+            old = before.get(metric)
+            if old in (None, 0) or value is None:
+                change = "-"
+            else:
+                pct = (value - old) / old * 100
+                better = pct > 0 if higher_better else pct < 0
+                change = f"{pct:+.1f}%{'' if abs(pct) < 5 else (' +' if better else ' -')}"
+            print(f"{name:<12} {metric:<20} {old if old is not None else '-':>10} {value if value is not None else '-':>10} {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Benchmarks de la API contra SQLite")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="levanta la API, ejecuta los escenarios y escribe JSON")
+    p.add_argument("--scenarios", default=",".join(ALL_SCENARIOS), help=f"subconjunto de {ALL_SCENARIOS}")
+    p.add_argument("--requests", type=int, default=2000, help="requests medidos por escenario HTTP")
+    p.add_argument("--login-requests", type=int, default=200, help="requests medidos en `login` (bcrypt)")
+    p.add_argument("--warmup", type=int, default=100, help="requests previos no medidos")
+    p.add_argument("--concurrency", type=int, default=32)
+    p.add_argument("--sockets", type=int, default=200, help="WebSockets abiertos en los escenarios ws_*")
+    p.add_argument("--rounds", type=int, default=50, help="eventos difundidos en los escenarios ws_*")
+    p.add_argument("--workers", type=int, default=1, help="workers de uvicorn")
+    p.add_argument("--users", type=int, default=200)
+    p.add_argument("--items", type=int, default=150)
+    p.add_argument("--seed", type=int, default=1, help="semilla de datos y de la carga")
+    p.add_argument("--out", help="archivo de salida (default: stdout)")
+
+    c = sub.add_parser("compare", help="compara dos resultados JSON")
+    c.add_argument("base")
+    c.add_argument("new")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        compare(args)
+        return
+
+    report = json.dumps(run(args), indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
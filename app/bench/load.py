@@ -0,0 +1,162 @@
+import asyncio
+import json
+import math
+import random
+import time
+from collections import Counter
+from typing import Callable, List, Optional, Tuple
+
+import httpx
+import websockets
+
+# (método, path, kwargs de httpx) a partir del RNG del worker
+RequestFactory = Callable[[random.Random], Tuple[str, str, dict]]
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Percentil por rango más cercano (ceil(q·n)) sobre una lista ya ordenada."""
+    if not values:
+        return None
+    # round() antes de ceil: 0.07 * 100 = 7.000000000000001 no debe saltar al rango 8
+    rank = math.ceil(round(q * len(values), 9))
+    return values[min(len(values), max(rank, 1)) - 1]
+
+
+def latency_summary(seconds: List[float]) -> dict:
+    values = sorted(seconds)
+    ms = lambda v: None if v is None else round(v * 1000, 3)
+    return {
+        "mean": ms(sum(values) / len(values)) if values else None,
+        "p50": ms(percentile(values, 0.50)),
+        "p90": ms(percentile(values, 0.90)),
+        "p99": ms(percentile(values, 0.99)),
+        "max": ms(values[-1]) if values else None,
+    }
+
+
+async def run_requests(base_url: str, total: int, concurrency: int, factory: RequestFactory,
+                       rng_seed: int, warmup: int = 0) -> dict:
+    """Lanza `total` requests repartidos entre `concurrency` workers.
+
+    Cada worker tiene su propio RNG (`rng_seed + n`) y una cuota fija, así que
+    el conjunto de requests es el mismo en todas las corridas.
+    """
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    errors = 0
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+
+        async def worker(n: int, quota: int, record: bool):
+            nonlocal errors
+            rng = random.Random(rng_seed + n)
+            for _ in range(quota):
+                method, path, kwargs = factory(rng)
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **kwargs)
+                except httpx.HTTPError:
+                    if record:
+                        errors += 1
+                    continue
+                if record:
+                    latencies.append(time.perf_counter() - start)
+                    statuses[response.status_code] += 1
+                    if response.status_code >= 400:
+                        errors += 1
+
+        def quotas(count):
+            return [count // concurrency + (1 if n < count % concurrency else 0) for n in range(concurrency)]
+
+        if warmup:
+            await asyncio.gather(*(worker(n, q, False) for n, q in enumerate(quotas(warmup))))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n, q, True) for n, q in enumerate(quotas(total))))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "status": {str(code): n for code, n in sorted(statuses.items())},
+        "seconds": round(elapsed, 3),
+        "rps": round(total / elapsed, 1) if elapsed else None,
+        "latency_ms": latency_summary(latencies),
+    }
+
+
+async def run_fanout(base_url: str, ws_path: str, sockets: int, rounds: int,
+                     trigger: Callable[[httpx.AsyncClient, int], "asyncio.Future"],
+                     matches: Callable[[dict], bool], timeout: float = 5.0) -> dict:
+    """Abre `sockets` WebSockets y mide cuánto tarda cada evento en llegar a todos.
+
+    Las rondas son secuenciales: se dispara el cambio por HTTP, se espera a
+    que todos los sockets lo reciban (o `timeout`) y recién entonces se pasa
+    a la siguiente, así que cualquier mensaje que cumpla `matches` pertenece
+    a la ronda en curso. La latencia va desde el envío del request que
+    dispara el evento hasta la recepción en cada socket.
+    """
+    ws_url = base_url.replace("http://", "ws://", 1) + ws_path
+    arrivals: List[Optional[float]] = []
+    done = asyncio.Event()
+    state = {"received": 0}
+
+    async def reader(n: int, ws):
+        async for raw in ws:
+            if not matches(json.loads(raw)):
+                continue
+            if n < len(arrivals) and arrivals[n] is None:
+                arrivals[n] = time.perf_counter()
+                state["received"] += 1
+                if state["received"] == sockets:
+                    done.set()
+
+    connections = []
+    # Conexión por tandas: el handshake de cientos de sockets a la vez satura el accept
+    for offset in range(0, sockets, 50):
+        batch = range(offset, min(sockets, offset + 50))
+        connections += await asyncio.gather(*(
+            websockets.connect(ws_url, max_size=None, open_timeout=30) for _ in batch
+        ))
+    readers = [asyncio.create_task(reader(n, ws)) for n, ws in enumerate(connections)]
+    await asyncio.sleep(0.2)  # mensajes de bienvenida
+
+    deliveries: List[float] = []
+    completions: List[float] = []
+    trigger_latencies: List[float] = []
+    missed = 0
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            for round_no in range(rounds):
+                arrivals[:] = [None] * sockets
+                state["received"] = 0
+                done.clear()
+                start = time.perf_counter()
+                response = await trigger(client, round_no)
+                trigger_latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+                try:
+                    await asyncio.wait_for(done.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                received = [t - start for t in arrivals if t is not None]
+                missed += sockets - len(received)
+                deliveries += received
+                if len(received) == sockets:
+                    completions.append(max(received))
+    finally:
+        arrivals.clear()
+        for task in readers:
+            task.cancel()
+        await asyncio.gather(*(ws.close() for ws in connections), return_exceptions=True)
+
+    return {
+        "sockets": sockets,
+        "rounds": rounds,
+        "delivered": len(deliveries),
+        "missed": missed,
+        "trigger_ms": latency_summary(trigger_latencies),
+        "delivery_ms": latency_summary(deliveries),
+        "all_sockets_ms": latency_summary(completions),
+    }
@@ -0,0 +1,81 @@
+"""Escenarios de carga: cada uno recibe los datos sembrados y devuelve su resultado."""
+from bench.load import run_fanout, run_requests
+
+
+def browse(fixtures: dict):
+    """Navegación del menú: listado completo, ítem suelto y filtro por categoría."""
+    menu_ids, categories = fixtures["menu_ids"], fixtures["categories"]
+
+    def factory(rng):
+        roll = rng.random()
+        if roll < 0.5:
+            return "GET", "/menu/", {}
+        if roll < 0.9:
+            return "GET", f"/menu/{rng.choice(menu_ids)}", {}
+        return "GET", "/menu/", {"params": {"category": rng.choice(categories)}}
+    return factory
+
+
+def login(fixtures: dict):
+    """Tormenta de logins (bcrypt): usuarios sembrados al azar."""
+    dnis, password = fixtures["dnis"], fixtures["password"]
+
+    def factory(rng):
+        return "POST", "/auth/login", {"json": {"dni": rng.choice(dnis), "password": password}}
+    return factory
+
+
+def orders(fixtures: dict):
+    """Pedidos de 1 a 4 líneas en mesas al azar."""
+    menu_ids, tables = fixtures["menu_ids"], fixtures["table_codes"]
+
+    def factory(rng):
+        items = [
+            {"menu_item_id": item_id, "quantity": rng.randint(1, 3), "notes": None}
+            for item_id in rng.sample(menu_ids, rng.randint(1, 4))
+        ]
+        return "POST", "/orders/", {"json": {
+            "table_code": rng.choice(tables), "guest_name": None, "guest_phone": None,
+            "delivery_address": None, "items": items,
+        }}
+    return factory
+
+
+HTTP_SCENARIOS = {"browse": browse, "login": login, "orders": orders}
+
+
+async def ws_menu(base_url: str, fixtures: dict, sockets: int, rounds: int) -> dict:
+    """`PATCH /menu/availability` alternando un ítem -> delta a todos los `/ws/menu`."""
+    item_id = fixtures["menu_ids"][0]
+
+    def trigger(client, round_no):
+        return client.patch("/menu/availability", json={"ids": [item_id], "available": round_no % 2 == 1})
+    return await run_fanout(base_url, "/ws/menu", sockets, rounds, trigger,
+                            lambda m: m.get("type") == "menu_items_updated")
+
+
+async def ws_orders(base_url: str, fixtures: dict, sockets: int, rounds: int) -> dict:
+    """`PATCH /orders/{id}/status` alternando estado -> evento a todos los `/ws/orders`."""
+    order_id = fixtures["order_ids"][0]
+
+    def trigger(client, round_no):
+        status = "in_progress" if round_no % 2 == 0 else "pending"
+        return client.patch(f"/orders/{order_id}/status", json={"status": status})
+    return await run_fanout(base_url, f"/ws/orders?token={fixtures['staff_token']}", sockets, rounds, trigger,
+                            lambda m: m.get("type") == "order_status" and m.get("order_id") == order_id)
+
+
+WS_SCENARIOS = {"ws_menu": ws_menu, "ws_orders": ws_orders}
+
+
+async def run_all(base_url: str, fixtures: dict, names, args) -> dict:
+    results = {}
+    for name in names:
+        if name in HTTP_SCENARIOS:
+            total = args.login_requests if name == "login" else args.requests
+            results[name] = await run_requests(
+                base_url, total, args.concurrency, HTTP_SCENARIOS[name](fixtures), args.seed, args.warmup,
+            )
+        else:
+            results[name] = await WS_SCENARIOS[name](base_url, fixtures, args.sockets, args.rounds)
+    return results
@@ -0,0 +1,89 @@
+"""Migra y siembra una base vacía con datos deterministas (se ejecuta en un proceso aparte).
+
+    DATABASE_URL=sqlite+aiosqlite:///bench.db python -m bench.seed --users 200 --items 150
+
+Imprime en stdout un JSON con lo necesario para generar carga (DNIs, ids de
+menú, códigos de mesa, pedidos y un token de personal).
+"""
+import argparse
+import asyncio
+import json
+import random
+
+CATEGORIES = ["entradas", "principales", "parrilla", "postres", "bebidas"]
+PASSWORD = "benchpass"
+# Stock "infinito" para que el escenario `orders` funcione también con ENFORCE_STOCK=true
+# sin agotar ítems a mitad de la corrida
+STOCK = 10 ** 9
+
+
+async def seed(users: int, items: int, tables: int, orders: int, rng_seed: int) -> dict:
+    from sqlalchemy import insert
+    from core.security import create_access_token, get_password_hash
+    from db.base import engine
+    from models import MenuItem, Order, Table, User
+    from models.order import OrderItem
+
+    rng = random.Random(rng_seed)
+    # Un solo hash para todos: sembrar no debe costar `users` rondas de bcrypt
+    hashed = get_password_hash(PASSWORD)
+
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), [
+            {"id": i, "dni": f"bench{i:05d}", "full_name": f"Bench User {i}", "email": f"bench{i}@example.com",
+             "phone": "000000000", "hashed_password": hashed, "role_id": 1 if i == 1 else 5}
+            for i in range(1, users + 1)
+        ])
+        menu = [
+            {"id": i, "name": f"Plato {i}", "description": None, "price": round(rng.uniform(2, 40), 2),
+             "category": CATEGORIES[i % len(CATEGORIES)], "amount": STOCK, "available": True, "image_url": None}
+            for i in range(1, items + 1)
+        ]
+        await conn.execute(insert(MenuItem), menu)
+        await conn.execute(insert(Table), [
+            {"id": i, "code": f"T{i:03d}", "seats": rng.choice([2, 4, 6]), "location": None, "active": True}
+            for i in range(1, tables + 1)
+        ])
+        await conn.execute(insert(Order), [
+            {"id": i, "table_id": rng.randint(1, tables), "status": "pending", "total": 0.0}
+            for i in range(1, orders + 1)
+        ])
+        await conn.execute(insert(OrderItem), [
+            {"order_id": i, "menu_item_id": rng.randint(1, items), "quantity": 1, "price": 10.0, "notes": None}
+            for i in range(1, orders + 1)
+        ])
+    await engine.dispose()
+
+    return {
+        "password": PASSWORD,
+        "dnis": [f"bench{i:05d}" for i in range(1, users + 1)],
+        "menu_ids": [row["id"] for row in menu],
+        "categories": CATEGORIES,
+        "table_codes": [f"T{i:03d}" for i in range(1, tables + 1)],
+        "order_ids": list(range(1, orders + 1)),
+        # `/ws/orders` exige token: el usuario 1 es admin
+        "staff_token": create_access_token({"user_id": 1, "role": 1}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--items", type=int, default=150)
+    parser.add_argument("--tables", type=int, default=30)
+    parser.add_argument("--orders", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # El esquema sale de las migraciones, igual que en producción (el servidor solo lo verifica)
+    from alembic import command
+    from alembic.config import Config
+    from db.schema import ALEMBIC_INI
+    command.upgrade(Config(ALEMBIC_INI), "head")
+
+    fixtures = asyncio.run(seed(args.users, args.items, args.tables, args.orders, args.seed))
+    print(json.dumps(fixtures))
+
+
+if __name__ == "__main__":
+    main()
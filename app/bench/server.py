@@ -0,0 +1,95 @@
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Variables del entorno que cambiarían el resultado y no deben heredarse
+ISOLATED_ENV = ("REPLICA_DATABASE_URL", "DB_ECHO", "SERVER_TIMING", "PUBSUB_BACKEND", "PUBSUB_SOCKET")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class BenchServer:
+    """uvicorn con `main:app` sobre una SQLite temporal recién sembrada.
+
+    Cada corrida parte de una base nueva con los mismos datos, así que dos
+    corridas con los mismos parámetros son comparables entre commits.
+    """
+
+    def __init__(self, workers: int = 1, seed_args=(), env=None, startup_timeout: float = 30):
+        self.workers = workers
+        self.seed_args = list(seed_args)
+        self.extra_env = dict(env or {})
+        self.startup_timeout = startup_timeout
+        self.workdir = None
+        self.process = None
+        self.fixtures = None
+        self.base_url = None
+
+    def _env(self) -> dict:
+        env = {k: v for k, v in os.environ.items() if k not in ISOLATED_ENV}
+        env.update(
+            DATABASE_URL=f"sqlite+aiosqlite:///{os.path.join(self.workdir, 'bench.db')}",
+            JWT_SECRET="bench-secret",
+            PYTHONPATH=APP_DIR,
+        )
+        if self.workers > 1:
+            env.update(PUBSUB_BACKEND="unix", PUBSUB_SOCKET=os.path.join(self.workdir, "pubsub.sock"))
+        env.update(self.extra_env)
+        return env
+
+    def __enter__(self):
+        self.workdir = tempfile.mkdtemp(prefix="restaurant-bench-")
+        env = self._env()
+        seeded = subprocess.run(
+            [sys.executable, "-m", "bench.seed", *self.seed_args],
+            cwd=APP_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        self.fixtures = json.loads(seeded.stdout.strip().splitlines()[-1])
+
+        port = _free_port()
+        self.base_url = f"http://127.0.0.1:{port}"
+        self.log = open(os.path.join(self.workdir, "server.log"), "w")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+             "--workers", str(self.workers), "--log-level", "warning", "--no-access-log"],
+            cwd=APP_DIR, env=env, stdout=self.log, stderr=subprocess.STDOUT,
+        )
+        self._wait_ready()
+        return self
+
+    def _wait_ready(self):
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline and self.process.poll() is None:
+            try:
+                if httpx.get(self.base_url + "/", timeout=1).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        with open(self.log.name) as log:
+            tail = log.read()[-4000:]
+        self.__exit__(None, None, None)
+        raise RuntimeError(f"bench: el servidor no arrancó\n{tail}")
+
+    def __exit__(self, *exc):
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.terminate()
+                try:
+                    self.process.wait(timeout=15)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+            self.log.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
@@ -0,0 +1,151 @@
+import logging
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from core.metrics import registry
+
+# Buckets para latencias de requests y esperas del pool (segundos)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.99)
+
+http_request_seconds = registry.histogram(
+    "http_request_duration_seconds", "Latencia por ruta", ["method", "route"], LATENCY_BUCKETS
+)
+http_requests_total = registry.counter("http_requests_total", "Requests por ruta y clase de status", ["method", "route", "status"])
+
+
+def _route_quantiles():
+    for labels in http_request_seconds.labelsets():
+        for q in QUANTILES:
+            value = http_request_seconds.quantile(q, *labels)
+            if value is not None:
+                yield labels + (str(q),), round(value, 6)
+
+
+registry.gauge(
+    "http_request_duration_quantile_seconds", "p50/p99 estimados desde el histograma de latencia",
+    ["method", "route", "quantile"], fn=_route_quantiles,
+)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI puro: mide cada request HTTP y la etiqueta con la plantilla de la ruta.
+
+    Se usa la plantilla (`/orders/{order_id}/status`) y no la URL para que el
+    número de series quede acotado; lo que no coincide con ninguna ruta va a `unmatched`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            elapsed = time.perf_counter() - start
+            http_request_seconds.observe(elapsed, scope["method"], route)
+            http_requests_total.inc(1, scope["method"], route, f"{status // 100}xx")
+            startup_profile.first_request(elapsed)
+
+
+# --- pool de conexiones ---
+db_pool_wait_seconds = registry.histogram(
+    "db_pool_wait_seconds", "Espera para obtener una conexión del pool", ["pool"], LATENCY_BUCKETS
+)
+db_pool_timeouts_total = registry.counter("db_pool_timeouts_total", "Checkouts que agotaron DB_POOL_TIMEOUT", ["pool"])
+
+_pools: "weakref.WeakSet[InstrumentedPool]" = weakref.WeakSet()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Pool de SQLAlchemy que mide el tiempo de checkout (espera por conexión libre)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        _pools.add(self)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            db_pool_timeouts_total.inc(1, self.label)
+            raise
+        finally:
+            db_pool_wait_seconds.observe(time.perf_counter() - start, self.label)
+
+    @property
+    def label(self) -> str:
+        return self._orig_logging_name or "primary"
+
+
+def _pool_stats(stat):
+    return lambda: [((pool.label,), stat(pool)) for pool in list(_pools)]
+
+
+registry.gauge("db_pool_size", "DB_POOL_SIZE", ["pool"], fn=_pool_stats(lambda p: p.size()))
+registry.gauge("db_pool_checked_out", "Conexiones en uso", ["pool"], fn=_pool_stats(lambda p: p.checkedout()))
+registry.gauge("db_pool_overflow", "Conexiones por encima de DB_POOL_SIZE (negativo = huecos libres)", ["pool"],
+               fn=_pool_stats(lambda p: p.overflow()))
+
+
+# --- perfil de arranque ---
+startup_logger = logging.getLogger("startup")
+
+
+class StartupProfile:
+    """Duración de cada fase del arranque del worker y del primer request.
+
+    Se loguea al terminar el arranque y al servir el primer request, y queda
+    en `/metrics` como `startup_seconds{phase}`.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self._ready_at: Optional[float] = None
+
+    def record(self, phase: str, seconds: float):
+        self.phases[phase] = round(seconds, 4)
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def ready(self):
+        self._ready_at = time.perf_counter()
+        startup_logger.info("startup: %s", ", ".join(f"{k}={v:.3f}s" for k, v in self.phases.items()))
+
+    def first_request(self, seconds: float):
+        if self._ready_at is None or "first_request" in self.phases:
+            return
+        self.record("ready_to_first_request", time.perf_counter() - seconds - self._ready_at)
+        self.record("first_request", seconds)
+        startup_logger.info("startup: primer request en %.3fs", seconds)
+
+
+startup_profile = StartupProfile()
+registry.gauge(
+    "startup_seconds", "Duración de las fases de arranque del worker", ["phase"],
+    fn=lambda: [((phase,), seconds) for phase, seconds in startup_profile.phases.items()],
+)
@@ -0,0 +1,146 @@
+import base64
+import json
+import os
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, false, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+# Tamaños de página configurables por .env
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "200"))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """Parámetros comunes de paginación: `?limit=<n>&cursor=<token>`.
+
+    Los listados que consultan la DB (`paginate`) siempre paginan, con
+    `DEFAULT_PAGE_SIZE` si no llega `limit`; los clientes que no enviaban
+    `limit` siguen el resto con `X-Next-Cursor`. `paginated` solo lo usan
+    los listados servidos desde el snapshot en memoria, que sin `limit` ni
+    `cursor` devuelven la lista completa.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None),
+    ):
+        self.paginated = limit is not None or cursor is not None
+        self.limit = limit or DEFAULT_PAGE_SIZE
+        self.cursor = cursor
+
+
+# 🔖 --- Cursor opaco (base64 de los valores de la última fila) ---
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError
+        return [
+            datetime.fromisoformat(v) if isinstance(v, str) and _is_datetime(k) else v
+            for k, v in zip(keys, values)
+        ]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _is_datetime(column) -> bool:
+    if isinstance(column, str):
+        return False
+    try:
+        return column.type.python_type is datetime
+    except NotImplementedError:
+        return False
+
+
+def _nullable(key) -> bool:
+    return bool(getattr(key, "nullable", False))
+
+
+def _order_by(keys: Sequence, descending: bool) -> list:
+    """NULL ordena como el menor valor en todos los motores (MySQL no admite `NULLS FIRST`)."""
+    clauses = []
+    for key in keys:
+        if _nullable(key):
+            clauses.append(key.is_(None).asc() if descending else key.is_(None).desc())
+        clauses.append(key.desc() if descending else key.asc())
+    return clauses
+
+
+def _step(key, value, descending: bool):
+    """Filas estrictamente posteriores a `value` en la columna `key` (con NULL como mínimo)."""
+    if value is None:
+        # Después de NULL: en ascendente todo lo no nulo; en descendente no queda nada
+        return key.is_not(None) if not descending else false()
+    if descending:
+        return or_(key < value, key.is_(None)) if _nullable(key) else key < value
+    return key > value
+
+
+def _after(keys: Sequence, values: Sequence, descending: bool):
+    # (k1, k2) > (v1, v2)  ->  k1 > v1 OR (k1 = v1 AND k2 > v2), compatible con índices en MySQL
+    clauses = []
+    for i, key in enumerate(keys):
+        equals = [k.is_(None) if v is None else k == v for k, v in zip(keys[:i], values[:i])]
+        clauses.append(and_(*equals, _step(key, values[i], descending)))
+    return or_(*clauses)
+
+
+# 📄 --- Paginación por keyset ---
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    page: PageParams,
+    response: Response,
+    keys: Sequence,
+    descending: bool = False,
+) -> list:
+    """Ejecuta `stmt` con paginación por keyset sobre `keys` (la última debe ser única, p. ej. `id`).
+
+    Devuelve como mucho `page.limit` filas (`DEFAULT_PAGE_SIZE` por defecto,
+    nunca más de `MAX_PAGE_SIZE`) y, si hay más, deja el cursor de la
+    siguiente página en la cabecera `X-Next-Cursor`.
+    """
+    stmt = stmt.order_by(*_order_by(keys, descending))
+    if page.cursor:
+        stmt = stmt.where(_after(keys, decode_cursor(page.cursor, keys), descending))
+    stmt = stmt.limit(page.limit + 1)
+
+    result = await db.execute(stmt)
+    rows = result.scalars().all()
+
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(last, k.key) for k in keys])
+    return rows
+
+
+def paginate_rows(rows: List[dict], page: PageParams, response: Response, key: str = "id") -> List[dict]:
+    """Misma paginación por keyset, sobre filas ya cargadas en memoria y ordenadas por `key`.
+
+    Sin `limit` ni `cursor` devuelve todas: el snapshot ya está en memoria.
+    """
+    if not page.paginated:
+        return rows
+    if page.cursor:
+        (after,) = decode_cursor(page.cursor, [key])
+        if not isinstance(after, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        rows = [r for r in rows if r[key] > after]
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([rows[-1][key]])
+    return rows
@@ -0,0 +1,51 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class Principal:
+    """Datos mínimos del usuario autenticado que necesitan los checks de rol/permiso."""
+
+    __slots__ = ("id", "role_id")
+
+    def __init__(self, id: int, role_id: Optional[int]):
+        self.id = id
+        self.role_id = role_id
+
+    def __repr__(self):
+        return f"Principal(id={self.id}, role_id={self.role_id})"
+
+
+class PrincipalCache:
+    """Cache LRU acotada con TTL: user_id -> Principal."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return principal
+
+    def set(self, principal: Principal):
+        self._entries[principal.id] = (time.monotonic() + self.ttl, principal)
+        self._entries.move_to_end(principal.id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
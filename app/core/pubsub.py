@@ -0,0 +1,215 @@
+import asyncio
+import contextlib
+import fcntl
+import inspect
+import logging
+import os
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Union
+
+# Backend de difusión entre workers:
+#   memory -> un solo proceso (default)
+#   unix   -> broker local sobre un Unix socket; el primer worker que toma el lock lo aloja
+PUBSUB_BACKEND = os.getenv("PUBSUB_BACKEND", "memory").lower()
+PUBSUB_SOCKET = os.getenv("PUBSUB_SOCKET", "/tmp/restaurant-pubsub.sock")
+PUBSUB_RECONNECT_DELAY = float(os.getenv("PUBSUB_RECONNECT_DELAY", "0.5"))
+PUBSUB_MAX_BUFFER = int(os.getenv("PUBSUB_MAX_BUFFER", str(8 * 1024 * 1024)))
+
+logger = logging.getLogger("pubsub")
+
+Handler = Callable[[str], None]
+# Hook de resincronización: síncrono o corrutina
+ResyncHook = Callable[[], Union[None, Awaitable[None]]]
+
+
+class MemoryBackend:
+    """Un solo worker: la entrega local ya la hace el hub, no hay nada que reenviar."""
+
+    async def start(self, deliver: Callable[[str, str], None], connected: Callable[[], Awaitable[None]]):
+        pass
+
+    def publish(self, channel: str, text: str) -> bool:
+        return True
+
+    async def stop(self):
+        pass
+
+
+class UnixSocketBackend:
+    """Broker de líneas `<canal>\\t<json>` sobre un Unix socket.
+
+    Un `flock` sobre `<socket>.lock` elige qué worker aloja el broker; si ese
+    worker muere el SO libera el lock y otro lo toma al reconectar. El broker
+    reenvía cada línea a todos los workers salvo al que la envió.
+    Lo publicado mientras un worker está desconectado se pierde; tras cada
+    (re)conexión se llama a `connected` para que el hub resincronice.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._deliver: Optional[Callable[[str, str], None]] = None
+        self._connected: Optional[Callable[[], Awaitable[None]]] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._lock_fd: Optional[int] = None
+        self._peers: Set[asyncio.StreamWriter] = set()
+        self._peer_tasks: Set[asyncio.Task] = set()
+        self.dropped = 0
+
+    async def start(self, deliver: Callable[[str, str], None], connected: Callable[[], Awaitable[None]]):
+        self._deliver = deliver
+        self._connected = connected
+        self._task = asyncio.create_task(self._run())
+
+    def publish(self, channel: str, text: str) -> bool:
+        writer = self._writer
+        if writer is None or writer.is_closing():
+            self.dropped += 1
+            return False
+        writer.write(f"{channel}\t{text}\n".encode())
+        return True
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        if self._writer is not None:
+            self._writer.close()
+        if self._server is not None:
+            self._server.close()
+            for peer in list(self._peers):
+                peer.close()
+            # Al cerrar el transporte cada peer lee EOF y termina por sí mismo
+            await asyncio.gather(*self._peer_tasks, return_exceptions=True)
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+
+    # --- cliente ---
+    async def _run(self):
+        while True:
+            try:
+                await self._ensure_broker()
+                reader, self._writer = await asyncio.open_unix_connection(self.path, limit=PUBSUB_MAX_BUFFER)
+                # Antes de leer: lo que llegue mientras tanto queda en el socket y se aplica después
+                await self._connected()
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    channel, _, text = line.decode().rstrip("\n").partition("\t")
+                    self._deliver(channel, text)
+            except asyncio.CancelledError:
+                raise
+            except (OSError, ValueError) as exc:
+                logger.warning("pubsub: conexión con el broker perdida (%s)", exc)
+            self._writer = None
+            await asyncio.sleep(PUBSUB_RECONNECT_DELAY)
+
+    # --- broker ---
+    async def _ensure_broker(self):
+        if self._server is not None or not self._try_lock():
+            return
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._serve_peer, path=self.path, limit=PUBSUB_MAX_BUFFER)
+        logger.info("pubsub: broker escuchando en %s (pid %s)", self.path, os.getpid())
+
+    def _try_lock(self) -> bool:
+        if self._lock_fd is None:
+            self._lock_fd = os.open(self.path + ".lock", os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    async def _serve_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._peers.add(writer)
+        task = asyncio.current_task()
+        self._peer_tasks.add(task)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                for peer in list(self._peers):
+                    if peer is writer:
+                        continue
+                    # Un worker que no consume no puede hacer crecer la memoria del broker
+                    if peer.transport.get_write_buffer_size() > PUBSUB_MAX_BUFFER:
+                        self._peers.discard(peer)
+                        peer.close()
+                        continue
+                    peer.write(line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._peers.discard(writer)
+            self._peer_tasks.discard(task)
+            writer.close()
+
+
+class PubSub:
+    """Hub de eventos: entrega local inmediata + reenvío al resto de workers."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._resync_hooks: List[ResyncHook] = []
+        self.resyncs = 0
+
+    def subscribe(self, channel: str, handler: Handler):
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def on_resync(self, hook: ResyncHook):
+        """Registra un hook que se ejecuta tras cada (re)conexión al broker.
+
+        Mientras el worker estuvo desconectado pudo perder invalidaciones y
+        eventos: cada estado en memoria derivado del hub se descarta o recarga.
+        """
+        self._resync_hooks.append(hook)
+
+    def publish(self, channel: str, text: str, local: bool = True) -> bool:
+        """Publica `text`; con `local=False` el emisor ya lo entregó en este worker."""
+        if local:
+            self._deliver(channel, text)
+        return self.backend.publish(channel, text)
+
+    def publish_local(self, channel: str, text: str):
+        """Entrega solo a los handlers de este worker."""
+        self._deliver(channel, text)
+
+    async def resync(self):
+        self.resyncs += 1
+        for hook in self._resync_hooks:
+            try:
+                result = hook()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("pubsub: error al resincronizar")
+
+    def _deliver(self, channel: str, text: str):
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(text)
+            except Exception:
+                logger.exception("pubsub: error en handler de %s", channel)
+
+    async def start(self):
+        await self.backend.start(self._deliver, self.resync)
+
+    async def stop(self):
+        await self.backend.stop()
+
+
+def _make_backend():
+    if PUBSUB_BACKEND == "unix":
+        return UnixSocketBackend(PUBSUB_SOCKET)
+    return MemoryBackend()
+
+
+hub = PubSub(_make_backend())
@@ -1,5 +1,8 @@
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import asyncio
+import time
 from jose import jwt, JWTError
 import os
 from dotenv import load_dotenv
@@ -9,6 +12,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from db.base import get_db
 from models.user import User
 from sqlalchemy.future import select
+from core.principal_cache import Principal, PrincipalCache
+from core.metrics import registry
+from core.pubsub import hub
 
 load_dotenv()
 
@@ -16,6 +22,38 @@ JWT_SECRET = os.getenv("JWT_SECRET", "secret")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
 
+# Modo de autenticación:
+#   stateless -> se confía en el claim `role` del JWT firmado (sin consulta a DB)
+#   cached    -> se valida el usuario en DB a través de una cache TTL+LRU
+#   db        -> consulta a DB en cada request (comportamiento original)
+AUTH_MODE = os.getenv("AUTH_MODE", "cached").lower()
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+
+principal_cache = PrincipalCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+PRINCIPAL_CHANNEL = "principal_cache"
+hub.subscribe(PRINCIPAL_CHANNEL, lambda text: principal_cache.invalidate(int(text)))
+
+def invalidate_principal(user_id: int):
+    """Invalida la cache de este worker y la del resto."""
+    hub.publish(PRINCIPAL_CHANNEL, str(user_id))
+
+# bcrypt fuera del event loop: hilos dedicados (bcrypt libera el GIL)
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "4"))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", "32"))  # en ejecución + en cola
+
+bcrypt_seconds = registry.histogram(
+    "auth_bcrypt_seconds", "Tiempo de bcrypt (hash/verify) dentro del hilo, sin la espera en cola", ["op"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.5, 5.0),
+)
+bcrypt_queue_seconds = registry.histogram(
+    "auth_bcrypt_queue_seconds", "Espera en cola hasta que un hilo de bcrypt toma la operación", ["op"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+hash_rejected_total = registry.counter(
+    "auth_hash_rejected_total", "Operaciones bcrypt rechazadas por cola llena", ["op"],
+)
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # 🔐 --- Password Hashing ---
@@ -25,19 +63,72 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password[:72], hashed_password)
 
+def _timed(submitted: float, fn, *args):
+    """Corre en el hilo del pool: devuelve el resultado, la espera en cola y el tiempo de bcrypt."""
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, started - submitted, time.perf_counter() - started
+
+class HashPool:
+    """Ejecuta bcrypt en un pool de hilos acotado y rechaza trabajo si la cola está llena."""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = None
+
+    async def run(self, op: str, fn, *args):
+        if self.pending >= self.max_pending:
+            hash_rejected_total.inc(1, op)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+
+        self.pending += 1
+        try:
+            result, waited, elapsed = await asyncio.get_running_loop().run_in_executor(
+                self._executor, _timed, time.perf_counter(), fn, *args
+            )
+        finally:
+            self.pending -= 1
+        # Se observa en el event loop: los histogramas no son thread-safe
+        bcrypt_queue_seconds.observe(waited, op)
+        bcrypt_seconds.observe(elapsed, op)
+        return result
+
+hash_pool = HashPool(HASH_WORKERS, HASH_MAX_PENDING)
+
+async def get_password_hash_async(password: str) -> str:
+    return await hash_pool.run("hash", get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hash_pool.run("verify", verify_password, plain_password, hashed_password)
+
 # 🔑 --- JWT Token ---
 def create_access_token(data: dict, expires_delta: int = None) -> str:
     expire = datetime.utcnow() + timedelta(minutes=expires_delta or ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode = {"exp": expire, **data}
     return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
+def _get_role_id(user) -> int:
+    return user.role_id.value if hasattr(user.role_id, "value") else user.role_id
+
 # 👤 --- User Authentication ---
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
-):
+) -> Principal:
+    """Usuario autenticado como `Principal` (id y rol) en todos los `AUTH_MODE`.
+
+    No es un `User` ORM: quien necesite más campos debe cargarlos por `id`.
+    """
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         user_id: int = payload.get("user_id")
@@ -46,23 +137,37 @@ async def get_current_user(
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
+    # Tokens antiguos sin claim `role` siguen pasando por la DB
+    if AUTH_MODE == "stateless" and "role" in payload:
+        return Principal(id=user_id, role_id=payload["role"])
+
+    if AUTH_MODE != "db":
+        principal = principal_cache.get(user_id)
+        if principal is not None:
+            return principal
+
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalars().first()
 
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
-    return user
+    principal = Principal(id=user.id, role_id=_get_role_id(user))
+    if AUTH_MODE != "db":
+        principal_cache.set(principal)
+    return principal
 
 # 🔒 --- Role-based Access ---
 def role_required(allowed_roles: list):
-    async def role_checker(current_user: User = Depends(get_current_user)):
+    async def role_checker(current_user: Principal = Depends(get_current_user)):
         if current_user.role_id not in allowed_roles:
             raise HTTPException(status_code=403, detail="Access denied")
         return current_user
     return role_checker
 
 EMPLOYEE_ROLES = [1, 2, 3, 4, 6]
+# Reportes y exportaciones: admin y caja
+REPORT_ROLES = [1, 6]
 CLIENT_ROLE = [5, None]
 
 def employee_required():
@@ -81,11 +186,11 @@ ROLE_PERMISSIONS = {
     5: {"read"},          # cliente (solo lectura)
 }
 
-def _get_role_id(user) -> int:
-    return user.role_id.value if hasattr(user.role_id, "value") else user.role_id
+# Nombre de rol usado en los tópicos WebSocket (`role:<nombre>`)
+ROLE_NAMES = {1: "admin", 2: "mozo", 3: "cocina", 4: "delivery", 5: "cliente", 6: "caja"}
 
 def permission_required(required: str):
-    async def checker(current_user: User = Depends(get_current_user)):
+    async def checker(current_user: Principal = Depends(get_current_user)):
         role_id = _get_role_id(current_user)
         perms = ROLE_PERMISSIONS.get(role_id, set())
         if required not in perms:
@@ -0,0 +1,132 @@
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from core.metrics import registry
+
+# Sentencias más lentas que esto (ms) van al slow-query log
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# Archivo opcional para el slow-query log (si no, sale por el logging estándar)
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG")
+# Misma sentencia repetida N veces en un request -> posible N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+# Añadir `Server-Timing` (tiempo de DB y nº de consultas) a las respuestas
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+
+logger = logging.getLogger("sql")
+slow_logger = logging.getLogger("sql.slow")
+if SLOW_QUERY_LOG:
+    _handler = logging.FileHandler(SLOW_QUERY_LOG)
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    slow_logger.addHandler(_handler)
+
+db_query_seconds = registry.histogram(
+    "db_query_seconds", "Duración de cada sentencia SQL", ["engine"],
+    (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+db_slow_queries_total = registry.counter("db_slow_queries_total", "Sentencias por encima de SLOW_QUERY_MS", ["engine"])
+db_n_plus_one_total = registry.counter("db_n_plus_one_total", "Requests con sentencias repetidas (posible N+1)", ["method", "route"])
+db_request_queries = registry.histogram(
+    "db_request_queries", "Sentencias SQL por request", ["method", "route"],
+    (1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+
+
+class RequestProfile:
+    """Consultas y tiempo de DB acumulados durante un request."""
+
+    __slots__ = ("queries", "db_seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def repeated(self):
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= N_PLUS_ONE_THRESHOLD]
+
+
+_profile: ContextVar[Optional[RequestProfile]] = ContextVar("sql_profile", default=None)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _profile.get()
+
+
+def _short(statement: str, limit: int = 500) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    label = conn.engine.pool.logging_name or "primary"
+    db_query_seconds.observe(elapsed, label)
+
+    profile = _profile.get()
+    if profile is not None:
+        profile.queries += 1
+        profile.db_seconds += elapsed
+        profile.statements[statement] += 1
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        db_slow_queries_total.inc(1, label)
+        # Solo la sentencia: los parámetros pueden llevar datos personales o hashes
+        slow_logger.warning("slow query %.1f ms [%s]: %s", elapsed * 1000, label, _short(statement))
+
+
+def profile_engine(engine):
+    """Engancha el profiler a los eventos de cursor de un engine async."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SQLProfilerMiddleware:
+    """Middleware ASGI: abre un perfil por request HTTP y lo resume al terminar.
+
+    Con `SERVER_TIMING=true` añade `Server-Timing: db;dur=..;desc="N queries", app;dur=..`
+    con lo acumulado hasta el inicio de la respuesta (en streaming, las
+    consultas posteriores no entran en la cabecera pero sí en el resumen).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _profile.set(profile)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if SERVER_TIMING and message["type"] == "http.response.start":
+                timing = (
+                    f'db;dur={profile.db_seconds * 1000:.1f};desc="{profile.queries} queries", '
+                    f"app;dur={(time.perf_counter() - start) * 1000:.1f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _profile.reset(token)
+            if profile.queries:
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                db_request_queries.observe(profile.queries, scope["method"], route)
+                repeated = profile.repeated()
+                if repeated:
+                    db_n_plus_one_total.inc(1, scope["method"], route)
+                    for sql, n in repeated:
+                        logger.warning("posible N+1 en %s %s: %sx %s", scope["method"], route, n, _short(sql, 200))
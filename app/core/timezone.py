@@ -0,0 +1,35 @@
+import datetime
+import os
+from zoneinfo import ZoneInfo
+
+# Zona horaria del restaurante. Las fechas de reservas se guardan como hora
+# local naive (lo que envía el cliente); las que llegan con offset ("Z",
+# "-05:00") se convierten a esta zona antes de guardarlas o compararlas.
+# Los pedidos y los agregados de ventas se guardan en UTC (`utcnow`); los
+# reportes se consultan y se agrupan en hora local.
+RESTAURANT_TIMEZONE = os.getenv("RESTAURANT_TIMEZONE", "UTC")
+RESTAURANT_TZ = ZoneInfo(RESTAURANT_TIMEZONE)
+
+
+def local_now() -> datetime.datetime:
+    """Hora actual del restaurante, naive (comparable con las columnas DateTime)."""
+    return datetime.datetime.now(RESTAURANT_TZ).replace(tzinfo=None)
+
+
+def to_local(value: datetime.datetime) -> datetime.datetime:
+    """Hora local naive del restaurante; las fechas naive se asumen ya locales."""
+    if value.tzinfo is not None:
+        value = value.astimezone(RESTAURANT_TZ).replace(tzinfo=None)
+    return value
+
+
+def utc_to_local(value: datetime.datetime) -> datetime.datetime:
+    """Hora local naive de una fecha UTC naive (columnas con `utcnow`)."""
+    return to_local(value.replace(tzinfo=datetime.timezone.utc))
+
+
+def to_utc(value: datetime.datetime) -> datetime.datetime:
+    """Fecha UTC naive; las fechas naive se asumen en hora local del restaurante."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=RESTAURANT_TZ)
+    return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
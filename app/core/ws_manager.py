@@ -0,0 +1,198 @@
+import asyncio
+import json
+import os
+from typing import Dict, Iterable, Optional, Set
+
+from fastapi import WebSocket
+from core.metrics import registry
+from core.pubsub import hub
+
+# Mensajes pendientes por conexión antes de considerarla lenta y desconectarla
+WS_QUEUE_SIZE = int(os.getenv("WS_QUEUE_SIZE", "100"))
+WS_CLOSE_OVERFLOW = 1013  # "Try Again Later"
+
+# Canal del hub para mensajes por tópico: "<tópico>,<tópico>\t<json>"
+TOPIC_CHANNEL = "ws_topics"
+
+
+ws_connections_total = registry.counter("ws_connections_total", "WebSockets aceptados", ["channel"])
+ws_messages_sent_total = registry.counter("ws_messages_sent_total", "Mensajes enviados por WebSocket", ["channel"])
+ws_dropped_total = registry.counter("ws_dropped_total", "Clientes desconectados por cola llena", ["channel"])
+
+
+def encode(message) -> str:
+    if isinstance(message, str):
+        return message
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class Connection:
+    """Un WebSocket con su propia cola de salida y una tarea que la vacía."""
+
+    __slots__ = ("websocket", "channel", "queue", "writer", "closed", "topics", "role_id")
+
+    def __init__(self, websocket: WebSocket, channel: str, queue_size: int):
+        self.websocket = websocket
+        self.channel = channel
+        self.topics: Set[str] = set()
+        self.role_id: Optional[int] = None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.closed = False
+
+    def send(self, text: str) -> bool:
+        """Encola sin bloquear; devuelve False si la cola está llena."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _write_loop(self, manager: "ConnectionManager"):
+        try:
+            while True:
+                text = await self.queue.get()
+                await self.websocket.send_text(text)
+                ws_messages_sent_total.inc(1, self.channel)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            manager.disconnect(self)
+
+
+class ConnectionManager:
+    """Registro de WebSockets por canal con fan-out no bloqueante.
+
+    `broadcast` serializa el mensaje una sola vez y lo deja en la cola de cada
+    cliente; un cliente lento solo llena su propia cola y, al desbordarla,
+    se le cierra la conexión sin afectar al resto. El mismo texto se reenvía
+    por el hub de pub/sub a los demás workers, que lo entregan a sus sockets.
+    """
+
+    def __init__(self, queue_size: int = WS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.channels: Dict[str, Set[Connection]] = {}
+        # Índice tópico -> conexiones suscritas; publicar cuesta O(suscriptores)
+        self.topics: Dict[str, Set[Connection]] = {}
+        self.dropped = 0
+        hub.subscribe(TOPIC_CHANNEL, self._on_topic_message)
+
+    async def connect(self, websocket: WebSocket, channel: str) -> Connection:
+        await websocket.accept()
+        conn = Connection(websocket, channel, self.queue_size)
+        conn.writer = asyncio.create_task(conn._write_loop(self))
+        if channel not in self.channels:
+            self.channels[channel] = set()
+            hub.subscribe("ws:" + channel, lambda text: self._fanout(channel, text))
+        self.channels[channel].add(conn)
+        ws_connections_total.inc(1, channel)
+        return conn
+
+    def disconnect(self, conn: Connection, code: Optional[int] = None):
+        if conn.closed:
+            return
+        conn.closed = True
+        self.channels.get(conn.channel, set()).discard(conn)
+        for topic in list(conn.topics):
+            self.unsubscribe(conn, topic)
+        if conn.writer is not None and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
+        if code is not None:
+            asyncio.create_task(self._close(conn.websocket, code))
+
+    @staticmethod
+    async def _close(websocket: WebSocket, code: int):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+
+    async def broadcast(self, channel: str, message, exclude: Optional[Connection] = None) -> int:
+        text = encode(message)
+        sent = self._fanout(channel, text, exclude)
+        hub.publish("ws:" + channel, text, local=False)
+        return sent
+
+    def broadcast_local(self, channel: str, message) -> int:
+        """Solo a los sockets de este worker (mensajes que cada worker genera por su cuenta)."""
+        return self._fanout(channel, encode(message))
+
+    def _fanout(self, channel: str, text: str, exclude: Optional[Connection] = None) -> int:
+        sent = 0
+        for conn in list(self.channels.get(channel, ())):
+            if conn is exclude:
+                continue
+            if conn.send(text):
+                sent += 1
+            else:
+                self.dropped += 1
+                ws_dropped_total.inc(1, conn.channel)
+                self.disconnect(conn, code=WS_CLOSE_OVERFLOW)
+        return sent
+
+    # --- tópicos ---
+    def subscribe(self, conn: Connection, topic: str):
+        conn.topics.add(topic)
+        self.topics.setdefault(topic, set()).add(conn)
+
+    def unsubscribe(self, conn: Connection, topic: str):
+        conn.topics.discard(topic)
+        subscribers = self.topics.get(topic)
+        if subscribers is not None:
+            subscribers.discard(conn)
+            if not subscribers:
+                del self.topics[topic]
+
+    async def publish(self, topics: Iterable[str], message, exclude: Optional[Connection] = None) -> int:
+        """Entrega `message` una sola vez a cada conexión suscrita a alguno de `topics`."""
+        topics = sorted(set(topics))
+        text = encode(message)
+        sent = self._fanout_topics(topics, text, exclude)
+        hub.publish(TOPIC_CHANNEL, ",".join(topics) + "\t" + text, local=False)
+        return sent
+
+    def publish_local(self, topics: Iterable[str], message) -> int:
+        """Como `publish`, pero solo a los sockets de este worker."""
+        return self._fanout_topics(set(topics), encode(message))
+
+    def _fanout_topics(self, topics: Iterable[str], text: str, exclude: Optional[Connection] = None) -> int:
+        recipients: Set[Connection] = set()
+        for topic in topics:
+            recipients.update(self.topics.get(topic, ()))
+        recipients.discard(exclude)
+        sent = 0
+        for conn in recipients:
+            if conn.send(text):
+                sent += 1
+            else:
+                self.dropped += 1
+                ws_dropped_total.inc(1, conn.channel)
+                self.disconnect(conn, code=WS_CLOSE_OVERFLOW)
+        return sent
+
+    def _on_topic_message(self, payload: str):
+        topics, _, text = payload.partition("\t")
+        self._fanout_topics(topics.split(","), text)
+
+    def count(self, channel: Optional[str] = None) -> int:
+        if channel is not None:
+            return len(self.channels.get(channel, ()))
+        return sum(len(conns) for conns in self.channels.values())
+
+    def stats(self) -> dict:
+        return {
+            "connections": {channel: len(conns) for channel, conns in self.channels.items()},
+            "topics": len(self.topics),
+            "dropped": self.dropped,
+        }
+
+
+manager = ConnectionManager()
+
+registry.gauge(
+    "ws_connections", "WebSockets abiertos por canal", ["channel"],
+    fn=lambda: [((channel,), len(conns)) for channel, conns in manager.channels.items()],
+)
+registry.gauge("ws_topics", "Tópicos con al menos un suscriptor", fn=lambda: [((), len(manager.topics))])
@@ -1,7 +1,9 @@
 import os
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import declarative_base
 from dotenv import load_dotenv
+from core.instrumentation import InstrumentedPool
+from core.sql_profiler import profile_engine
 
 load_dotenv()
 
@@ -14,30 +16,40 @@ DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
 DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # reciclar conexiones cada 30 min
 DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))    # espera para obtener conexión
 DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Log de cada sentencia SQL (solo para depurar; para producción ver core/sql_profiler.py)
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
 
 # Crear motor async con configuración de pool
-engine = create_async_engine(
-    DATABASE_URL,
+engine_options = dict(
     future=True,
-    echo=True,
+    echo=DB_ECHO,
     pool_size=DB_POOL_SIZE,
     max_overflow=DB_MAX_OVERFLOW,
     pool_recycle=DB_POOL_RECYCLE,
     pool_timeout=DB_POOL_TIMEOUT,
     pool_pre_ping=DB_POOL_PRE_PING,
+    poolclass=InstrumentedPool,  # mide esperas de checkout (/metrics)
 )
+engine = create_async_engine(DATABASE_URL, pool_logging_name="primary", **engine_options)
+profile_engine(engine)
+
+class _ModelBase:
+    # Tras un INSERT/UPDATE el objeto ya trae los valores generados por la DB
+    # (RETURNING, o un SELECT solo si el modelo tiene columnas server-side),
+    # así que los endpoints de escritura responden sin `db.refresh()`
+    __mapper_args__ = {"eager_defaults": True}
 
-# Sesión asíncrona
-AsyncSessionLocal = sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False
-)
 
 # Base de modelos
-Base = declarative_base()
+Base = declarative_base(cls=_ModelBase)
+
+
 
-# Dependencia para inyectar sesión
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+def __getattr__(name):
+    # `AsyncSessionLocal` y `get_db` viven en db/session.py (enrutado primario/réplica).
+    # Se reexportan al pedirlos: db/session.py importa este módulo y un import
+    # directo aquí fallaría si se importa db.session primero
+    if name in ("AsyncSessionLocal", "get_db"):
+        from db import session
+        return getattr(session, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,50 @@
+import os
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+# Cómo trata el arranque el esquema de la DB:
+#   verify -> solo comprueba que la revisión de Alembic sea la última (default)
+#   create -> `Base.metadata.create_all` (desarrollo/tests, sin Alembic)
+#   off    -> no hace nada
+DB_SCHEMA_MODE = os.getenv("DB_SCHEMA_MODE", "verify").lower()
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+def head_revisions() -> set:
+    """Revisiones `head` según los scripts de `migrations/versions`."""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory.from_config(Config(ALEMBIC_INI)).get_heads())
+
+
+async def current_revisions(conn) -> set:
+    try:
+        result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+    except DBAPIError:
+        return set()
+    return set(result.scalars().all())
+
+
+async def ensure_schema(engine, metadata):
+    """Una consulta por arranque en vez de reflejar cada tabla con `create_all`.
+
+    Las migraciones se aplican fuera del arranque (`alembic upgrade head`,
+    una vez por despliegue) y no en cada worker.
+    """
+    if DB_SCHEMA_MODE == "off":
+        return
+    if DB_SCHEMA_MODE == "create":
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+        return
+
+    async with engine.connect() as conn:
+        current = await current_revisions(conn)
+    expected = head_revisions()
+    if current != expected:
+        raise RuntimeError(
+            f"DB schema at revision {sorted(current) or 'none'}, expected {sorted(expected)}: "
+            "run `alembic upgrade head` (or `alembic stamp 0001` first on a database created by create_all)"
+        )
@@ -0,0 +1,69 @@
+import os
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.requests import HTTPConnection
+from core.sql_profiler import profile_engine
+from db.base import engine, engine_options
+
+# Réplica de solo lectura opcional (misma configuración de pool que el primario)
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+
+replica_engine = (
+    create_async_engine(REPLICA_DATABASE_URL, pool_logging_name="replica", **engine_options)
+    if REPLICA_DATABASE_URL else None
+)
+
+if replica_engine is not None:
+    profile_engine(replica_engine)
+
+# Métodos HTTP cuyas lecturas pueden ir a la réplica
+READ_METHODS = ("GET", "HEAD")
+
+
+class RoutingSession(Session):
+    """Elige el engine por sentencia: SELECT -> réplica, todo lo demás -> primario.
+
+    La primera escritura (flush, UPDATE/INSERT/DELETE o SELECT ... FOR UPDATE)
+    fija la sesión al primario, así que las lecturas posteriores del mismo
+    request ven lo que se acaba de escribir. Sin réplica todo va al primario.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if replica_engine is None or self.info.get("primary"):
+            return engine.sync_engine
+        if self._flushing or not isinstance(clause, Select) or clause._for_update_arg is not None:
+            self.info["primary"] = True
+            return engine.sync_engine
+        return replica_engine.sync_engine
+
+
+# La conexión se toma del pool en la primera sentencia, no al abrir la sesión:
+# un request que no consulta la DB no ocupa ninguna.
+AsyncSessionLocal = sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
+)
+
+
+def pin_primary(session: AsyncSession):
+    """Fuerza el primario para el resto de la sesión (lecturas que no toleran retraso)."""
+    session.sync_session.info["primary"] = True
+
+
+def primary_session() -> AsyncSession:
+    """Sesión fijada al primario para tareas internas (arranque, planificador, jobs)."""
+    session = AsyncSessionLocal()
+    pin_primary(session)
+    return session
+
+
+# Dependencia para inyectar sesión
+async def get_db(connection: HTTPConnection):
+    async with AsyncSessionLocal() as session:
+        # Solo los GET/HEAD leen de la réplica; el resto de requests usan el primario desde el inicio
+        if connection.scope["type"] != "http" or connection.scope["method"] not in READ_METHODS:
+            pin_primary(session)
+        yield session
@@ -1,12 +1,23 @@
+import time
+_import_started = time.perf_counter()  # perfil de arranque: import de la app
+
 import uvicorn, os, secrets
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.openapi.docs import get_swagger_ui_html, get_redoc_html
 from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBasic, HTTPBasicCredentials, OAuth2PasswordBearer
 from db.base import engine, Base
+from db.session import primary_session
+from db.schema import ensure_schema
+from core.pubsub import hub
 from core.security import role_required
+from core.instrumentation import MetricsMiddleware, startup_profile
+from core.sql_profiler import SQLProfilerMiddleware
+from services.kitchen import load_kitchen_queue
+from services.reservation_scheduler import reservation_scheduler
+from workers import job_runner
 # módulo main.py (ajustes de import y registro de router)
-from routers import auth, menu, tables, orders, reservations, ws_orders, user, category, sub_category, ws_menu
+from routers import auth, menu, tables, orders, reservations, ws_orders, user, category, sub_category, ws_menu, metrics, kitchen, jobs, reports
 from fastapi.openapi.utils import get_openapi
 
 
@@ -17,14 +28,33 @@ app = FastAPI(
     openapi_url=None
 )
 
-# ====== MODELOS ======
-async def init_models():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+# Latencia y status por ruta para /metrics
+app.add_middleware(MetricsMiddleware)
+# Consultas y tiempo de DB por request, N+1 y Server-Timing
+app.add_middleware(SQLProfilerMiddleware)
 
+# ====== MODELOS ======
+# El esquema lo gestiona Alembic (`alembic upgrade head`); el arranque solo verifica la revisión
 @app.on_event("startup")
 async def startup():
-    await init_models()
+    with startup_profile.phase("schema"):
+        await ensure_schema(engine, Base.metadata)
+    async with primary_session() as session:
+        with startup_profile.phase("kitchen_queue"):
+            await load_kitchen_queue(session)
+        with startup_profile.phase("reservation_scheduler"):
+            await reservation_scheduler.load(session)
+    with startup_profile.phase("background"):
+        await hub.start()
+        await reservation_scheduler.start()
+        await job_runner.start()
+    startup_profile.ready()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await job_runner.stop()
+    await reservation_scheduler.stop()
+    await hub.stop()
 
 # ====== RUTAS ======
 app.include_router(auth.router)
@@ -37,6 +67,10 @@ app.include_router(orders.router)
 app.include_router(reservations.router)
 app.include_router(ws_orders.router)
 app.include_router(ws_menu.router)
+app.include_router(metrics.router)
+app.include_router(kitchen.router)
+app.include_router(jobs.router)
+app.include_router(reports.router)
 
 
 @app.get("/")
@@ -100,5 +134,7 @@ def custom_openapi():
 
 app.openapi = custom_openapi
 
+startup_profile.record("import", time.perf_counter() - _import_started)
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
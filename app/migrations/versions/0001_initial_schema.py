@@ -0,0 +1,134 @@
+"""initial schema
+
+Esquema que creaba `Base.metadata.create_all` antes de pasar a Alembic.
+Para una base existente creada así: `alembic stamp 0001 && alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 11:34:05.831715
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('category',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('value', sa.Boolean(), nullable=True),
+    sa.Column('img', sa.String(length=255), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_category_id'), 'category', ['id'], unique=False)
+    op.create_table('menu_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=True),
+    sa.Column('description', sa.String(length=255), nullable=True),
+    sa.Column('price', sa.Float(), nullable=True),
+    sa.Column('category', sa.String(length=50), nullable=True),
+    sa.Column('amount', sa.Integer(), nullable=True),
+    sa.Column('available', sa.Boolean(), nullable=True),
+    sa.Column('image_url', sa.String(length=255), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_menu_items_id'), 'menu_items', ['id'], unique=False)
+    op.create_table('subcategories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=True),
+    sa.Column('description', sa.String(length=255), nullable=True),
+    sa.Column('img', sa.String(length=255), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_subcategories_id'), 'subcategories', ['id'], unique=False)
+    op.create_index(op.f('ix_subcategories_name'), 'subcategories', ['name'], unique=True)
+    op.create_table('tables',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('code', sa.String(length=20), nullable=True),
+    sa.Column('seats', sa.Integer(), nullable=True),
+    sa.Column('location', sa.String(length=100), nullable=True),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tables_code'), 'tables', ['code'], unique=True)
+    op.create_index(op.f('ix_tables_id'), 'tables', ['id'], unique=False)
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('dni', sa.String(length=20), nullable=True),
+    sa.Column('full_name', sa.String(length=100), nullable=True),
+    sa.Column('email', sa.String(length=100), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('role_id', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_dni'), 'users', ['dni'], unique=True)
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_table('orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('table_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('total', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['table_id'], ['tables.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_orders_id'), 'orders', ['id'], unique=False)
+    op.create_table('reservations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('table_id', sa.Integer(), nullable=True),
+    sa.Column('start_at', sa.DateTime(), nullable=True),
+    sa.Column('end_at', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.ForeignKeyConstraint(['table_id'], ['tables.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reservations_id'), 'reservations', ['id'], unique=False)
+    op.create_table('order_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('menu_item_id', sa.Integer(), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=True),
+    sa.Column('notes', sa.String(length=255), nullable=True),
+    sa.ForeignKeyConstraint(['menu_item_id'], ['menu_items.id'], ),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_order_items_id'), 'order_items', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_order_items_id'), table_name='order_items')
+    op.drop_table('order_items')
+    op.drop_index(op.f('ix_reservations_id'), table_name='reservations')
+    op.drop_table('reservations')
+    op.drop_index(op.f('ix_orders_id'), table_name='orders')
+    op.drop_table('orders')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_index(op.f('ix_users_dni'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_tables_id'), table_name='tables')
+    op.drop_index(op.f('ix_tables_code'), table_name='tables')
+    op.drop_table('tables')
+    op.drop_index(op.f('ix_subcategories_name'), table_name='subcategories')
+    op.drop_index(op.f('ix_subcategories_id'), table_name='subcategories')
+    op.drop_table('subcategories')
+    op.drop_index(op.f('ix_menu_items_id'), table_name='menu_items')
+    op.drop_table('menu_items')
+    op.drop_index(op.f('ix_category_id'), table_name='category')
+    op.drop_table('category')
@@ -0,0 +1,79 @@
+"""order line prices, reservation windows, jobs and sales rollups
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 11:40:12.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('order_items', sa.Column('price', sa.Float(), nullable=True))
+    op.create_index(op.f('ix_orders_created_at'), 'orders', ['created_at'], unique=False)
+
+    op.add_column('reservations', sa.Column('auto_cancel_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_reservations_auto_cancel_at'), 'reservations', ['auto_cancel_at'], unique=False)
+    op.create_index('ix_reservations_table_window', 'reservations', ['table_id', 'start_at', 'end_at'], unique=False)
+
+    op.create_table('jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=100), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('max_attempts', sa.Integer(), nullable=True),
+    sa.Column('run_after', sa.DateTime(), nullable=True),
+    sa.Column('locked_until', sa.DateTime(), nullable=True),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_jobs_id'), 'jobs', ['id'], unique=False)
+    op.create_index('ix_jobs_status_run_after', 'jobs', ['status', 'run_after'], unique=False)
+
+    op.create_table('sales_hourly',
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('table_id', sa.Integer(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=True),
+    sa.Column('revenue', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('bucket', 'table_id')
+    )
+    op.create_table('sales_item_hourly',
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('menu_item_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=True),
+    sa.Column('revenue', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('bucket', 'menu_item_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sales_item_hourly')
+    op.drop_table('sales_hourly')
+    op.drop_index('ix_jobs_status_run_after', table_name='jobs')
+    op.drop_index(op.f('ix_jobs_id'), table_name='jobs')
+    op.drop_table('jobs')
+
+    op.drop_index('ix_reservations_table_window', table_name='reservations')
+    op.drop_index(op.f('ix_reservations_auto_cancel_at'), table_name='reservations')
+    with op.batch_alter_table('reservations') as batch_op:
+        batch_op.drop_column('auto_cancel_at')
+
+    op.drop_index(op.f('ix_orders_created_at'), table_name='orders')
+    with op.batch_alter_table('order_items') as batch_op:
+        batch_op.drop_column('price')
@@ -0,0 +1,32 @@
+"""report locks
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 16:48:02.537910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    locks = op.create_table('report_locks',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(locks, [{'name': 'sales'}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('report_locks')
@@ -1,5 +1,9 @@
 from .user import User
 from .menu import MenuItem
 from .table import Table
+from .category import Category
+from .sub_category import SubCategory
 from .order import Order
-from .reservation import Reservation
\ No newline at end of file
+from .reservation import Reservation
+from .job import Job
+from .report import SalesHourly, SalesItemHourly, ReportLock
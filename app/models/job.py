@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
+from db.base import Base
+import datetime
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=True)
+    status = Column(String(20), default="queued")  # queued | running | succeeded | failed
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    run_after = Column(DateTime, default=datetime.datetime.utcnow)
+    locked_until = Column(DateTime, nullable=True)  # lease del worker que lo ejecuta
+    locked_by = Column(String(64), nullable=True)  # worker dueño del lease
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    # El dispatcher busca: status = 'queued' AND run_after <= now
+    __table_args__ = (Index("ix_jobs_status_run_after", "status", "run_after"),)
@@ -10,7 +10,7 @@ class Order(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     status = Column(String(50), default="pending")
     total = Column(Float, default=0.0)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
 
     user = relationship("models.user.User", back_populates="orders")
     table = relationship("Table", back_populates="orders")
@@ -22,6 +22,7 @@ class OrderItem(Base):
     order_id = Column(Integer, ForeignKey("orders.id"))
     menu_item_id = Column(Integer, ForeignKey("menu_items.id"))
     quantity = Column(Integer)
+    price = Column(Float, default=0.0)  # precio unitario al momento del pedido
     notes = Column(String(255), nullable=True)
 
     order = relationship("Order", back_populates="items")
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, Float, DateTime, String
+from db.base import Base
+
+# Agregados de ventas por hora (UTC, según Order.created_at) de los pedidos `paid`.
+# Los reportes filtran y agrupan en hora local (core/timezone.py).
+# Los mantiene services/reports.py; nunca se escriben desde los routers.
+
+class SalesHourly(Base):
+    __tablename__ = "sales_hourly"
+
+    bucket = Column(DateTime, primary_key=True)
+    table_id = Column(Integer, primary_key=True, default=0)  # 0 = sin mesa (delivery / para llevar)
+    orders = Column(Integer, default=0)
+    revenue = Column(Float, default=0.0)
+
+class SalesItemHourly(Base):
+    __tablename__ = "sales_item_hourly"
+
+    bucket = Column(DateTime, primary_key=True)
+    menu_item_id = Column(Integer, primary_key=True)
+    quantity = Column(Integer, default=0)
+    revenue = Column(Float, default=0.0)
+
+class ReportLock(Base):
+    """Fila que serializa la reconstrucción de agregados con los incrementos.
+
+    Los incrementos la toman compartida (`FOR SHARE`) y la reconstrucción de
+    cada ventana en exclusiva (`FOR UPDATE`), ambas hasta su commit.
+    """
+    __tablename__ = "report_locks"
+
+    name = Column(String(50), primary_key=True)
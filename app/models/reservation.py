@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Index
 from sqlalchemy.orm import relationship
 from db.base import Base
 
@@ -10,5 +10,10 @@ class Reservation(Base):
     start_at = Column(DateTime)
     end_at = Column(DateTime)
     status = Column(String(50), default="pending")
+    # Vencimiento de una reserva no atendida (lo ejecuta services/reservation_scheduler.py)
+    auto_cancel_at = Column(DateTime, nullable=True, index=True)
 
     table = relationship("Table", back_populates="reservations")
+
+    # Búsqueda de solapamientos por mesa: table_id = ? AND start_at < ? AND end_at > ?
+    __table_args__ = (Index("ix_reservations_table_window", "table_id", "start_at", "end_at"),)
@@ -6,10 +6,15 @@ from models import User
 from schemas.user import UserCreate, UserOut, UserFull
 from schemas.auth import LoginIn, TokenResponse
 from db.base import get_db
-from core.security import get_password_hash, verify_password, create_access_token
+from core.security import get_password_hash_async, verify_password_async, create_access_token
+from core.metrics import registry
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+auth_request_seconds = registry.histogram(
+    "auth_request_seconds", "Latencia de los endpoints de autenticación", ["endpoint"],
+)
+
 # Mantener el mismo endpoint, pero agregar validación de roles
 
 EMPLOYEE_ROLES = [1, 2, 3, 4, 6]
@@ -17,6 +22,10 @@ CLIENT_ROLE = 5
 
 @router.post("/register", response_model=TokenResponse)
 async def register(payload: UserCreate, db: AsyncSession = Depends(get_db)):
+    with auth_request_seconds.time("register"):
+        return await _register(payload, db)
+
+async def _register(payload: UserCreate, db: AsyncSession):
     if payload.role_id not in EMPLOYEE_ROLES + [CLIENT_ROLE]:
         raise HTTPException(status_code=400, detail="Invalid role")
     
@@ -35,13 +44,12 @@ async def register(payload: UserCreate, db: AsyncSession = Depends(get_db)):
         full_name=payload.full_name,
         email=payload.email,
         phone=payload.phone,
-        hashed_password=get_password_hash(password_to_hash) if password_to_hash else None,
+        hashed_password=await get_password_hash_async(password_to_hash) if password_to_hash else None,
         role_id=payload.role_id
     )
     
     db.add(new_user)
     await db.commit()
-    await db.refresh(new_user)
     
     token = create_access_token({
         "user_id": new_user.id,
@@ -52,9 +60,13 @@ async def register(payload: UserCreate, db: AsyncSession = Depends(get_db)):
     
 @router.post("/login", response_model=TokenResponse)
 async def login(payload: LoginIn, db: AsyncSession = Depends(get_db)):
+    with auth_request_seconds.time("login"):
+        return await _login(payload, db)
+
+async def _login(payload: LoginIn, db: AsyncSession):
     result = await db.execute(select(User).where(User.dni == payload.dni))
     user = result.scalars().first()
-    if not user or not user.hashed_password or not verify_password(payload.password, user.hashed_password):
+    if not user or not user.hashed_password or not await verify_password_async(payload.password, user.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     token = create_access_token({"user_id": user.id, "role": user.role_id.value if hasattr(user.role_id, 'value') else user.role_id})
     return {"access_token": token, "token_type": "bearer"}
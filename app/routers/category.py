@@ -1,19 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List
+from typing import List, Optional
 from db.base import get_db
+from core.pagination import PageParams, paginate_rows
 from models import category as models
 from schemas import category as schemas
+from services.menu_cache import menu_cache, serialize_rows, CATEGORY
+from services.catalog_import import read_rows, validate_rows, bulk_upsert, publish_catalog_reload
 
 router = APIRouter(prefix="/category", tags=["category"])
 
 
+async def load_category_rows(db: AsyncSession) -> List[dict]:
+    result = await db.execute(select(models.Category).order_by(models.Category.id))
+    return serialize_rows(schemas.CategoryOut, result.scalars().all())
+
+
 @router.get("/", response_model=List[schemas.CategoryOut])
-async def get_categories(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(models.Category))
-    categories = result.scalars().all()
-    return categories
+async def get_categories(
+    request: Request,
+    response: Response,
+    value: Optional[bool] = None,
+    page: PageParams = Depends(),
+):
+    snapshot = await menu_cache.get(CATEGORY, load_category_rows)
+    if value is None and not page.paginated:
+        return snapshot.response(request)
+
+    rows = snapshot.rows
+    if value is not None:
+        rows = [r for r in rows if r["value"] == value]
+    return paginate_rows(rows, page, response)
 
 @router.get("/{category_id}", response_model=schemas.CategoryOut)
 async def get_category(category_id: int, db: AsyncSession = Depends(get_db)):
@@ -28,9 +46,18 @@ async def create_category(payload: schemas.CategoryIn, db: AsyncSession = Depend
     db_category = models.Category(**payload.dict())
     db.add(db_category)
     await db.commit()
-    await db.refresh(db_category)
+    menu_cache.invalidate(CATEGORY)
     return db_category
 
+# Importación masiva (array JSON o CSV); upsert por `id`
+@router.post("/bulk")
+async def bulk_upsert_categories(request: Request, db: AsyncSession = Depends(get_db)):
+    items = validate_rows(schemas.CategoryIn, await read_rows(request), key="id")
+    result = await bulk_upsert(db, models.Category, items, key="id")
+    menu_cache.invalidate(CATEGORY)
+    publish_catalog_reload(CATEGORY, len(items))
+    return result
+
 @router.put("/{category_id}", response_model=schemas.CategoryOut)
 async def update_category(category_id: int, payload: schemas.CategoryUpdate, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(models.Category).where(models.Category.id == category_id))
@@ -41,7 +68,7 @@ async def update_category(category_id: int, payload: schemas.CategoryUpdate, db:
     for key, value in update_data.items():
         setattr(category, key, value)
     await db.commit()
-    await db.refresh(category)
+    menu_cache.invalidate(CATEGORY)
     return category
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -52,4 +79,5 @@ async def delete_category(category_id: int, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Category not found")
     await db.delete(category)
     await db.commit()
+    menu_cache.invalidate(CATEGORY)
     return {"detail": "Category deleted"}
\ No newline at end of file
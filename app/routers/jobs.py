@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from db.base import get_db
+from core.security import role_required, EMPLOYEE_ROLES
+from models.job import Job
+from schemas.job import JobOut
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.get("/{job_id}", response_model=JobOut, dependencies=[Depends(role_required(EMPLOYEE_ROLES))])
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(Job).where(Job.id == job_id))
+    job = result.scalar()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Request
+from services.kitchen import kitchen_queue
+
+router = APIRouter(prefix="/kitchen", tags=["kitchen"])
+
+@router.get("/")
+async def get_stations():
+    # Ítems pendientes por estación
+    return {"version": kitchen_queue.version, "stations": kitchen_queue.summary()}
+
+@router.get("/{station}")
+async def get_station_queue(station: str, request: Request):
+    # Servido desde memoria (ETag por contenido); los cambios llegan por WS al tópico station:<nombre>
+    return kitchen_queue.snapshot(station).response(request)
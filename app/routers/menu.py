@@ -1,36 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, update
 from sqlalchemy.future import select
-from typing import List
+from typing import List, Optional
 from db.base import get_db
+from core.pagination import PageParams, paginate_rows
 from models import menu as models
 from schemas import menu as schemas
-from routers.ws_menu import broadcast_menu_update
+from routers.ws_menu import broadcast_menu_update, websocket_menu as ws_menu_handler
+from services.menu_cache import menu_cache, MENU
+from services.menu_search import menu_search
+from services.menu_sync import load_menu_rows, publish_menu_event
+from services.catalog_import import read_rows, validate_rows, bulk_upsert, publish_catalog_reload
 
 router = APIRouter(prefix="/menu", tags=["menu"])
 
-active_connections: List[WebSocket] = []
 # ------------------------
-# Obtener todos los ítems
+# Obtener todos los ítems (desde el snapshot en memoria)
 @router.get("/", response_model=List[schemas.MenuItemOut])
-async def get_menu_items(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(models.MenuItem))
-    items = result.scalars().all()
-    return items
+async def get_menu_items(
+    request: Request,
+    response: Response,
+    category: Optional[str] = None,
+    available: Optional[bool] = None,
+    page: PageParams = Depends(),
+):
+    snapshot = await menu_cache.get(MENU, load_menu_rows)
+    if category is None and available is None and not page.paginated:
+        return snapshot.response(request)
+
+    rows = snapshot.rows
+    if category is not None:
+        rows = [r for r in rows if r["category"] == category]
+    if available is not None:
+        rows = [r for r in rows if r["available"] == available]
+    return paginate_rows(rows, page, response)
 
+# ------------------------
+# Búsqueda tolerante a errores de tipeo (índice de trigramas en memoria)
+@router.get("/search", response_model=List[schemas.MenuSearchHit])
+async def search_menu_items(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    available: Optional[bool] = None,
+):
+    await menu_search.ensure()
+    return menu_search.search(q, limit, available)
+
+# Mismo canal y protocolo que /ws/menu
 @router.websocket("/ws/menu")
 async def websocket_menu(websocket: WebSocket):
-    await websocket.accept()
-    active_connections.append(websocket)
-    print("🟢 Cliente conectado al WebSocket de menú")
-
-    try:
-        while True:
-            # Puedes recibir mensajes si el cliente envía algo, pero aquí solo escuchamos
-            await websocket.receive_text()
-    except WebSocketDisconnect:
-        active_connections.remove(websocket)
-        print("🔴 Cliente desconectado")
+    await ws_menu_handler(websocket)
+
 # ------------------------
 # Obtener ítem por ID
 @router.get("/{item_id}", response_model=schemas.MenuItemOut)
@@ -49,21 +70,60 @@ async def create_menu_item(
     db_item = models.MenuItem(**payload.dict())
     db.add(db_item)
     await db.commit()
-    await db.refresh(db_item)
+    menu_cache.invalidate(MENU)
     # Notificar creación
     await broadcast_menu_update({
         "type": "menu_created",
         "item": {
             "id": db_item.id,
             "name": db_item.name,
+            "description": db_item.description,
             "price": float(db_item.price) if db_item.price is not None else None,
             "category": db_item.category,
             "amount": db_item.amount,
             "available": db_item.available,
+            "image_url": db_item.image_url,
         }
     })
     return db_item
 
+# ------------------------
+# Importación masiva (array JSON o CSV): una transacción y un solo evento
+@router.post("/bulk")
+async def bulk_upsert_menu_items(request: Request, db: AsyncSession = Depends(get_db)):
+    items = validate_rows(schemas.MenuItemBulkIn, await read_rows(request), key="id")
+    result = await bulk_upsert(db, models.MenuItem, items, key="id")
+    menu_cache.invalidate(MENU)
+    publish_catalog_reload(MENU, len(items))
+    return result
+
+# ------------------------
+# Disponibilidad en lote ("86"): un UPDATE y un solo delta
+@router.patch("/availability")
+async def set_menu_availability(payload: schemas.MenuAvailabilityIn, db: AsyncSession = Depends(get_db)):
+    if (payload.ids is None) == (payload.category is None):
+        raise HTTPException(status_code=400, detail="Send either ids or category")
+    values = payload.dict(include={"available", "amount"}, exclude_none=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+
+    item = models.MenuItem
+    target = item.id.in_(payload.ids) if payload.ids is not None else item.category == payload.category
+    # Solo las filas que realmente cambian
+    changed = or_(*[
+        or_(getattr(item, k) != v, getattr(item, k).is_(None)) for k, v in values.items()
+    ])
+    result = await db.execute(select(item.id).where(target, changed))
+    ids = list(result.scalars().all())
+    if ids:
+        await db.execute(
+            update(item).where(item.id.in_(ids)).values(**values).execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        menu_cache.invalidate(MENU)
+        publish_menu_event({"type": "menu_items_updated", "items": [{"id": i, **values} for i in ids]})
+    return {"updated": ids}
+
 # ------------------------
 # Actualizar ítem
 @router.put("/{item_id}", response_model=schemas.MenuItemOut)
@@ -77,17 +137,19 @@ async def update_menu_item(item_id: int, payload: schemas.MenuItemUpdate, db: As
         setattr(item, k, v)
 
     await db.commit()
-    await db.refresh(item)
+    menu_cache.invalidate(MENU)
     # Notificar actualización
     await broadcast_menu_update({
         "type": "menu_updated",
         "item": {
             "id": item.id,
             "name": item.name,
+            "description": item.description,
             "price": float(item.price) if item.price is not None else None,
             "category": item.category,
             "amount": item.amount,
             "available": item.available,
+            "image_url": item.image_url,
         }
     })
     return item
@@ -101,6 +163,7 @@ async def delete_menu_item(item_id: int, payload: schemas.MenuItemUpdate, db: As
 
     await db.delete(item)
     await db.commit()
+    menu_cache.invalidate(MENU)
     # Notificar eliminación
     await broadcast_menu_update({
         "type": "menu_deleted",
@@ -108,25 +171,3 @@ async def delete_menu_item(item_id: int, payload: schemas.MenuItemUpdate, db: As
     })
     return {"ok": True}
 
-
-async def broadcast_menu(db: AsyncSession):
-    """Envia el menú actualizado a todos los clientes conectados"""
-    result = await db.execute(select(MenuItem))
-    items = result.scalars().all()
-
-    data = [
-        {
-            "id": i.id,
-            "name": i.name,
-            "price": i.price,
-            "available": i.available,
-            "amount": i.amount,
-            "category": i.category,
-            "image_url": i.image_url,
-        }
-        for i in items
-    ]
-
-    # Enviar a todos los conectados
-    for conn in active_connections:
-        await conn.send_text(json.dumps({"type": "menu_update", "data": data}))
\ No newline at end of file
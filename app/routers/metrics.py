@@ -0,0 +1,26 @@
+import os
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from core.metrics import registry
+from core.security import role_required
+
+router = APIRouter(tags=["metrics"])
+
+# Si METRICS_TOKEN está definido, el scraper usa `Authorization: Bearer <METRICS_TOKEN>`;
+# si no, se exige un JWT con rol METRICS_ROLE_ID (admin por defecto).
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+METRICS_ROLE_ID = int(os.getenv("METRICS_ROLE_ID", "1"))
+
+async def metrics_token(authorization: Optional[str] = Header(None)):
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token, METRICS_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+
+deps = [Depends(metrics_token)] if METRICS_TOKEN else [Depends(role_required([METRICS_ROLE_ID]))]
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False, dependencies=deps)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
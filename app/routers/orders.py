@@ -1,44 +1,81 @@
-from fastapi import APIRouter, Depends, HTTPException, WebSocket
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, WebSocket
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List
+from typing import List, Optional
+import datetime
 from db.base import get_db
+from core.pagination import PageParams, paginate
+from core.security import role_required, REPORT_ROLES
 from models.order import Order
-from schemas.order import OrderOut, CreateOrderIn
+from schemas.order import OrderOut, CreateOrderIn, OrderStatusIn
+from routers.ws_orders import websocket_orders as ws_orders_handler, broadcast_order_update
+from services import orders as order_service
+from services.kitchen import publish_order_status
+from services.export import stream_export
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
-connected_clients: List[WebSocket] = []
-
 @router.post("/", response_model=OrderOut)
 async def create_order(payload: CreateOrderIn, db: AsyncSession = Depends(get_db)):
-    db_order = Order(
-        table_id=None,  # Opcional, si viene table_code luego buscar table_id
-        status="pending",
-        total=sum([item.quantity * 0 for item in payload.items])  # calcular total según menú
+    db_order = await order_service.create_order(db, payload)
+    await broadcast_order_update(
+        {"type": "order_created", "order_id": db_order.id, "table_id": db_order.table_id,
+         "status": db_order.status, "total": db_order.total},
+        topics=["role:cocina", "role:mozo"],
     )
-    db.add(db_order)
-    await db.commit()
-    await db.refresh(db_order)
     return db_order
 
 @router.get("/", response_model=List[OrderOut])
-async def get_orders(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Order))
-    orders = result.scalars().all()
-    return orders
+async def get_orders(
+    response: Response,
+    status: Optional[str] = None,
+    table_id: Optional[int] = None,
+    date_from: Optional[datetime.datetime] = None,
+    date_to: Optional[datetime.datetime] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
+    # Más recientes primero: keyset sobre (created_at, id)
+    stmt = select(Order)
+    if status is not None:
+        stmt = stmt.where(Order.status == status)
+    if table_id is not None:
+        stmt = stmt.where(Order.table_id == table_id)
+    if date_from is not None:
+        stmt = stmt.where(Order.created_at >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(Order.created_at < date_to)
+    return await paginate(db, stmt, page, response, keys=[Order.created_at, Order.id], descending=True)
+
+@router.get("/export", dependencies=[Depends(role_required(REPORT_ROLES))])
+async def export_orders(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    status: Optional[str] = None,
+    date_from: Optional[datetime.datetime] = None,
+    date_to: Optional[datetime.datetime] = None,
+):
+    # Historial completo en streaming (cursor del servidor), sin cargarlo en memoria
+    stmt = select(Order.id, Order.created_at, Order.status, Order.table_id, Order.user_id, Order.total)
+    if status is not None:
+        stmt = stmt.where(Order.status == status)
+    if date_from is not None:
+        stmt = stmt.where(Order.created_at >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(Order.created_at < date_to)
+    return stream_export(stmt.order_by(Order.id), format, "orders")
+
+@router.patch("/{order_id}/status", response_model=OrderOut)
+async def update_order_status(order_id: int, payload: OrderStatusIn, db: AsyncSession = Depends(get_db)):
+    db_order = await order_service.set_status(db, order_id, payload.status)
+    # La cola de cocina se actualiza por diff, sin volver a leer el pedido
+    publish_order_status(db_order.id, db_order.status)
+    await broadcast_order_update(
+        {"type": "order_status", "order_id": db_order.id, "table_id": db_order.table_id, "status": db_order.status}
+    )
+    return db_order
 
 # ------------------------
-# WebSocket de pedidos en tiempo real
+# WebSocket de pedidos en tiempo real (mismo canal que /ws/orders)
 @router.websocket("/ws/orders")
 async def websocket_orders(websocket: WebSocket):
-    await websocket.accept()
-    connected_clients.append(websocket)
-    try:
-        while True:
-            data = await websocket.receive_json()
-            for client in connected_clients:
-                if client != websocket:
-                    await client.send_json(data)
-    except Exception:
-        connected_clients.remove(websocket)
+    await ws_orders_handler(websocket)
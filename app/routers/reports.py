@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import datetime
+from db.base import get_db
+from core.security import role_required, REPORT_ROLES
+from services import reports as report_service
+from workers import enqueue
+
+router = APIRouter(prefix="/reports", tags=["reports"], dependencies=[Depends(role_required(REPORT_ROLES))])
+
+# Todos los reportes leen de los agregados por hora (sales_hourly / sales_item_hourly)
+
+@router.get("/sales")
+async def get_sales(
+    date_from: Optional[datetime.datetime] = None,
+    date_to: Optional[datetime.datetime] = None,
+    group: str = Query("hour", pattern="^(hour|day)$"),
+    db: AsyncSession = Depends(get_db),
+):
+    return await report_service.sales_series(db, date_from, date_to, group)
+
+@router.get("/items")
+async def get_top_items(
+    date_from: Optional[datetime.datetime] = None,
+    date_to: Optional[datetime.datetime] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    return await report_service.top_items(db, date_from, date_to, limit)
+
+@router.get("/categories")
+async def get_categories(
+    date_from: Optional[datetime.datetime] = None,
+    date_to: Optional[datetime.datetime] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    return await report_service.by_category(db, date_from, date_to)
+
+@router.get("/tables")
+async def get_tables(
+    date_from: Optional[datetime.datetime] = None,
+    date_to: Optional[datetime.datetime] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    return await report_service.by_table(db, date_from, date_to)
+
+@router.post("/rebuild", status_code=202)
+async def rebuild(
+    date_from: Optional[datetime.datetime] = None,
+    date_to: Optional[datetime.datetime] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    # Se ejecuta en segundo plano; el estado se consulta en /jobs/{id}
+    payload = {
+        "date_from": date_from.isoformat() if date_from else None,
+        "date_to": date_to.isoformat() if date_to else None,
+    }
+    job = await enqueue(db, "rebuild_sales_rollups", payload)
+    return {"job_id": job.id}
@@ -1,26 +1,85 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List
+from typing import List, Optional
+import datetime
 from db.base import get_db
+from core.pagination import PageParams, paginate
+from core.security import role_required, REPORT_ROLES
 from models import reservation as models
 from schemas import reservation as schemas
+from services import reservations as reservation_service
+from services.export import stream_export
+from services.reservation_scheduler import reservation_scheduler, default_auto_cancel_at, AUTO_CANCEL_STATUSES
 
 router = APIRouter(prefix="/reservations", tags=["reservations"])
 
 @router.post("/", response_model=schemas.ReservationOut)
 async def create_reservation(payload: schemas.ReservationIn, db: AsyncSession = Depends(get_db)):
+    await reservation_service.ensure_available(db, payload.table_id, payload.start_at, payload.end_at)
     db_reservation = models.Reservation(**payload.dict())
+    if db_reservation.auto_cancel_at is None:
+        db_reservation.auto_cancel_at = default_auto_cancel_at(payload.start_at)
     db.add(db_reservation)
     await db.commit()
-    await db.refresh(db_reservation)
+    reservation_scheduler.schedule(db_reservation.id, db_reservation.auto_cancel_at)
     return db_reservation
 
 @router.get("/", response_model=List[schemas.ReservationOut])
-async def get_reservations(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(models.Reservation))
-    reservations = result.scalars().all()
-    return reservations
+async def get_reservations(
+    response: Response,
+    table_id: Optional[int] = None,
+    status: Optional[str] = None,
+    window_start: Optional[schemas.LocalDateTime] = None,
+    window_end: Optional[schemas.LocalDateTime] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
+    stmt = select(models.Reservation)
+    if table_id is not None:
+        stmt = stmt.where(models.Reservation.table_id == table_id)
+    if status is not None:
+        stmt = stmt.where(models.Reservation.status == status)
+    # Reservas que se solapan con la ventana [window_start, window_end)
+    if window_start is not None:
+        stmt = stmt.where(models.Reservation.end_at > window_start)
+    if window_end is not None:
+        stmt = stmt.where(models.Reservation.start_at < window_end)
+    return await paginate(
+        db, stmt, page, response,
+        keys=[models.Reservation.start_at, models.Reservation.id],
+    )
+
+@router.get("/export", dependencies=[Depends(role_required(REPORT_ROLES))])
+async def export_reservations(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    status: Optional[str] = None,
+    date_from: Optional[schemas.LocalDateTime] = None,
+    date_to: Optional[schemas.LocalDateTime] = None,
+):
+    stmt = select(
+        models.Reservation.id, models.Reservation.table_id, models.Reservation.start_at,
+        models.Reservation.end_at, models.Reservation.status, models.Reservation.auto_cancel_at,
+    )
+    if status is not None:
+        stmt = stmt.where(models.Reservation.status == status)
+    if date_from is not None:
+        stmt = stmt.where(models.Reservation.start_at >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(models.Reservation.start_at < date_to)
+    return stream_export(stmt.order_by(models.Reservation.id), format, "reservations")
+
+@router.get("/availability", response_model=List[schemas.TableAvailability])
+async def get_availability(
+    window_start: schemas.LocalDateTime,
+    window_end: schemas.LocalDateTime,
+    seats: Optional[int] = None,
+    duration: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    # Huecos libres por mesa; `duration` (minutos) descarta los huecos más cortos
+    min_duration = datetime.timedelta(minutes=duration) if duration else None
+    return await reservation_service.availability(db, window_start, window_end, seats, min_duration)
 
 @router.put("/{reservation_id}", response_model=schemas.ReservationOut)
 async def update_reservation(reservation_id: int, payload: schemas.ReservationIn, db: AsyncSession = Depends(get_db)):
@@ -28,10 +87,35 @@ async def update_reservation(reservation_id: int, payload: schemas.ReservationIn
     db_reservation = result.scalars().first()
     if not db_reservation:
         raise HTTPException(status_code=404, detail="Reservation not found")
+    await reservation_service.ensure_available(
+        db, payload.table_id, payload.start_at, payload.end_at, exclude_id=reservation_id
+    )
     for key, value in payload.dict(exclude_unset=True).items():
         setattr(db_reservation, key, value)
+    if payload.auto_cancel_at is None:
+        db_reservation.auto_cancel_at = default_auto_cancel_at(payload.start_at)
+    await db.commit()
+    if db_reservation.status in AUTO_CANCEL_STATUSES:
+        reservation_scheduler.schedule(db_reservation.id, db_reservation.auto_cancel_at)
+    else:
+        reservation_scheduler.discard(db_reservation.id)
+    return db_reservation
+
+@router.patch("/{reservation_id}/status", response_model=schemas.ReservationOut)
+async def update_reservation_status(reservation_id: int, payload: schemas.ReservationStatusIn, db: AsyncSession = Depends(get_db)):
+    # Check-in/confirmación: una reserva que deja `pending` ya no vence
+    result = await db.execute(
+        select(models.Reservation).where(models.Reservation.id == reservation_id).with_for_update()
+    )
+    db_reservation = result.scalars().first()
+    if not db_reservation:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    db_reservation.status = payload.status
     await db.commit()
-    await db.refresh(db_reservation)
+    if db_reservation.status in AUTO_CANCEL_STATUSES:
+        reservation_scheduler.schedule(db_reservation.id, db_reservation.auto_cancel_at)
+    else:
+        reservation_scheduler.discard(db_reservation.id)
     return db_reservation
 
 @router.delete("/{reservation_id}")
@@ -42,4 +126,5 @@ async def delete_reservation(reservation_id: int, db: AsyncSession = Depends(get
         raise HTTPException(status_code=404, detail="Reservation not found")
     await db.delete(db_reservation)
     await db.commit()
+    reservation_scheduler.discard(reservation_id)
     return {"detail": "Reservation deleted"}
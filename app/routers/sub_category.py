@@ -1,20 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from db.base import get_db
+from core.pagination import PageParams, paginate_rows
 import models.sub_category as models
 import schemas.sub_category as schemas
+from services.menu_cache import menu_cache, serialize_rows, SUB_CATEGORY
+from services.catalog_import import read_rows, validate_rows, bulk_upsert, publish_catalog_reload
 
 router = APIRouter(
     prefix="/sub_categories",
     tags=["sub_categories"],
 )
 
+async def load_sub_category_rows(db: AsyncSession) -> list[dict]:
+    result = await db.execute(select(models.SubCategory).order_by(models.SubCategory.id))
+    return serialize_rows(schemas.SubCategoryOut, result.scalars().all())
+
 @router.get("/", response_model=list[schemas.SubCategoryOut])
-async def get_sub_categories(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(models.SubCategory))
-    sub_categories = result.scalars().all()
-    return sub_categories
+async def get_sub_categories(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+):
+    snapshot = await menu_cache.get(SUB_CATEGORY, load_sub_category_rows)
+    if not page.paginated:
+        return snapshot.response(request)
+    return paginate_rows(snapshot.rows, page, response)
 
 @router.get("/{sub_category_id}", response_model=schemas.SubCategoryOut)
 async def get_sub_category(sub_category_id: int, db: AsyncSession = Depends(get_db)):
@@ -33,9 +45,18 @@ async def create_sub_category(sub_category: schemas.SubCategoryIn, db: AsyncSess
     )
     db.add(db_sub_category)
     await db.commit()
-    await db.refresh(db_sub_category)
+    menu_cache.invalidate(SUB_CATEGORY)
     return db_sub_category
 
+# Importación masiva (array JSON o CSV); upsert por `name` (único)
+@router.post("/bulk")
+async def bulk_upsert_sub_categories(request: Request, db: AsyncSession = Depends(get_db)):
+    items = validate_rows(schemas.SubCategoryIn, await read_rows(request), key="name")
+    result = await bulk_upsert(db, models.SubCategory, items, key="name")
+    menu_cache.invalidate(SUB_CATEGORY)
+    publish_catalog_reload(SUB_CATEGORY, len(items))
+    return result
+
 @router.put("/{sub_category_id}", response_model=schemas.SubCategoryOut)
 async def update_sub_category(sub_category_id: int, sub_category: schemas.SubCategoryUpdate, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(models.SubCategory).where(models.SubCategory.id == sub_category_id))
@@ -46,7 +67,7 @@ async def update_sub_category(sub_category_id: int, sub_category: schemas.SubCat
     for key, value in update_data.items():
         setattr(db_sub_category, key, value)
     await db.commit()
-    await db.refresh(db_sub_category)
+    menu_cache.invalidate(SUB_CATEGORY)
     return db_sub_category
 
 @router.delete("/{sub_category_id}", response_model=schemas.SubCategoryOut)
@@ -57,4 +78,5 @@ async def delete_sub_category(sub_category_id: int, db: AsyncSession = Depends(g
         raise HTTPException(status_code=404, detail="SubCategory not found")
     await db.delete(db_sub_category)
     await db.commit()
+    menu_cache.invalidate(SUB_CATEGORY)
     return db_sub_category
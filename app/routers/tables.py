@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List
+from typing import List, Optional
 from db.base import get_db
+from core.pagination import PageParams, paginate
 from models import table as models
 from schemas import table as schemas
 
@@ -13,14 +14,22 @@ async def create_table(table: schemas.TableOut, db: AsyncSession = Depends(get_d
     db_table = models.Table(**table.dict())
     db.add(db_table)
     await db.commit()
-    await db.refresh(db_table)
     return db_table
 
 @router.get("/", response_model=List[schemas.TableOut])
-async def get_tables(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(models.Table))
-    tables = result.scalars().all()
-    return tables
+async def get_tables(
+    response: Response,
+    active: Optional[bool] = None,
+    min_seats: Optional[int] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
+    stmt = select(models.Table)
+    if active is not None:
+        stmt = stmt.where(models.Table.active == active)
+    if min_seats is not None:
+        stmt = stmt.where(models.Table.seats >= min_seats)
+    return await paginate(db, stmt, page, response, keys=[models.Table.id])
 
 @router.put("/{table_id}", response_model=schemas.TableOut)
 async def update_table(table_id: int, payload: schemas.TableOut, db: AsyncSession = Depends(get_db)):
@@ -31,7 +40,6 @@ async def update_table(table_id: int, payload: schemas.TableOut, db: AsyncSessio
     for key, value in payload.dict(exclude_unset=True).items():
         setattr(db_table, key, value)
     await db.commit()
-    await db.refresh(db_table)
     return db_table
 
 @router.delete("/{table_id}")
@@ -1,28 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from typing import Optional
 from models import User
 from schemas.user import UserFull
 from db.base import get_db
-from core.security import get_current_user
+from core.principal_cache import Principal
+from core.security import get_current_user, invalidate_principal
+from core.pagination import PageParams, paginate
 
 router = APIRouter(prefix="/user", tags=["user"])
 
 @router.get("/", response_model=list[UserFull])
 async def get_user_list(
+    response: Response,
+    role_id: Optional[int] = None,
+    page: PageParams = Depends(),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
-    result = await db.execute(select(User))
-    users = result.scalars().all()
-    return users
+    stmt = select(User)
+    if role_id is not None:
+        stmt = stmt.where(User.role_id == role_id)
+    return await paginate(db, stmt, page, response, keys=[User.id])
 
 
 @router.get("/{user_id}", response_model=UserFull)
 async def get_user(
     user_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalars().first()
@@ -38,7 +45,7 @@ async def update_user(
     user_id: int,
     payload: UserFull,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalars().first()
@@ -53,7 +60,7 @@ async def update_user(
         setattr(user, var, value)
 
     await db.commit()
-    await db.refresh(user)
+    invalidate_principal(user_id)
     return user
 
 
@@ -61,7 +68,7 @@ async def update_user(
 async def delete_user(
     user_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalars().first()
@@ -71,6 +78,7 @@ async def delete_user(
 
     await db.delete(user)
     await db.commit()
+    invalidate_principal(user_id)
 
     # ✅ El código 204 significa “sin contenido”, por lo tanto no es necesario devolver JSON
     return None
\ No newline at end of file
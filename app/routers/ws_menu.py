@@ -1,29 +1,22 @@
 from fastapi import APIRouter, WebSocket
-from typing import List
 from jose import jwt, JWTError
 import os
+from core.ws_manager import manager, encode
+from services.menu_sync import MENU_CHANNEL, publish_menu_event, resync_messages
 
 JWT_SECRET = os.getenv("JWT_SECRET", "secret")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 
 router = APIRouter()
-connected_menu_clients: List[WebSocket] = []
 
 async def broadcast_menu_update(data: dict):
-    for client in list(connected_menu_clients):
-        try:
-            await client.send_json(data)
-        except Exception:
-            try:
-                await client.close()
-            except Exception:
-                pass
-            if client in connected_menu_clients:
-                connected_menu_clients.remove(client)
+    """Cada cambio sale numerado (`epoch`, `version`) hacia todos los workers."""
+    publish_menu_event(data)
 
 @router.websocket("/ws/menu")
 async def websocket_menu(websocket: WebSocket):
     # Token opcional por query param: ?token=<JWT>
+    # Reanudación: ?since=<version>&epoch=<epoch> (valores del último mensaje recibido)
     token = websocket.query_params.get("token")
     if token:
         try:
@@ -35,15 +28,20 @@ async def websocket_menu(websocket: WebSocket):
             await websocket.close(code=4401)
             return
 
-    await websocket.accept()
-    connected_menu_clients.append(websocket)
+    since = websocket.query_params.get("since")
+    conn = await manager.connect(websocket, MENU_CHANNEL)
     try:
+        messages = await resync_messages(
+            int(since) if since and since.isdigit() else None,
+            websocket.query_params.get("epoch"),
+        )
+        for message in messages:
+            conn.send(encode(message))
         while True:
             data = await websocket.receive_json()
             # echo/broadcast de mensajes entrantes
-            for client in connected_menu_clients:
-                if client != websocket:
-                    await client.send_json(data)
+            await manager.broadcast(MENU_CHANNEL, data, exclude=conn)
     except Exception:
-        if websocket in connected_menu_clients:
-            connected_menu_clients.remove(websocket)
\ No newline at end of file
+        pass
+    finally:
+        manager.disconnect(conn)
@@ -1,20 +1,112 @@
 # app/routers/ws_orders.py
+import re
+from typing import Iterable, List, Optional
 from fastapi import APIRouter, WebSocket
-from typing import List
+from jose import jwt, JWTError
+from core.security import JWT_SECRET, JWT_ALGORITHM, ROLE_NAMES, EMPLOYEE_ROLES
+from core.ws_manager import manager, encode
 
 router = APIRouter()
-connected_clients: List[WebSocket] = []
+ORDERS_CHANNEL = "orders"
+
+# Tópicos: table:<id>, order:<id>, station:<nombre>, role:<nombre> y "all"
+# ("all" = todo el tráfico; personal con clientes antiguos que no se suscriben a nada)
+ALL_TOPIC = "all"
+TOPIC_RE = re.compile(r"^(table|order|station|role):[\w-]+$")
+ADMIN_ROLE = 1
+
+def can_subscribe(role_id: Optional[int], topic: str) -> bool:
+    """El rol sale del JWT del handshake (None = sin token).
+
+    - `all` y `station:*`: solo personal.
+    - `role:*`: solo el propio rol (admin, cualquiera).
+    - `table:*` / `order:*`: cualquier usuario con token.
+    """
+    if topic == ALL_TOPIC:
+        return role_id in EMPLOYEE_ROLES
+    if not TOPIC_RE.match(topic):
+        return False
+    if topic.startswith("role:"):
+        return role_id == ADMIN_ROLE or topic == f"role:{ROLE_NAMES.get(role_id)}"
+    if topic.startswith("station:"):
+        return role_id in EMPLOYEE_ROLES
+    return role_id is not None
+
+def message_topics(data: dict, role_id: Optional[int] = None) -> List[str]:
+    """Tópicos de un mensaje de pedido: por order_id/table_id/station y los `topics` explícitos."""
+    topics = {ALL_TOPIC}
+    if data.get("order_id") is not None:
+        topics.add(f"order:{data['order_id']}")
+    if data.get("table_id") is not None:
+        topics.add(f"table:{data['table_id']}")
+    if data.get("station"):
+        topics.add(f"station:{data['station']}")
+    for topic in data.get("topics") or ():
+        if not isinstance(topic, str) or not TOPIC_RE.match(topic):
+            continue
+        # Solo el personal puede publicar hacia un rol
+        if topic.startswith("role:") and role_id not in EMPLOYEE_ROLES:
+            continue
+        topics.add(topic)
+    return list(topics)
+
+async def broadcast_order_update(data: dict, topics: Iterable[str] = ()):
+    """Publica un evento de pedido generado por el servidor."""
+    await manager.publish(set(message_topics(data, ADMIN_ROLE)) | set(topics), data)
+
+def _subscribe(conn, topics) -> List[str]:
+    denied = []
+    for topic in topics:
+        if isinstance(topic, str) and can_subscribe(conn.role_id, topic):
+            manager.subscribe(conn, topic)
+        else:
+            denied.append(topic)
+    # Al suscribirse a algo concreto deja de recibir el tráfico completo
+    if ALL_TOPIC not in topics and len(conn.topics) > 1:
+        manager.unsubscribe(conn, ALL_TOPIC)
+    return denied
 
 @router.websocket("/ws/orders")
 async def websocket_orders(websocket: WebSocket):
-    await websocket.accept()
-    connected_clients.append(websocket)
+    # Token por query param: ?token=<JWT>&topics=table:3,order:7
+    # Sin token no hay ningún tópico al que suscribirse: se rechaza el handshake
+    token = websocket.query_params.get("token")
+    if not token:
+        await websocket.close(code=4401)
+        return
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        role_id = payload.get("role")
+    except JWTError:
+        await websocket.close(code=4401)
+        return
+
+    conn = await manager.connect(websocket, ORDERS_CHANNEL)
+    conn.role_id = role_id
+    topics = [t for t in websocket.query_params.get("topics", "").split(",") if t]
+    # Personal sin tópicos explícitos (clientes antiguos): todo el tráfico
+    if not topics and role_id in EMPLOYEE_ROLES:
+        topics = [ALL_TOPIC]
+    if role_id in ROLE_NAMES:
+        topics.append(f"role:{ROLE_NAMES[role_id]}")
+    _subscribe(conn, topics)
     try:
         while True:
             data = await websocket.receive_json()
-            # data: {"order_id": 1, "status": "preparing"}
-            for client in connected_clients:
-                if client != websocket:
-                    await client.send_json(data)
+            if not isinstance(data, dict):
+                continue
+            action = data.get("action")
+            if action == "subscribe":
+                denied = _subscribe(conn, data.get("topics") or [])
+                conn.send(encode({"type": "subscribed", "topics": sorted(conn.topics), "denied": denied}))
+            elif action == "unsubscribe":
+                for topic in data.get("topics") or []:
+                    manager.unsubscribe(conn, topic)
+                conn.send(encode({"type": "subscribed", "topics": sorted(conn.topics), "denied": []}))
+            elif conn.role_id in EMPLOYEE_ROLES:
+                # Solo el personal publica: {"order_id": 1, "table_id": 3, "status": "preparing"}
+                await manager.publish(message_topics(data, conn.role_id), data, exclude=conn)
     except Exception:
-        connected_clients.remove(websocket)
+        pass
+    finally:
+        manager.disconnect(conn)
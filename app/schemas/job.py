@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Any, Optional
+import datetime
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    status: str
+    attempts: int
+    max_attempts: int
+    run_after: Optional[datetime.datetime]
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime.datetime
+    updated_at: Optional[datetime.datetime]
+
+    class Config:
+        orm_mode = True
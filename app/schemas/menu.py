@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 class MenuItemIn(BaseModel):
     name: str
@@ -22,6 +22,24 @@ class MenuItemUpdate(BaseModel):
 class MenuItemCreate(MenuItemIn):
     pass
 
+class MenuItemBulkIn(BaseModel):
+    # Con `id` existente actualiza esa fila; si no, inserta
+    id: Optional[int] = None
+    name: str
+    description: Optional[str] = None
+    price: float
+    category: Optional[str] = None
+    amount: Optional[int] = 0
+    available: Optional[bool] = True
+    image_url: Optional[str] = None
+
+class MenuAvailabilityIn(BaseModel):
+    # Ítems por `ids` o una `category` completa
+    ids: Optional[List[int]] = None
+    category: Optional[str] = None
+    available: Optional[bool] = None
+    amount: Optional[int] = Field(None, ge=0)
+
 class MenuItemOut(BaseModel):
     id: int
     name: str
@@ -34,3 +52,6 @@ class MenuItemOut(BaseModel):
 
     class Config:
         orm_mode = True
+
+class MenuSearchHit(MenuItemOut):
+    score: float  # relevancia 0..1 (fracción ponderada de trigramas de la consulta)
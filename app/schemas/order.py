@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
 import datetime
 
 class OrderItemIn(BaseModel):
@@ -14,6 +14,11 @@ class CreateOrderIn(BaseModel):
     guest_phone: Optional[str]
     delivery_address: Optional[str]
 
+OrderStatus = Literal["pending", "in_progress", "ready", "delivered", "paid", "cancelled"]
+
+class OrderStatusIn(BaseModel):
+    status: OrderStatus
+
 class OrderOut(BaseModel):
     id: int
     status: str
@@ -1,10 +1,23 @@
-from pydantic import BaseModel
+from pydantic import AfterValidator, BaseModel
+from typing import Annotated, List, Literal, Optional
 import datetime
+from core.timezone import to_local
+
+# Fecha en hora local naive del restaurante: las que traen offset se convierten
+LocalDateTime = Annotated[datetime.datetime, AfterValidator(to_local)]
 
 class ReservationIn(BaseModel):
     table_id: int
-    start_at: datetime.datetime
-    end_at: datetime.datetime
+    start_at: LocalDateTime
+    end_at: LocalDateTime
+    # Por defecto start_at + RESERVATION_GRACE_MINUTES
+    auto_cancel_at: Optional[LocalDateTime] = None
+
+# pending -> confirmed/seated (check-in) -> completed; cancelled/no_show liberan la mesa
+ReservationStatus = Literal["pending", "confirmed", "seated", "completed", "cancelled", "no_show"]
+
+class ReservationStatusIn(BaseModel):
+    status: ReservationStatus
 
 class ReservationOut(BaseModel):
     id: int
@@ -12,6 +25,17 @@ class ReservationOut(BaseModel):
     start_at: datetime.datetime
     end_at: datetime.datetime
     status: str
+    auto_cancel_at: Optional[datetime.datetime] = None
 
     class Config:
         orm_mode = True
+
+class FreeSlot(BaseModel):
+    start_at: datetime.datetime
+    end_at: datetime.datetime
+
+class TableAvailability(BaseModel):
+    table_id: int
+    code: Optional[str]
+    seats: Optional[int]
+    free: List[FreeSlot]
@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+import os
+from typing import List, Type
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from services.menu_sync import publish_menu_event
+
+# Máximo de filas por importación
+BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS", "5000"))
+
+
+def _parse_csv(text: str) -> List[dict]:
+    # Celdas vacías = campo no enviado (toma el default del esquema)
+    return [{k: v for k, v in row.items() if k and v not in ("", None)} for row in csv.DictReader(io.StringIO(text))]
+
+
+def _parse_json(raw: bytes) -> list:
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(data, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array")
+    return data
+
+
+async def read_rows(request: Request) -> list:
+    """Filas del body: array JSON, CSV (`text/csv`) o archivo `file` en multipart (.csv o .json)."""
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Missing file")
+        raw = await upload.read()
+        is_csv = (upload.filename or "").lower().endswith(".csv") or "csv" in (upload.content_type or "")
+    else:
+        raw = await request.body()
+        is_csv = "csv" in content_type
+    rows = _parse_csv(raw.decode("utf-8-sig")) if is_csv else _parse_json(raw)
+    if not rows:
+        raise HTTPException(status_code=400, detail="No rows to import")
+    if len(rows) > BULK_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"Too many rows (max {BULK_MAX_ROWS})")
+    return rows
+
+
+def validate_rows(schema: Type[BaseModel], rows: list, key: str) -> List[BaseModel]:
+    """Valida todas las filas antes de tocar la DB; 422 con los errores de cada fila."""
+    items, errors, seen = [], [], set()
+    for index, row in enumerate(rows):
+        try:
+            item = schema.model_validate(row)
+        except ValidationError as exc:
+            errors.append({"row": index, "errors": exc.errors(include_url=False, include_context=False)})
+            continue
+        value = getattr(item, key, None)
+        if value is not None:
+            if value in seen:
+                errors.append({"row": index, "errors": [{"loc": [key], "msg": f"Duplicated {key} in payload"}]})
+            seen.add(value)
+        items.append(item)
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+    return items
+
+
+async def bulk_upsert(db: AsyncSession, model, items: List[BaseModel], key: str = "id") -> dict:
+    """Inserta o actualiza por `key` (id o una columna única) en una transacción.
+
+    Una consulta para saber qué filas existen, un UPDATE y un INSERT
+    ejecutados como executemany; los campos no enviados no se tocan al actualizar.
+    """
+    key_column = getattr(model, key)
+    keys = [getattr(i, key) for i in items if getattr(i, key, None) is not None]
+    existing = {}
+    if keys:
+        result = await db.execute(select(key_column, model.id).where(key_column.in_(keys)))
+        existing = {k: pk for k, pk in result.all()}
+
+    updates, inserts = [], []
+    for item in items:
+        pk = existing.get(getattr(item, key, None))
+        if pk is not None:
+            updates.append({**item.model_dump(exclude_unset=True), "id": pk})
+        else:
+            row = item.model_dump()
+            if row.get("id") is None:
+                row.pop("id", None)
+            inserts.append(row)
+
+    if updates:
+        await db.execute(update(model), updates)  # UPDATE por clave primaria, executemany
+    if inserts:
+        await db.execute(insert(model), inserts)
+    await db.commit()
+    return {"inserted": len(inserts), "updated": len(updates)}
+
+
+def publish_catalog_reload(resource: str, count: int):
+    """Un solo evento por importación: los clientes vuelven a pedir el recurso (con ETag)."""
+    publish_menu_event({"type": "catalog_reloaded", "resource": resource, "count": count})
@@ -0,0 +1,65 @@
+import csv
+import datetime
+import io
+import json
+import os
+from typing import AsyncIterator, Sequence
+
+from fastapi.responses import StreamingResponse
+from db.base import AsyncSessionLocal
+
+# Filas que el cursor del servidor entrega por lote (y que se escriben por chunk)
+EXPORT_CHUNK = int(os.getenv("EXPORT_CHUNK", "1000"))
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _value(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+async def _rows(stmt) -> AsyncIterator[Sequence]:
+    # Sesión propia: la del request (`get_db`) se cierra antes de terminar el stream
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(stmt.execution_options(yield_per=EXPORT_CHUNK))
+        async for partition in result.partitions():
+            yield partition
+
+
+async def _csv(stmt, columns: Sequence[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for partition in _rows(stmt):
+        writer.writerows([_value(v) for v in row] for row in partition)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def _ndjson(stmt, columns: Sequence[str]) -> AsyncIterator[bytes]:
+    async for partition in _rows(stmt):
+        yield "".join(
+            json.dumps(dict(zip(columns, map(_value, row))), separators=(",", ":"), ensure_ascii=False) + "\n"
+            for row in partition
+        ).encode()
+
+
+def stream_export(stmt, fmt: str, name: str) -> StreamingResponse:
+    """Respuesta en streaming de un `select` de columnas, en CSV o NDJSON.
+
+    La memoria queda acotada a un lote de `EXPORT_CHUNK` filas sin importar
+    cuántas devuelva la consulta.
+    """
+    columns = [c.name for c in stmt.selected_columns]
+    body = _csv(stmt, columns) if fmt == "csv" else _ndjson(stmt, columns)
+    filename = f"{name}-{datetime.date.today().isoformat()}.{fmt}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
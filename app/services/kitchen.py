@@ -0,0 +1,162 @@
+import json
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from core.pubsub import hub
+from core.ws_manager import manager, encode
+from db.session import primary_session
+from models.menu import MenuItem
+from models.order import Order, OrderItem
+from services.menu_cache import Snapshot
+
+# Estados en los que un pedido sigue en la pantalla de cocina
+LIVE_STATUSES = ("pending", "in_progress")
+DEFAULT_STATION = "general"
+# Canal del hub: cada worker aplica los cambios a su propia cola
+KITCHEN_EVENTS = "kitchen_events"
+
+
+def station_of(category) -> str:
+    return category or DEFAULT_STATION
+
+
+class KitchenQueue:
+    """Ítems pendientes por estación, en orden de llegada (el más antiguo primero).
+
+    Cada estación es un dict "<order_id>:<línea>" -> ítem: inserción, borrado
+    y recorrido en orden de antigüedad en O(1)/O(n) sin reordenar. El JSON de
+    cada estación se cachea hasta el siguiente cambio.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.stations: Dict[str, Dict[str, dict]] = {}
+        self._by_order: Dict[int, List[Tuple[str, str]]] = {}
+        self._snapshots: Dict[str, Snapshot] = {}
+
+    def clear(self):
+        self.stations.clear()
+        self._by_order.clear()
+        self._snapshots.clear()
+        self.version += 1
+
+    def add(self, items: Iterable[dict]) -> Dict[str, List[dict]]:
+        added: Dict[str, List[dict]] = {}
+        for item in items:
+            station = item["station"]
+            self.stations.setdefault(station, {})[item["id"]] = item
+            self._by_order.setdefault(item["order_id"], []).append((station, item["id"]))
+            added.setdefault(station, []).append(item)
+        self._touch(added)
+        return added
+
+    def set_status(self, order_id: int, status: str) -> Dict[str, List[str]]:
+        """Actualiza o retira los ítems del pedido; devuelve estación -> ids afectados."""
+        affected: Dict[str, List[str]] = {}
+        refs = self._by_order.get(order_id, [])
+        for station, item_id in refs:
+            items = self.stations.get(station, {})
+            if status in LIVE_STATUSES:
+                if item_id in items:
+                    items[item_id]["status"] = status
+            else:
+                items.pop(item_id, None)
+            affected.setdefault(station, []).append(item_id)
+        if status not in LIVE_STATUSES:
+            self._by_order.pop(order_id, None)
+        self._touch(affected)
+        return affected
+
+    def _touch(self, stations):
+        if stations:
+            self.version += 1
+            for station in stations:
+                self._snapshots.pop(station, None)
+
+    def snapshot(self, station: str) -> Snapshot:
+        snapshot = self._snapshots.get(station)
+        if snapshot is None:
+            rows = list(self.stations.get(station, {}).values())
+            snapshot = self._snapshots[station] = Snapshot(self.version, rows)
+        return snapshot
+
+    def summary(self) -> dict:
+        return {station: len(items) for station, items in self.stations.items()}
+
+
+kitchen_queue = KitchenQueue()
+
+
+def item_row(order: Order, line: int, menu_item_id: int, quantity: int, notes, name, category) -> dict:
+    return {
+        "id": f"{order.id}:{line}",
+        "order_id": order.id,
+        "table_id": order.table_id,
+        "menu_item_id": menu_item_id,
+        "name": name,
+        "station": station_of(category),
+        "quantity": quantity,
+        "notes": notes,
+        "status": order.status,
+        "created_at": order.created_at.isoformat() if order.created_at else None,
+    }
+
+
+async def load_kitchen_queue(db: AsyncSession):
+    """Reconstruye la cola desde la DB (arranque del worker)."""
+    result = await db.execute(
+        select(Order, OrderItem.menu_item_id, OrderItem.quantity, OrderItem.notes, MenuItem.name, MenuItem.category)
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .outerjoin(MenuItem, OrderItem.menu_item_id == MenuItem.id)
+        .where(Order.status.in_(LIVE_STATUSES))
+        .order_by(Order.created_at, Order.id, OrderItem.id)
+    )
+    rows, lines = [], {}
+    for order, *fields in result.all():
+        # Mismo número de línea que al crear el pedido (líneas insertadas en orden)
+        line = lines[order.id] = lines.get(order.id, -1) + 1
+        rows.append(item_row(order, line, *fields))
+    kitchen_queue.clear()
+    kitchen_queue.add(rows)
+
+
+# --- eventos ---
+def _on_kitchen_event(text: str):
+    event = json.loads(text)
+    if event["type"] == "order_added":
+        for station, items in kitchen_queue.add(event["items"]).items():
+            manager.publish_local([f"station:{station}"], {
+                "type": "kitchen_added", "station": station, "version": kitchen_queue.version, "items": items,
+            })
+    elif event["type"] == "order_status":
+        for station, item_ids in kitchen_queue.set_status(event["order_id"], event["status"]).items():
+            removed = event["status"] not in LIVE_STATUSES
+            manager.publish_local([f"station:{station}"], {
+                "type": "kitchen_removed" if removed else "kitchen_status",
+                "station": station, "version": kitchen_queue.version,
+                "order_id": event["order_id"], "status": event["status"], "item_ids": item_ids,
+            })
+
+hub.subscribe(KITCHEN_EVENTS, _on_kitchen_event)
+
+
+async def _resync_kitchen():
+    """Recarga la cola tras reconectar al broker (pudo perder eventos) y avisa a las pantallas."""
+    stations = set(kitchen_queue.stations)
+    async with primary_session() as session:
+        await load_kitchen_queue(session)
+    for station in stations | set(kitchen_queue.stations):
+        manager.publish_local([f"station:{station}"], {
+            "type": "kitchen_reloaded", "station": station, "version": kitchen_queue.version,
+        })
+
+hub.on_resync(_resync_kitchen)
+
+
+def publish_order_added(items: List[dict]):
+    hub.publish(KITCHEN_EVENTS, encode({"type": "order_added", "items": items}))
+
+
+def publish_order_status(order_id: int, status: str):
+    hub.publish(KITCHEN_EVENTS, encode({"type": "order_status", "order_id": order_id, "status": status}))
@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import json
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.pubsub import hub
+from db.session import primary_session
+
+# Claves de los snapshots cacheados
+MENU = "menu"
+CATEGORY = "category"
+SUB_CATEGORY = "sub_category"
+
+# Canal para propagar invalidaciones al resto de workers
+CACHE_CHANNEL = "menu_cache"
+
+
+def serialize_rows(schema, objs) -> List[dict]:
+    """Convierte filas ORM a dicts con el mismo esquema que usaría `response_model`."""
+    return [schema.model_validate(o, from_attributes=True).model_dump() for o in objs]
+
+
+class Snapshot:
+    """Filas ya serializadas de un recurso + el JSON pre-codificado listo para enviar.
+
+    La ETag es un hash del cuerpo, no de `version`: la versión es un contador
+    por proceso y dos workers (o un reinicio) podrían repetirla con otro contenido.
+    """
+
+    __slots__ = ("version", "rows", "body", "etag")
+
+    def __init__(self, version: int, rows: List[dict]):
+        self.version = version
+        self.rows = rows
+        self.body = json.dumps(rows, separators=(",", ":"), ensure_ascii=False).encode()
+        self.etag = f'"{hashlib.blake2b(self.body, digest_size=16).hexdigest()}"'
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return self.etag in tags or "*" in tags
+
+    def response(self, request: Request) -> Response:
+        if self.matches(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers={"ETag": self.etag})
+        return Response(content=self.body, media_type="application/json", headers={"ETag": self.etag})
+
+
+class SnapshotCache:
+    """Cache en memoria del catálogo (menú, categorías, subcategorías).
+
+    Cada invalidación incrementa `version`; un snapshot cargado mientras
+    ocurría una escritura se descarta para no volver a cachear datos viejos.
+    El loader recibe siempre una sesión del primario: un snapshot leído de la
+    réplica podría quedar cacheado sin la escritura que lo invalidó.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._entries: Dict[str, Snapshot] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def get(self, key: str, loader: Callable[[AsyncSession], Awaitable[list]]) -> Snapshot:
+        snapshot = self._entries.get(key)
+        if snapshot is not None:
+            return snapshot
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            snapshot = self._entries.get(key)
+            if snapshot is not None:
+                return snapshot
+            version = self.version
+            async with primary_session() as session:
+                rows = await loader(session)
+            snapshot = Snapshot(version, jsonable_encoder(rows))
+            if version == self.version:
+                self._entries[key] = snapshot
+            return snapshot
+
+    def peek(self, key: str) -> Optional[Snapshot]:
+        return self._entries.get(key)
+
+    def invalidate(self, *keys: str):
+        self._invalidate_local(*keys)
+        hub.publish(CACHE_CHANNEL, ",".join(keys), local=False)
+
+    def _invalidate_local(self, *keys: str):
+        self.version += 1
+        for key in keys or list(self._entries):
+            self._entries.pop(key, None)
+
+
+menu_cache = SnapshotCache()
+hub.subscribe(CACHE_CHANNEL, lambda text: menu_cache._invalidate_local(*filter(None, text.split(","))))
+# Sin TTL: tras una desconexión del broker pudo perderse alguna invalidación
+hub.on_resync(menu_cache._invalidate_local)
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import os
+import re
+import unicodedata
+from typing import Dict, List, Optional, Set
+
+from core.pubsub import hub
+from services.menu_cache import MENU
+from services.menu_sync import MENU_EVENTS, get_menu_snapshot
+
+# Fracción mínima de trigramas de la consulta que debe tener un ítem para aparecer
+SEARCH_MIN_SIMILARITY = float(os.getenv("SEARCH_MIN_SIMILARITY", "0.4"))
+# Peso de cada campo en la relevancia (un trigrama cuenta con el del mejor campo)
+FIELD_WEIGHTS = {"name": 3.0, "category": 2.0, "description": 1.0}
+# Los ítems no disponibles siguen apareciendo, pero por debajo de un disponible igual de relevante
+UNAVAILABLE_FACTOR = 0.8
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: Optional[str]) -> List[str]:
+    """Minúsculas, sin tildes y partido en palabras: "Ají de Gallina" -> ["aji", "de", "gallina"]."""
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", text.lower())
+    return _WORD_RE.findall("".join(c for c in text if not unicodedata.combining(c)))
+
+
+def trigrams(word: str, prefix: bool = False) -> Set[str]:
+    """Trigramas con relleno al estilo pg_trgm ("  w", " wo", ..., "rd ").
+
+    Con `prefix` se omite el relleno final: la última palabra de la consulta
+    puede estar a medio escribir ("chic" encuentra "chicha").
+    """
+    padded = f"  {word}" if prefix else f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class MenuSearchIndex:
+    """Índice invertido trigrama -> {item_id: peso} sobre nombre, categoría y descripción.
+
+    Se construye perezosamente desde el snapshot del menú en la primera
+    búsqueda y se mantiene con los eventos de menú (`menu_created`,
+    `menu_updated`, `menu_deleted`, `menu_items_updated`); un
+    `catalog_reloaded` lo marca para reconstruir en la siguiente búsqueda.
+    Buscar solo recorre las listas de los trigramas de la consulta.
+    """
+
+    def __init__(self):
+        self.rows: Optional[Dict[int, dict]] = None  # None = sin construir o invalidado
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._grams: Dict[int, Dict[str, float]] = {}
+        self._pending: Optional[List[dict]] = None  # eventos recibidos durante una reconstrucción
+        self._lock = asyncio.Lock()
+
+    # --- mantenimiento ---
+    def _weights(self, row: dict) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for word in normalize(row.get(field)):
+                for gram in trigrams(word):
+                    if weights.get(gram, 0) < weight:
+                        weights[gram] = weight
+        return weights
+
+    def _index(self, row: dict):
+        item_id = row["id"]
+        self._unindex(item_id)
+        self.rows[item_id] = row
+        grams = self._grams[item_id] = self._weights(row)
+        for gram, weight in grams.items():
+            self._postings.setdefault(gram, {})[item_id] = weight
+
+    def _unindex(self, item_id: int):
+        for gram in self._grams.pop(item_id, ()):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.pop(item_id, None)
+                if not posting:
+                    del self._postings[gram]
+        self.rows.pop(item_id, None)
+
+    def rebuild(self, rows: List[dict]):
+        self.rows, self._postings, self._grams = {}, {}, {}
+        for row in rows:
+            self._index(dict(row))
+
+    def apply(self, event: dict):
+        """Aplica un evento de menú; repetirlo es inocuo (cada uno lleva el estado final)."""
+        if self._pending is not None:
+            self._pending.append(event)
+        if self.rows is None:
+            return
+        kind = event.get("type")
+        if kind in ("menu_created", "menu_updated"):
+            item = event["item"]
+            self._index({**self.rows.get(item["id"], {}), **item})
+        elif kind == "menu_items_updated":
+            for item in event["items"]:
+                row = self.rows.get(item["id"])
+                if row is not None:
+                    # Solo cambian stock/disponibilidad: los trigramas siguen igual
+                    row.update(item)
+        elif kind == "menu_deleted":
+            self._unindex(event["item_id"])
+        elif kind == "catalog_reloaded" and event.get("resource") == MENU:
+            self.rows = None
+
+    async def ensure(self):
+        if self.rows is not None:
+            return
+        async with self._lock:
+            if self.rows is not None:
+                return
+            self._pending = []
+            try:
+                # Del cache del menú, que siempre carga desde el primario
+                snapshot = await get_menu_snapshot()
+                self.rebuild(snapshot.rows)
+                # Cambios publicados mientras se leía el snapshot
+                pending, self._pending = self._pending, None
+                for event in pending:
+                    self.apply(event)
+            finally:
+                self._pending = None
+
+    # --- consulta ---
+    def search(self, query: str, limit: int = 20, available: Optional[bool] = None) -> List[dict]:
+        words = normalize(query)
+        if not words or self.rows is None:
+            return []
+        grams: Set[str] = set()
+        for n, word in enumerate(words):
+            grams |= trigrams(word, prefix=n == len(words) - 1)
+
+        hits: Dict[int, int] = {}
+        scores: Dict[int, float] = {}
+        for gram in grams:
+            for item_id, weight in self._postings.get(gram, {}).items():
+                hits[item_id] = hits.get(item_id, 0) + 1
+                scores[item_id] = scores.get(item_id, 0.0) + weight
+
+        top_weight = max(FIELD_WEIGHTS.values())
+        results = []
+        for item_id, count in hits.items():
+            if count / len(grams) < SEARCH_MIN_SIMILARITY:
+                continue
+            row = self.rows[item_id]
+            if available is not None and bool(row.get("available")) != available:
+                continue
+            score = round(scores[item_id] / (len(grams) * top_weight), 4)
+            rank = score if row.get("available") else score * UNAVAILABLE_FACTOR
+            results.append((rank, score, row))
+
+        results.sort(key=lambda r: (-r[0], r[2]["id"]))
+        return [{**row, "score": score} for _, score, row in results[:limit]]
+
+
+menu_search = MenuSearchIndex()
+
+
+def _on_menu_event(text: str):
+    menu_search.apply(json.loads(text))
+
+hub.subscribe(MENU_EVENTS, _on_menu_event)
@@ -0,0 +1,104 @@
+import json
+import os
+import uuid
+from collections import deque
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from core.pubsub import hub
+from core.ws_manager import manager, encode
+from models import menu as models
+from schemas import menu as schemas
+from services.menu_cache import menu_cache, serialize_rows, MENU, Snapshot
+
+MENU_CHANNEL = "menu"
+# Canal del hub: cada worker numera los cambios de menú en su propio log
+MENU_EVENTS = "menu_events"
+MENU_DELTA_BUFFER = int(os.getenv("MENU_DELTA_BUFFER", "256"))
+
+
+class DeltaLog:
+    """Versión monótona + ring buffer de los últimos cambios de menú.
+
+    `epoch` identifica el proceso: un cliente que vuelve con un `since` de
+    otro epoch (otro worker o un reinicio) recibe el snapshot completo.
+    """
+
+    def __init__(self, size: int = MENU_DELTA_BUFFER):
+        self.epoch = uuid.uuid4().hex[:12]
+        self.version = 0
+        self._buffer: deque = deque(maxlen=size)
+
+    def append(self, event: dict) -> dict:
+        self.version += 1
+        delta = {**event, "epoch": self.epoch, "version": self.version}
+        self._buffer.append(delta)
+        return delta
+
+    def since(self, version: int) -> Optional[List[dict]]:
+        """Deltas posteriores a `version`, o None si el buffer ya no cubre el hueco."""
+        if version > self.version:
+            return None
+        if version == self.version:
+            return []
+        if not self._buffer or self._buffer[0]["version"] > version + 1:
+            return None
+        return [d for d in self._buffer if d["version"] > version]
+
+
+delta_log = DeltaLog()
+
+
+def _on_menu_event(text: str):
+    delta = delta_log.append(json.loads(text))
+    manager.broadcast_local(MENU_CHANNEL, delta)
+
+hub.subscribe(MENU_EVENTS, _on_menu_event)
+
+
+def _resync_menu_clients():
+    """Tras reconectar al broker los deltas pudieron tener huecos: los sockets
+    de menú (y el índice de búsqueda) reciben un `catalog_reloaded` local y
+    vuelven a pedir el menú."""
+    hub.publish_local(MENU_EVENTS, encode({"type": "catalog_reloaded", "resource": MENU}))
+
+hub.on_resync(_resync_menu_clients)
+
+
+def publish_menu_event(event: dict):
+    """Numera el cambio y lo envía a los sockets de menú de todos los workers."""
+    hub.publish(MENU_EVENTS, encode(event))
+
+
+async def load_menu_rows(db: AsyncSession) -> List[dict]:
+    result = await db.execute(select(models.MenuItem).order_by(models.MenuItem.id))
+    return serialize_rows(schemas.MenuItemOut, result.scalars().all())
+
+
+async def get_menu_snapshot() -> Snapshot:
+    return await menu_cache.get(MENU, load_menu_rows)
+
+
+async def resync_messages(since: Optional[int], epoch: Optional[str]) -> List[dict]:
+    """Mensajes iniciales para un cliente de /ws/menu.
+
+    Sin `since` solo se informa la versión actual. Con `since` se devuelven
+    los deltas perdidos o, si el hueco ya no está en el buffer, un snapshot.
+    Se llama con la conexión ya registrada: un delta que llegue mientras se
+    carga el snapshot se vuelve a enviar detrás de él (aplicarlo dos veces es
+    inocuo porque cada delta lleva el ítem completo o su id).
+    """
+    hello = {"type": "menu_hello", "epoch": delta_log.epoch, "version": delta_log.version}
+    if since is None:
+        return [hello]
+    if epoch in (None, delta_log.epoch):
+        deltas = delta_log.since(since)
+        if deltas is not None:
+            return [hello] + deltas
+
+    version = delta_log.version
+    snapshot = await get_menu_snapshot()
+    # Los cambios ocurridos mientras se cargaba el snapshot se reenvían detrás
+    missed = delta_log.since(version) or []
+    return [{"type": "menu_snapshot", "epoch": delta_log.epoch, "version": version, "data": snapshot.rows}] + missed
@@ -0,0 +1,148 @@
+import os
+from collections import Counter
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import case, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from models.menu import MenuItem
+from models.order import Order, OrderItem
+from models.table import Table
+from schemas.order import CreateOrderIn
+from services.menu_cache import menu_cache, MENU
+from services.menu_sync import publish_menu_event
+from services.kitchen import item_row, publish_order_added
+from services.reports import record_status_change
+
+# Descontar MenuItem.amount al crear pedidos (rechaza si no hay stock suficiente).
+# Opcional: los ítems se crean con amount=0, así que solo tiene sentido si se carga el stock real.
+ENFORCE_STOCK = os.getenv("ENFORCE_STOCK", "false").lower() == "true"
+
+
+async def reserve_stock(db: AsyncSession, quantities: Counter) -> list:
+    """Descuenta el stock de todas las líneas con un único UPDATE condicional.
+
+    `UPDATE ... SET amount = amount - q WHERE id IN (...) AND amount >= q`:
+    si alguna fila no cumple la condición el pedido se rechaza, sin
+    lecturas previas que puedan quedar obsoletas bajo concurrencia.
+    Devuelve los ítems que quedaron en cero (ya marcados no disponibles).
+    """
+    needed = case(dict(quantities), value=MenuItem.id)
+    result = await db.execute(
+        update(MenuItem)
+        .where(MenuItem.id.in_(quantities.keys()), MenuItem.amount >= needed)
+        .values(amount=MenuItem.amount - needed)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(quantities):
+        await db.rollback()
+        result = await db.execute(
+            select(MenuItem.id, MenuItem.amount).where(MenuItem.id.in_(quantities.keys()))
+        )
+        short = sorted(row.id for row in result if (row.amount or 0) < quantities[row.id])
+        raise HTTPException(status_code=409, detail=f"Insufficient stock for menu items: {short}")
+
+    result = await db.execute(
+        select(MenuItem.id).where(MenuItem.id.in_(quantities.keys()), MenuItem.amount <= 0)
+    )
+    sold_out = list(result.scalars().all())
+    if sold_out:
+        await db.execute(
+            update(MenuItem)
+            .where(MenuItem.id.in_(sold_out))
+            .values(available=False)
+            .execution_options(synchronize_session=False)
+        )
+    return sold_out
+
+
+async def create_order(db: AsyncSession, payload: CreateOrderIn, user_id: Optional[int] = None) -> Order:
+    """Crea el pedido y sus líneas en una sola transacción.
+
+    Número fijo de round-trips sin importar cuántas líneas tenga el pedido:
+    mesa, precios (un `IN (...)`), reserva de stock, INSERT del pedido e
+    INSERT masivo de líneas.
+    """
+    if not payload.items:
+        raise HTTPException(status_code=400, detail="Order has no items")
+
+    table_id = None
+    if payload.table_code:
+        result = await db.execute(select(Table.id).where(Table.code == payload.table_code))
+        table_id = result.scalar()
+        if table_id is None:
+            raise HTTPException(status_code=404, detail="Table not found")
+
+    item_ids = {line.menu_item_id for line in payload.items}
+    result = await db.execute(
+        select(MenuItem.id, MenuItem.name, MenuItem.category, MenuItem.price, MenuItem.available)
+        .where(MenuItem.id.in_(item_ids))
+    )
+    menu = {row.id: row for row in result}
+
+    missing = item_ids - menu.keys()
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Unknown menu items: {sorted(missing)}")
+    unavailable = [i for i in item_ids if not menu[i].available]
+    if unavailable:
+        raise HTTPException(status_code=409, detail=f"Menu items not available: {sorted(unavailable)}")
+
+    lines = [
+        {
+            "menu_item_id": line.menu_item_id,
+            "quantity": line.quantity,
+            "notes": line.notes,
+            "price": menu[line.menu_item_id].price or 0.0,
+        }
+        for line in payload.items
+    ]
+
+    sold_out = []
+    if ENFORCE_STOCK:
+        quantities = Counter()
+        for line in payload.items:
+            quantities[line.menu_item_id] += line.quantity
+        sold_out = await reserve_stock(db, quantities)
+
+    db_order = Order(
+        table_id=table_id,
+        user_id=user_id,
+        status="pending",
+        total=round(sum(line["price"] * line["quantity"] for line in lines), 2),
+    )
+    db.add(db_order)
+    await db.flush()  # obtiene el id del pedido
+
+    for line in lines:
+        line["order_id"] = db_order.id
+    await db.execute(insert(OrderItem), lines)  # executemany: un solo INSERT para todas las líneas
+    await db.commit()
+
+    if ENFORCE_STOCK:
+        menu_cache.invalidate(MENU)
+    publish_order_added([
+        item_row(db_order, n, line["menu_item_id"], line["quantity"], line["notes"],
+                 menu[line["menu_item_id"]].name, menu[line["menu_item_id"]].category)
+        for n, line in enumerate(lines)
+    ])
+    if sold_out:
+        # Un único evento para todos los ítems agotados por este pedido
+        publish_menu_event({
+            "type": "menu_items_updated",
+            "items": [{"id": item_id, "amount": 0, "available": False} for item_id in sold_out],
+        })
+    return db_order
+
+
+async def set_status(db: AsyncSession, order_id: int, status: str) -> Order:
+    """Cambia el estado bloqueando la fila, para que los agregados de ventas
+    cuenten cada transición a `paid` exactamente una vez."""
+    result = await db.execute(select(Order).where(Order.id == order_id).with_for_update())
+    db_order = result.scalar()
+    if not db_order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    previous = db_order.status
+    db_order.status = status
+    await record_status_change(db, db_order, previous)
+    await db.commit()
+    return db_order
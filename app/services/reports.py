@@ -0,0 +1,284 @@
+import argparse
+import asyncio
+import datetime
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from core.timezone import to_utc, utc_to_local
+from db.session import primary_session
+from models.menu import MenuItem
+from models.order import Order, OrderItem
+from models.report import ReportLock, SalesHourly, SalesItemHourly
+
+PAID_STATUS = "paid"
+NO_TABLE = 0
+REBUILD_CHUNK = 1000
+# Horas de agregados que se reconstruyen por transacción
+REBUILD_WINDOW_HOURS = 24
+SALES_LOCK = "sales"
+
+
+def hour_bucket(value: datetime.datetime) -> datetime.datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+# --- lock de agregados ---
+async def lock_rollups(db: AsyncSession, exclusive: bool = False):
+    """Toma la fila `report_locks` de ventas hasta el commit del caller.
+
+    En SQLite `FOR UPDATE` no existe, pero las escrituras ya se serializan
+    por base de datos.
+    """
+    stmt = select(ReportLock.name).where(ReportLock.name == SALES_LOCK).with_for_update(read=not exclusive)
+    if (await db.execute(stmt)).scalar() is None:
+        # Bases creadas con create_all: la migración es la que siembra la fila
+        dialect = db.get_bind().dialect.name
+        if dialect == "mysql":
+            insert = mysql.insert(ReportLock.__table__).prefix_with("IGNORE")
+        else:
+            insert = (postgresql if dialect == "postgresql" else sqlite).insert(ReportLock.__table__)
+            insert = insert.on_conflict_do_nothing(index_elements=["name"])
+        await db.execute(insert.values(name=SALES_LOCK))
+        await db.execute(stmt)
+
+
+# --- upsert incremental ---
+def _increment_upsert(dialect: str, model, keys: Tuple[str, ...], counters: Tuple[str, ...]):
+    """INSERT ... que suma `counters` si la fila (`keys`) ya existe, según el dialecto."""
+    table = model.__table__
+    if dialect == "mysql":
+        stmt = mysql.insert(table)
+        return stmt.on_duplicate_key_update({c: table.c[c] + stmt.inserted[c] for c in counters})
+    module = postgresql if dialect == "postgresql" else sqlite
+    stmt = module.insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={c: table.c[c] + stmt.excluded[c] for c in counters},
+    )
+
+
+async def _apply(db: AsyncSession, hourly: Dict[tuple, list], items: Dict[tuple, list]):
+    dialect = db.get_bind().dialect.name
+    if hourly:
+        await db.execute(
+            _increment_upsert(dialect, SalesHourly, ("bucket", "table_id"), ("orders", "revenue")),
+            [{"bucket": b, "table_id": t, "orders": o, "revenue": r} for (b, t), (o, r) in hourly.items()],
+        )
+    if items:
+        await db.execute(
+            _increment_upsert(dialect, SalesItemHourly, ("bucket", "menu_item_id"), ("quantity", "revenue")),
+            [{"bucket": b, "menu_item_id": m, "quantity": q, "revenue": r} for (b, m), (q, r) in items.items()],
+        )
+
+
+def _aggregate(orders: Iterable, lines: Iterable, sign: int = 1):
+    hourly: Dict[tuple, list] = defaultdict(lambda: [0, 0.0])
+    items: Dict[tuple, list] = defaultdict(lambda: [0, 0.0])
+    buckets = {}
+    for order in orders:
+        bucket = buckets[order.id] = hour_bucket(order.created_at)
+        row = hourly[(bucket, order.table_id or NO_TABLE)]
+        row[0] += sign
+        row[1] += sign * (order.total or 0.0)
+    for line in lines:
+        row = items[(buckets[line.order_id], line.menu_item_id)]
+        row[0] += sign * (line.quantity or 0)
+        row[1] += sign * (line.quantity or 0) * (line.price or 0.0)
+    return hourly, items
+
+
+async def _order_lines(db: AsyncSession, order_ids: List[int]):
+    result = await db.execute(
+        select(OrderItem.order_id, OrderItem.menu_item_id, OrderItem.quantity, OrderItem.price)
+        .where(OrderItem.order_id.in_(order_ids))
+    )
+    return result.all()
+
+
+async def record_status_change(db: AsyncSession, order: Order, previous: Optional[str]):
+    """Suma el pedido al pasar a `paid` (o lo resta si deja de estarlo), en la transacción del caller."""
+    if (order.status == PAID_STATUS) == (previous == PAID_STATUS):
+        return
+    sign = 1 if order.status == PAID_STATUS else -1
+    await lock_rollups(db)
+    hourly, items = _aggregate([order], await _order_lines(db, [order.id]), sign)
+    await _apply(db, hourly, items)
+
+
+# --- reconstrucción ---
+async def _bounds(db: AsyncSession):
+    """Primera y última hora con pedidos pagados o con agregados."""
+    first, last = [], []
+    for column, where in (
+        (Order.created_at, Order.status == PAID_STATUS),
+        (SalesHourly.bucket, None),
+        (SalesItemHourly.bucket, None),
+    ):
+        stmt = select(func.min(column), func.max(column))
+        if where is not None:
+            stmt = stmt.where(where)
+        low, high = (await db.execute(stmt)).one()
+        if low is not None:
+            first.append(low)
+            last.append(high)
+    if not first:
+        return None, None
+    return hour_bucket(min(first)), hour_bucket(max(last)) + datetime.timedelta(hours=1)
+
+
+async def _rebuild_window(db: AsyncSession, start: datetime.datetime, stop: datetime.datetime, chunk: int) -> int:
+    """Borra y recalcula las horas [start, stop) en la transacción de `db`."""
+    await lock_rollups(db, exclusive=True)
+    for model in (SalesHourly, SalesItemHourly):
+        await db.execute(delete(model).where(model.bucket >= start, model.bucket < stop))
+
+    last_id, total = 0, 0
+    while True:
+        rows = (await db.execute(
+            select(Order.id, Order.created_at, Order.table_id, Order.total)
+            .where(
+                Order.status == PAID_STATUS,
+                Order.created_at >= start,
+                Order.created_at < stop,
+                Order.id > last_id,
+            )
+            .order_by(Order.id)
+            .limit(chunk)
+        )).all()
+        if not rows:
+            return total
+        last_id = rows[-1].id
+        hourly, items = _aggregate(rows, await _order_lines(db, [o.id for o in rows]))
+        await _apply(db, hourly, items)
+        total += len(rows)
+
+
+async def rebuild_rollups(
+    date_from: Optional[datetime.datetime] = None,
+    date_to: Optional[datetime.datetime] = None,
+    chunk: int = REBUILD_CHUNK,
+    window_hours: int = REBUILD_WINDOW_HOURS,
+) -> dict:
+    """Recalcula los agregados desde `orders`, una transacción por ventana de `window_hours` horas.
+
+    Con rango se recalculan solo las horas completas dentro de [date_from, date_to)
+    (hora local si vienen sin offset, como en los reportes).
+    Cada ventana toma el lock de agregados en exclusiva antes de borrar sus
+    horas, así que un pago concurrente (`record_status_change`) queda antes
+    (y se lee de `orders`) o después (y se suma al resultado), nunca perdido
+    ni contado dos veces. Los pedidos se leen en lotes de `chunk` (keyset por id).
+    """
+    async with primary_session() as session:
+        start = hour_bucket(to_utc(date_from)) if date_from is not None else None
+        end = hour_bucket(to_utc(date_to)) if date_to is not None else None
+        if start is None or end is None:
+            first, last = await _bounds(session)
+            await session.commit()
+            if first is None:
+                return {"orders": 0}
+            start = start or first
+            end = end or last
+        span = datetime.timedelta(hours=window_hours)
+
+        total = 0
+        while start < end:
+            stop = min(start + span, end)
+            total += await _rebuild_window(session, start, stop, chunk)
+            await session.commit()
+            start = stop
+    return {"orders": total}
+
+
+# --- consultas ---
+async def sales_series(db: AsyncSession, date_from, date_to, group: str = "hour") -> List[dict]:
+    """Serie por hora o por día, en hora local del restaurante (los buckets son UTC)."""
+    stmt = (
+        select(SalesHourly.bucket, func.sum(SalesHourly.orders), func.sum(SalesHourly.revenue))
+        .group_by(SalesHourly.bucket)
+        .order_by(SalesHourly.bucket)
+    )
+    stmt = _range(stmt, SalesHourly, date_from, date_to)
+    series: Dict[datetime.datetime, list] = {}
+    for bucket, orders, revenue in (await db.execute(stmt)).all():
+        bucket = utc_to_local(bucket)
+        if group == "day":
+            bucket = bucket.replace(hour=0, minute=0)
+        row = series.setdefault(bucket, [0, 0.0])
+        row[0] += orders or 0
+        row[1] += revenue or 0.0
+    return [
+        {"bucket": b, "orders": o, "revenue": round(r, 2), "avg_ticket": round(r / o, 2) if o else 0.0}
+        for b, (o, r) in series.items()
+    ]
+
+
+async def top_items(db: AsyncSession, date_from, date_to, limit: int = 10) -> List[dict]:
+    revenue = func.sum(SalesItemHourly.revenue)
+    stmt = (
+        select(SalesItemHourly.menu_item_id, MenuItem.name, func.sum(SalesItemHourly.quantity), revenue)
+        .outerjoin(MenuItem, MenuItem.id == SalesItemHourly.menu_item_id)
+        .group_by(SalesItemHourly.menu_item_id, MenuItem.name)
+        .order_by(revenue.desc())
+        .limit(limit)
+    )
+    stmt = _range(stmt, SalesItemHourly, date_from, date_to)
+    return [
+        {"menu_item_id": i, "name": n, "quantity": q or 0, "revenue": round(r or 0.0, 2)}
+        for i, n, q, r in (await db.execute(stmt)).all()
+    ]
+
+
+async def by_category(db: AsyncSession, date_from, date_to) -> List[dict]:
+    # La categoría se toma del menú actual (tabla pequeña) al consultar
+    revenue = func.sum(SalesItemHourly.revenue)
+    stmt = (
+        select(MenuItem.category, func.sum(SalesItemHourly.quantity), revenue)
+        .select_from(SalesItemHourly)
+        .outerjoin(MenuItem, MenuItem.id == SalesItemHourly.menu_item_id)
+        .group_by(MenuItem.category)
+        .order_by(revenue.desc())
+    )
+    stmt = _range(stmt, SalesItemHourly, date_from, date_to)
+    return [
+        {"category": c, "quantity": q or 0, "revenue": round(r or 0.0, 2)}
+        for c, q, r in (await db.execute(stmt)).all()
+    ]
+
+
+async def by_table(db: AsyncSession, date_from, date_to) -> List[dict]:
+    revenue = func.sum(SalesHourly.revenue)
+    stmt = (
+        select(SalesHourly.table_id, func.sum(SalesHourly.orders), revenue)
+        .group_by(SalesHourly.table_id)
+        .order_by(revenue.desc())
+    )
+    stmt = _range(stmt, SalesHourly, date_from, date_to)
+    return [
+        {"table_id": t or None, "orders": o or 0, "revenue": round(r or 0.0, 2)}
+        for t, o, r in (await db.execute(stmt)).all()
+    ]
+
+
+def _range(stmt, model, date_from, date_to):
+    # Filtros en hora local (o con offset) -> UTC de los buckets
+    if date_from is not None:
+        stmt = stmt.where(model.bucket >= hour_bucket(to_utc(date_from)))
+    if date_to is not None:
+        stmt = stmt.where(model.bucket < to_utc(date_to))
+    return stmt
+
+
+# python -m services.reports rebuild [--from 2024-01-01] [--to 2024-02-01]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconstruye los agregados de ventas")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--from", dest="date_from", type=datetime.datetime.fromisoformat)
+    parser.add_argument("--to", dest="date_to", type=datetime.datetime.fromisoformat)
+    parser.add_argument("--chunk", type=int, default=REBUILD_CHUNK)
+    parser.add_argument("--hours", type=int, default=REBUILD_WINDOW_HOURS, help="horas por transacción")
+    args = parser.parse_args()
+    print(asyncio.run(rebuild_rollups(args.date_from, args.date_to, args.chunk, args.hours)))
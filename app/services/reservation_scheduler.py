@@ -0,0 +1,175 @@
+import asyncio
+import datetime
+import heapq
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from core.timezone import local_now, to_local
+from db.session import primary_session
+from models.reservation import Reservation
+
+# El planificador solo corre si se activa: sin check-in (`PATCH /reservations/{id}/status`)
+# toda reserva `pending` pasaría a `no_show` al vencer
+RESERVATION_AUTO_CANCEL = os.getenv("RESERVATION_AUTO_CANCEL", "false").lower() == "true"
+# Minutos de tolerancia tras start_at antes de liberar una reserva no atendida
+RESERVATION_GRACE_MINUTES = int(os.getenv("RESERVATION_GRACE_MINUTES", "15"))
+# Solo se cargan en memoria los vencimientos de las próximas N horas; el resto
+# se recarga periódicamente
+SCHEDULER_HORIZON_HOURS = float(os.getenv("SCHEDULER_HORIZON_HOURS", "6"))
+# Vencimientos que caen dentro de esta ventana se agrupan en un mismo UPDATE
+SCHEDULER_BATCH_SECONDS = float(os.getenv("SCHEDULER_BATCH_SECONDS", "1"))
+
+# Estados que se liberan automáticamente al vencer y estado resultante
+AUTO_CANCEL_STATUSES = ("pending",)
+NO_SHOW_STATUS = "no_show"
+
+logger = logging.getLogger("scheduler")
+
+
+def default_auto_cancel_at(start_at: datetime.datetime) -> datetime.datetime:
+    return to_local(start_at) + datetime.timedelta(minutes=RESERVATION_GRACE_MINUTES)
+
+
+class ReservationScheduler:
+    """Min-heap de (auto_cancel_at, reservation_id) atendido por una sola tarea.
+
+    Reprogramar o descartar una reserva no toca el heap: `_deadlines` guarda
+    el vencimiento vigente y las entradas obsoletas se ignoran al salir.
+    Los vencidos se liberan con un único UPDATE condicional, así que varios
+    workers pueden ejecutar el mismo vencimiento sin efectos duplicados.
+    Los vencimientos están en hora local del restaurante, como las reservas.
+    """
+
+    def __init__(self, enabled: bool = RESERVATION_AUTO_CANCEL):
+        self.enabled = enabled
+        self._heap: List[Tuple[datetime.datetime, int]] = []
+        self._deadlines: Dict[int, datetime.datetime] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._horizon = local_now()
+        self.released = 0
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def schedule(self, reservation_id: int, deadline: Optional[datetime.datetime]):
+        if deadline is None or not self.enabled:
+            self.discard(reservation_id)
+            return
+        deadline = to_local(deadline)
+        if deadline > self._horizon:
+            # Fuera del horizonte: la próxima recarga lo traerá
+            self._deadlines.pop(reservation_id, None)
+            return
+        if self._deadlines.get(reservation_id) == deadline:
+            return
+        self._deadlines[reservation_id] = deadline
+        heapq.heappush(self._heap, (deadline, reservation_id))
+        if self._wakeup is not None and self._heap[0] == (deadline, reservation_id):
+            self._wakeup.set()
+
+    def discard(self, reservation_id: int):
+        self._deadlines.pop(reservation_id, None)
+
+    async def load(self, db: AsyncSession):
+        """(Re)carga los vencimientos pendientes hasta el horizonte, incluidos los ya vencidos."""
+        if not self.enabled:
+            return
+        horizon = local_now() + datetime.timedelta(hours=SCHEDULER_HORIZON_HOURS)
+        result = await db.execute(
+            select(Reservation.id, Reservation.auto_cancel_at).where(
+                Reservation.status.in_(AUTO_CANCEL_STATUSES),
+                Reservation.auto_cancel_at.isnot(None),
+                Reservation.auto_cancel_at <= horizon,
+            )
+        )
+        self._horizon = horizon
+        self._heap = []
+        self._deadlines = {}
+        for row in result:
+            self.schedule(row.id, row.auto_cancel_at)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _pop_due(self, now: datetime.datetime) -> List[int]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, reservation_id = heapq.heappop(self._heap)
+            if self._deadlines.get(reservation_id) == deadline:
+                del self._deadlines[reservation_id]
+                due.append(reservation_id)
+        return due
+
+    async def release(self, reservation_ids: List[int], now: datetime.datetime) -> int:
+        async with primary_session() as session:
+            result = await session.execute(
+                update(Reservation)
+                .where(
+                    Reservation.id.in_(reservation_ids),
+                    Reservation.status.in_(AUTO_CANCEL_STATUSES),
+                    Reservation.auto_cancel_at <= now,
+                )
+                .values(status=NO_SHOW_STATUS)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        self.released += result.rowcount
+        return result.rowcount
+
+    async def _run(self):
+        reload_every = datetime.timedelta(hours=SCHEDULER_HORIZON_HOURS / 2)
+        batch = datetime.timedelta(seconds=SCHEDULER_BATCH_SECONDS)
+        while True:
+            if local_now() >= self._horizon - reload_every:
+                try:
+                    async with primary_session() as session:
+                        await self.load(session)
+                except Exception:
+                    logger.exception("scheduler: no se pudieron recargar los vencimientos")
+                    self._horizon = local_now() + reload_every + batch
+
+            now = local_now()
+            due = self._pop_due(now)
+            if due:
+                try:
+                    await self.release(due, now)
+                except Exception:
+                    logger.exception("scheduler: no se pudieron liberar %s reservas", len(due))
+                    retry = now + datetime.timedelta(seconds=30)
+                    for reservation_id in due:
+                        self.schedule(reservation_id, retry)
+                continue
+
+            # Se despierta un poco después del primer vencimiento para liberar en
+            # el mismo UPDATE los que vencen casi a la vez
+            next_check = self._horizon - reload_every
+            if self._heap:
+                next_check = min(next_check, self._heap[0][0] + batch)
+            self._wakeup.clear()
+            timeout = max((next_check - local_now()).total_seconds(), 0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self):
+        if self.enabled and self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+
+
+reservation_scheduler = ReservationScheduler()
@@ -0,0 +1,123 @@
+import datetime
+from collections import OrderedDict
+from typing import List, Optional
+from fastapi import HTTPException
+from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from core.timezone import to_local
+from models.reservation import Reservation
+from models.table import Table
+
+# Estados que ya no ocupan la mesa
+RELEASED_STATUSES = ("cancelled", "no_show")
+
+
+def _validate_window(start_at: datetime.datetime, end_at: datetime.datetime):
+    if start_at >= end_at:
+        raise HTTPException(status_code=400, detail="start_at must be before end_at")
+
+
+async def lock_table(db: AsyncSession, table_id: int) -> Table:
+    """Bloquea la fila de la mesa (`SELECT ... FOR UPDATE`) hasta el commit.
+
+    Dos reservas simultáneas para la misma mesa se serializan aquí, así la
+    comprobación de solapamiento no puede quedar obsoleta antes del INSERT.
+    """
+    result = await db.execute(select(Table).where(Table.id == table_id).with_for_update())
+    table = result.scalar()
+    if table is None:
+        raise HTTPException(status_code=404, detail="Table not found")
+    if not table.active:
+        raise HTTPException(status_code=409, detail="Table is not active")
+    return table
+
+
+async def check_conflict(
+    db: AsyncSession,
+    table_id: int,
+    start_at: datetime.datetime,
+    end_at: datetime.datetime,
+    exclude_id: Optional[int] = None,
+):
+    """409 si otra reserva activa de la mesa se solapa con [start_at, end_at)."""
+    stmt = select(Reservation.id).where(
+        Reservation.table_id == table_id,
+        Reservation.start_at < end_at,
+        Reservation.end_at > start_at,
+        Reservation.status.notin_(RELEASED_STATUSES),
+    )
+    if exclude_id is not None:
+        stmt = stmt.where(Reservation.id != exclude_id)
+    result = await db.execute(stmt.limit(1))
+    conflict = result.scalar()
+    if conflict is not None:
+        raise HTTPException(status_code=409, detail=f"Table already reserved in that window (reservation {conflict})")
+
+
+async def ensure_available(
+    db: AsyncSession,
+    table_id: int,
+    start_at: datetime.datetime,
+    end_at: datetime.datetime,
+    exclude_id: Optional[int] = None,
+):
+    start_at, end_at = to_local(start_at), to_local(end_at)
+    _validate_window(start_at, end_at)
+    await lock_table(db, table_id)
+    await check_conflict(db, table_id, start_at, end_at, exclude_id)
+
+
+async def availability(
+    db: AsyncSession,
+    window_start: datetime.datetime,
+    window_end: datetime.datetime,
+    seats: Optional[int] = None,
+    min_duration: Optional[datetime.timedelta] = None,
+) -> List[dict]:
+    """Huecos libres de cada mesa activa dentro de [window_start, window_end).
+
+    Una sola consulta: mesas LEFT JOIN reservas que se solapan con la ventana,
+    ordenadas por mesa e inicio; los huecos se calculan recorriendo cada mesa.
+    Las fechas con offset se pasan a hora local, como las guardadas.
+    """
+    window_start, window_end = to_local(window_start), to_local(window_end)
+    _validate_window(window_start, window_end)
+    stmt = (
+        select(Table.id, Table.code, Table.seats, Reservation.start_at, Reservation.end_at)
+        .outerjoin(Reservation, and_(
+            Reservation.table_id == Table.id,
+            Reservation.start_at < window_end,
+            Reservation.end_at > window_start,
+            Reservation.status.notin_(RELEASED_STATUSES),
+        ))
+        .where(Table.active.is_(True))
+        .order_by(Table.id, Reservation.start_at)
+    )
+    if seats is not None:
+        stmt = stmt.where(Table.seats >= seats)
+    result = await db.execute(stmt)
+
+    tables: "OrderedDict[int, dict]" = OrderedDict()
+    cursors = {}
+    for row in result:
+        table = tables.get(row.id)
+        if table is None:
+            table = tables[row.id] = {"table_id": row.id, "code": row.code, "seats": row.seats, "free": []}
+            cursors[row.id] = window_start
+        if row.start_at is None:
+            continue
+        cursor = cursors[row.id]
+        if row.start_at > cursor:
+            table["free"].append((cursor, row.start_at))
+        cursors[row.id] = max(cursor, row.end_at)
+
+    for table_id, table in tables.items():
+        if cursors[table_id] < window_end:
+            table["free"].append((cursors[table_id], window_end))
+        table["free"] = [
+            {"start_at": start, "end_at": end}
+            for start, end in table["free"]
+            if min_duration is None or end - start >= min_duration
+        ]
+    return list(tables.values())
@@ -0,0 +1,71 @@
+import itertools
+import os
+import tempfile
+
+# Configuración antes de importar la app: SQLite temporal y esquema con create_all
+_db = os.path.join(tempfile.mkdtemp(prefix="restaurant-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db}"
+os.environ["DB_SCHEMA_MODE"] = "create"
+os.environ["JWT_SECRET"] = "test-secret"
+# Zona sin horario de verano y distinta de UTC para probar conversiones
+os.environ["RESTAURANT_TIMEZONE"] = "America/Lima"
+os.environ.pop("REPLICA_DATABASE_URL", None)
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+_ids = itertools.count(1000)
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def run(client):
+    """Ejecuta una corrutina en el loop de la app (mismo engine y pool que los requests)."""
+    return lambda fn, *args: client.portal.call(fn, *args)
+
+
+def next_id() -> int:
+    return next(_ids)
+
+
+def create_table(client, seats: int = 4, active: bool = True) -> dict:
+    table_id = next_id()
+    response = client.post("/tables/", json={"id": table_id, "code": f"T{table_id}", "seats": seats,
+                                             "location": None, "active": active})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def create_menu_item(client, **fields) -> dict:
+    payload = {"name": f"Plato {next_id()}", "description": None, "price": 10.0, "category": "principales"}
+    payload.update(fields)
+    response = client.post("/menu/", json=payload)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def create_reservation(client, table_id: int, start_at: str, end_at: str, **fields) -> dict:
+    payload = {"table_id": table_id, "start_at": start_at, "end_at": end_at}
+    payload.update(fields)
+    response = client.post("/reservations/", json=payload)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def fetch_all(client, path: str, **params) -> list:
+    """Recorre todas las páginas de un listado siguiendo `X-Next-Cursor`."""
+    rows, cursor = [], None
+    while True:
+        response = client.get(path, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        rows += response.json()
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return rows
@@ -0,0 +1,56 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from bench.__main__ import compare
+from bench.load import latency_summary, percentile
+from bench.scenarios import HTTP_SCENARIOS
+
+FIXTURES = {
+    "menu_ids": list(range(1, 21)), "categories": ["entradas", "bebidas"], "dnis": ["1", "2", "3"],
+    "password": "secret", "table_codes": ["T1", "T2"], "order_ids": [1],
+}
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.90) == 90
+    assert percentile(values, 0.99) == 99
+    assert percentile(values, 0.07) == 7
+    assert percentile(values, 1.0) == 100
+    assert percentile(values, 0.0) == 1
+    assert percentile(list(range(1, 11)), 0.5) == 5
+    assert percentile([], 0.5) is None
+
+
+def test_latency_summary_in_milliseconds():
+    summary = latency_summary([0.004, 0.001, 0.003, 0.002])
+    assert summary == {"mean": 2.5, "p50": 2.0, "p90": 4.0, "p99": 4.0, "max": 4.0}
+    assert latency_summary([]) == {"mean": None, "p50": None, "p90": None, "p99": None, "max": None}
+
+
+@pytest.mark.parametrize("name", sorted(HTTP_SCENARIOS))
+def test_scenarios_are_deterministic_per_seed(name):
+    factory = HTTP_SCENARIOS[name](FIXTURES)
+    draw = lambda seed: [factory(rng) for rng in [random.Random(seed)] for _ in range(50)]
+    assert draw(7) == draw(7)
+    assert draw(7) != draw(8)
+
+
+def test_compare_reports_relative_change(tmp_path, capsys):
+    def report(path, rps, p50, p99):
+        path.write_text(
+            '{"meta": {"params": {"requests": 10}}, "results": {"browse": {"rps": %s, '
+            '"latency_ms": {"p50": %s, "p99": %s}}}}' % (rps, p50, p99)
+        )
+        return str(path)
+    base = report(tmp_path / "base.json", 100.0, 10.0, 20.0)
+    new = report(tmp_path / "new.json", 120.0, 10.2, 30.0)
+
+    compare(SimpleNamespace(base=base, new=new))
+    lines = {line.split()[1]: line for line in capsys.readouterr().out.splitlines()[1:]}
+    assert lines["rps"].endswith("+20.0% +")
+    assert lines["p50_ms"].endswith("+2.0%")
+    assert lines["p99_ms"].endswith("+50.0% -")
@@ -0,0 +1,103 @@
+from tests.conftest import create_menu_item, next_id
+
+
+def _bulk(client, path, rows=None, csv=None):
+    if csv is not None:
+        return client.post(path, content=csv, headers={"Content-Type": "text/csv"})
+    return client.post(path, json=rows)
+
+
+def _menu_names(client) -> set:
+    return {row["name"] for row in client.get("/menu/").json()}
+
+
+def _sub_categories(client) -> dict:
+    return {row["name"]: row for row in client.get("/sub_categories/").json()}
+
+
+def test_menu_json_upsert_updates_by_id_and_inserts_the_rest(client):
+    existing = create_menu_item(client, price=10.0)
+    name = f"Nuevo {next_id()}"
+    response = _bulk(client, "/menu/bulk", [
+        {"id": existing["id"], "name": existing["name"], "price": 12.5},
+        {"name": name, "price": 7.0, "category": "postres"},
+    ])
+    assert response.status_code == 200, response.text
+    assert response.json() == {"inserted": 1, "updated": 1}
+    assert client.get(f"/menu/{existing['id']}").json()["price"] == 12.5
+    assert name in _menu_names(client)
+
+
+def test_menu_csv_upsert(client):
+    existing = create_menu_item(client)
+    name = f"Csv {next_id()}"
+    csv = f"id,name,price,available\n{existing['id']},{existing['name']},3.5,false\n,{name},4,\n"
+    response = _bulk(client, "/menu/bulk", csv=csv)
+    assert response.status_code == 200, response.text
+    assert response.json() == {"inserted": 1, "updated": 1}
+    updated = client.get(f"/menu/{existing['id']}").json()
+    assert (updated["price"], updated["available"]) == (3.5, False)
+    assert name in _menu_names(client)
+
+
+def test_duplicated_keys_are_rejected_before_writing(client):
+    item = create_menu_item(client)
+    name = f"Duplicado {next_id()}"
+    response = _bulk(client, "/menu/bulk", [
+        {"name": name, "price": 1.0},
+        {"id": item["id"], "name": "a", "price": 1.0},
+        {"id": item["id"], "name": "b", "price": 2.0},
+    ])
+    assert response.status_code == 422
+    assert [error["row"] for error in response.json()["detail"]] == [2]
+    assert name not in _menu_names(client)
+
+    sub = f"sub{next_id()}"
+    response = _bulk(client, "/sub_categories/bulk", csv=f"name,description\n{sub},uno\n{sub},dos\n")
+    assert response.status_code == 422
+    assert sub not in _sub_categories(client)
+
+
+def test_invalid_rows_are_reported_and_nothing_is_written(client):
+    name = f"Valido {next_id()}"
+    response = _bulk(client, "/menu/bulk", [
+        {"name": name, "price": 5.0},
+        {"name": "sin precio"},
+        {"name": "precio raro", "price": "gratis"},
+    ])
+    assert response.status_code == 422
+    assert [error["row"] for error in response.json()["detail"]] == [1, 2]
+    assert name not in _menu_names(client)
+
+    response = _bulk(client, "/category/bulk", csv="id,name,value\n,Sin valor,quizas\n")
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["row"] == 0
+
+
+def test_category_upsert_by_id(client):
+    first, second = next_id(), next_id()
+    response = _bulk(client, "/category/bulk", [
+        {"id": first, "name": "Entradas"}, {"id": second, "name": "Bebidas", "value": False},
+    ])
+    assert response.json() == {"inserted": 2, "updated": 0}
+
+    response = _bulk(client, "/category/bulk", csv=f"id,name,value\n{first},Entradas frías,false\n")
+    assert response.status_code == 200, response.text
+    assert response.json() == {"inserted": 0, "updated": 1}
+    assert client.get(f"/category/{first}").json() == {"id": first, "name": "Entradas frías", "value": False,
+                                                        "img": None}
+    assert client.get(f"/category/{second}").json()["name"] == "Bebidas"
+
+
+def test_sub_category_upsert_by_name(client):
+    old, new = f"sub{next_id()}", f"sub{next_id()}"
+    response = _bulk(client, "/sub_categories/bulk", [{"name": old, "description": "antes", "img": "a.png"}])
+    assert response.json() == {"inserted": 1, "updated": 0}
+
+    response = _bulk(client, "/sub_categories/bulk", csv=f"name,description\n{old},después\n{new},\n")
+    assert response.status_code == 200, response.text
+    assert response.json() == {"inserted": 1, "updated": 1}
+    rows = _sub_categories(client)
+    # Las celdas no enviadas no se tocan al actualizar
+    assert (rows[old]["description"], rows[old]["img"]) == ("después", "a.png")
+    assert rows[new]["description"] is None
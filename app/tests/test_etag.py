@@ -0,0 +1,36 @@
+from services.menu_cache import Snapshot
+from services.kitchen import KitchenQueue
+from tests.conftest import create_menu_item
+
+
+def test_etag_depends_on_body_not_version():
+    assert Snapshot(1, [{"id": 1}]).etag == Snapshot(7, [{"id": 1}]).etag
+    assert Snapshot(1, [{"id": 1}]).etag != Snapshot(1, [{"id": 2}]).etag
+
+
+def test_if_none_match_accepts_lists_and_weak_tags():
+    snapshot = Snapshot(1, [{"id": 1}])
+    assert snapshot.matches(f'"other", W/{snapshot.etag}')
+    assert not snapshot.matches('"other"')
+    assert not snapshot.matches(None)
+
+
+def test_menu_304_until_it_changes(client):
+    item = create_menu_item(client)
+    first = client.get("/menu/")
+    etag = first.headers["ETag"]
+    assert client.get("/menu/", headers={"If-None-Match": etag}).status_code == 304
+
+    client.put(f"/menu/{item['id']}", json={"price": 99.0})
+    changed = client.get("/menu/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_kitchen_queues_with_same_version_get_different_etags():
+    row = {"id": "1:0", "order_id": 1, "station": "general", "status": "pending"}
+    a, b = KitchenQueue(), KitchenQueue()
+    a.add([row])
+    b.add([{**row, "id": "2:0", "order_id": 2}])
+    assert a.version == b.version
+    assert a.snapshot("general").etag != b.snapshot("general").etag
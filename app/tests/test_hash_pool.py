@@ -0,0 +1,20 @@
+import asyncio
+import time
+
+from core.security import HashPool, bcrypt_queue_seconds, bcrypt_seconds
+
+
+def _sum(histogram, op):
+    return histogram._series[(op,)][1]
+
+
+def test_bcrypt_time_excludes_queue_wait():
+    pool = HashPool(workers=1, max_pending=4)
+
+    async def main():
+        await asyncio.gather(*(pool.run("test-slow", time.sleep, 0.1) for _ in range(3)))
+    asyncio.run(main())
+
+    # Tres operaciones de 0.1 s en un solo hilo: ~0.3 s de trabajo y ~0.3 s de cola (0 + 0.1 + 0.2)
+    assert 0.28 <= _sum(bcrypt_seconds, "test-slow") < 0.45
+    assert _sum(bcrypt_queue_seconds, "test-slow") >= 0.25
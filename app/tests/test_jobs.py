@@ -0,0 +1,120 @@
+import asyncio
+import datetime
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.future import select
+
+from db.session import primary_session
+from models.job import Job
+from workers import jobs
+from workers.jobs import JobRunner, enqueue, job_runner, task
+from workers.tasks import purge_jobs
+
+
+@task("test_sleep", max_attempts=1)
+async def _sleep(payload: dict) -> dict:
+    await asyncio.sleep(payload["seconds"])
+    return {"slept": payload["seconds"]}
+
+
+@pytest.fixture
+def queue(run):
+    """Cola sin el dispatcher de la app: cada test reclama con sus propios workers."""
+    run(job_runner.stop)
+    yield
+    run(job_runner.start)
+
+
+async def _enqueue(payload: dict) -> int:
+    async with primary_session() as session:
+        # Los jobs de tests anteriores no deben interferir al reclamar
+        await session.execute(update(Job).where(Job.status == "queued").values(status="failed"))
+        await session.commit()
+        job = await enqueue(session, "test_sleep", payload)
+        return job.id
+
+
+async def _job(job_id: int) -> Job:
+    async with primary_session() as session:
+        return (await session.execute(select(Job).where(Job.id == job_id))).scalar()
+
+
+async def _expire(job_id: int):
+    async with primary_session() as session:
+        await session.execute(
+            update(Job).where(Job.id == job_id)
+            .values(locked_until=datetime.datetime.utcnow() - datetime.timedelta(seconds=1))
+        )
+        await session.commit()
+
+
+def test_stale_worker_cannot_finish_reclaimed_job(run, queue):
+    job_id = run(_enqueue, {"seconds": 0})
+    first, second = JobRunner(), JobRunner()
+
+    (job,) = run(first._claim, 1)
+    run(_expire, job_id)  # el primer worker se colgó más allá del lease
+    (again,) = run(second._claim, 1)
+    assert again.attempts == 2
+    assert run(_job, job_id).locked_by == second.worker_id
+
+    run(first._finish, job, "succeeded")
+    stored = run(_job, job_id)
+    assert (stored.status, stored.locked_by) == ("running", second.worker_id)
+
+    run(second._finish, again, "succeeded")
+    stored = run(_job, job_id)
+    assert (stored.status, stored.locked_by, stored.locked_until) == ("succeeded", None, None)
+
+
+def test_heartbeat_keeps_long_job_leased(run, queue, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_LEASE_SECONDS", 1)
+    monkeypatch.setattr(jobs, "JOB_HEARTBEAT_SECONDS", 0.2)
+    job_id = run(_enqueue, {"seconds": 2.5})
+    owner, other = JobRunner(), JobRunner()
+
+    async def scenario():
+        (job,) = await owner._claim(1)
+        running = asyncio.create_task(owner._execute(job))
+        stolen = []
+        while not running.done():
+            stolen += await other._claim(1)
+            await asyncio.sleep(0.1)
+        return stolen
+
+    assert run(scenario) == []
+    stored = run(_job, job_id)
+    assert (stored.status, stored.attempts, stored.result) == ("succeeded", 1, {"slept": 2.5})
+
+
+def test_heartbeat_stops_after_losing_lease(run, queue, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_HEARTBEAT_SECONDS", 0.05)
+    job_id = run(_enqueue, {"seconds": 0})
+    owner, other = JobRunner(), JobRunner()
+    (job,) = run(owner._claim, 1)
+    run(_expire, job_id)
+    run(other._claim, 1)
+
+    # Termina sola al ver que el lease ya es de otro, sin pisar su locked_until
+    run(asyncio.wait_for, owner._heartbeat(job), 2)
+    assert run(_job, job_id).locked_by == other.worker_id
+
+
+async def _finished_job(age_days: int) -> int:
+    updated_at = datetime.datetime.utcnow() - datetime.timedelta(days=age_days)
+    async with primary_session() as session:
+        job = Job(kind="test_sleep", payload={}, status="succeeded", updated_at=updated_at)
+        session.add(job)
+        await session.commit()
+        return job.id
+
+
+def test_purge_jobs_deletes_only_old_finished_jobs(run, queue):
+    old, recent = run(_finished_job, 30), run(_finished_job, 1)
+    running = run(_enqueue, {"seconds": 0})
+
+    result = run(purge_jobs, {"days": 7})
+    assert result["deleted"] >= 1
+    assert run(_job, old) is None
+    assert run(_job, recent) is not None and run(_job, running) is not None
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from services import menu_search as search_module
+from services.menu_cache import MENU
+from services.menu_search import MenuSearchIndex, normalize, trigrams
+from tests.conftest import create_menu_item
+
+
+def _row(item_id, name, category="principales", description=None, available=True):
+    return {"id": item_id, "name": name, "category": category, "description": description,
+            "available": available, "price": 10.0}
+
+
+@pytest.fixture
+def index():
+    index = MenuSearchIndex()
+    index.rebuild([
+        _row(1, "Lomo Saltado", description="Res salteada con cebolla y tomate"),
+        _row(2, "Ají de Gallina", description="Pollo deshilachado en crema de ají amarillo"),
+        _row(3, "Chicha Morada", category="bebidas"),
+        _row(4, "Chicharrón de cerdo", description="Con camote frito"),
+        _row(5, "Arroz con pollo", description="Arroz verde al culantro"),
+    ])
+    return index
+
+
+def _ids(hits):
+    return [hit["id"] for hit in hits]
+
+
+def test_normalize_folds_accents_and_case():
+    assert normalize("Ají de GALLINA, ¡rico!") == ["aji", "de", "gallina", "rico"]
+    assert trigrams("ab") == {"  a", " ab", "ab "}
+    assert trigrams("ab", prefix=True) == {"  a", " ab"}
+
+
+def test_accent_folding_matches_both_ways(index):
+    assert _ids(index.search("aji de gallina"))[0] == 2
+    assert _ids(index.search("AJÍ"))[0] == 2
+    assert _ids(index.search("chicharron"))[0] == 4
+
+
+def test_typos_and_prefixes(index):
+    assert _ids(index.search("lomo saltdo"))[0] == 1
+    # La última palabra puede estar a medio escribir
+    assert set(_ids(index.search("chic"))[:2]) == {3, 4}
+    assert _ids(index.search("arroz con pol"))[0] == 5
+    assert index.search("zzzz") == []
+
+
+def test_name_outranks_description(index):
+    # "pollo" es el nombre del 5 y solo aparece en la descripción del 2
+    hits = index.search("pollo")
+    assert _ids(hits)[:2] == [5, 2]
+    assert hits[0]["score"] > hits[1]["score"]
+
+
+def test_unavailable_items_rank_below_equally_relevant(index):
+    index.apply({"type": "menu_items_updated", "items": [{"id": 3, "available": False}]})
+    # "chicha" como prefijo coincide igual con ambos nombres: el disponible va primero
+    hits = index.search("chicha")
+    assert _ids(hits)[:2] == [4, 3]
+    assert hits[0]["score"] == hits[1]["score"]
+    index.rebuild([_row(10, "Papa rellena", available=False), _row(11, "Papa rellena")])
+    assert _ids(index.search("papa rellena")) == [11, 10]
+    assert _ids(index.search("papa", available=False)) == [10]
+
+
+def test_events_update_the_index(index):
+    index.apply({"type": "menu_created", "item": _row(6, "Causa limeña", category="entradas")})
+    index.apply({"type": "menu_updated", "item": {"id": 1, "name": "Bistec", "description": "Con papas fritas"}})
+    index.apply({"type": "menu_deleted", "item_id": 3})
+    assert _ids(index.search("causa"))[0] == 6
+    assert _ids(index.search("bistec"))[0] == 1
+    assert index.search("lomo saltado") == []
+    assert 3 not in _ids(index.search("chicha morada"))
+
+    index.apply({"type": "catalog_reloaded", "resource": MENU})
+    assert index.rows is None
+
+
+def test_events_during_rebuild_are_replayed(monkeypatch):
+    index = MenuSearchIndex()
+
+    class StaleSnapshot:
+        rows = [_row(1, "Lomo saltado"), _row(2, "Tacu tacu")]
+
+    async def load():
+        # Cambios publicados mientras se lee el snapshot
+        index.apply({"type": "menu_created", "item": _row(3, "Papa a la huancaína")})
+        index.apply({"type": "menu_deleted", "item_id": 2})
+        await asyncio.sleep(0)
+        return StaleSnapshot()
+    monkeypatch.setattr(search_module, "get_menu_snapshot", load)
+
+    asyncio.run(index.ensure())
+    assert sorted(index.rows) == [1, 3]
+    assert _ids(index.search("huancaina")) == [3]
+    assert index.search("tacu") == []
+
+
+def test_search_endpoint_follows_menu_writes(client):
+    item = create_menu_item(client, name="Anticuchos de corazón", category="parrilla")
+    assert _ids(client.get("/menu/search", params={"q": "anticucho corazon"}).json())[0] == item["id"]
+
+    response = client.put(f"/menu/{item['id']}", json={"name": "Rachi a la parrilla"})
+    assert response.status_code == 200, response.text
+    assert item["id"] not in _ids(client.get("/menu/search", params={"q": "anticuchos"}).json())
+    hits = client.get("/menu/search", params={"q": "rachi"}).json()
+    assert _ids(hits)[0] == item["id"] and 0 < hits[0]["score"] <= 1
@@ -0,0 +1,32 @@
+import services.orders as order_service
+from tests.conftest import create_menu_item
+
+
+def place(client, *lines):
+    return client.post("/orders/", json={
+        "table_code": None, "guest_name": None, "guest_phone": None, "delivery_address": None,
+        "items": [{"menu_item_id": item_id, "quantity": qty, "notes": None} for item_id, qty in lines],
+    })
+
+
+def test_order_on_item_created_with_defaults(client):
+    # amount queda en su default (0): con la configuración por defecto el pedido se acepta
+    item = create_menu_item(client)
+    assert item["amount"] == 0
+    response = place(client, (item["id"], 2))
+    assert response.status_code == 200, response.text
+    assert response.json()["total"] == 20.0
+
+
+def test_enforced_stock_rejects_and_marks_sold_out(client, monkeypatch):
+    monkeypatch.setattr(order_service, "ENFORCE_STOCK", True)
+    item = create_menu_item(client, amount=3)
+
+    assert place(client, (item["id"], 4)).status_code == 409
+    assert client.get(f"/menu/{item['id']}").json()["amount"] == 3
+
+    assert place(client, (item["id"], 1), (item["id"], 2)).status_code == 200
+    after = client.get(f"/menu/{item['id']}").json()
+    assert after["amount"] == 0
+    assert after["available"] is False
+    assert place(client, (item["id"], 1)).status_code == 409
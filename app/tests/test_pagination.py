@@ -0,0 +1,86 @@
+import datetime
+
+from fastapi import Response
+from sqlalchemy import select, update
+
+from core import pagination
+from core.pagination import PageParams, paginate
+from db.session import primary_session
+from models import Order
+from tests.conftest import create_table, fetch_all
+
+
+def test_list_without_limit_uses_default_page_size(client, monkeypatch):
+    monkeypatch.setattr(pagination, "DEFAULT_PAGE_SIZE", 2)
+    for _ in range(3):
+        create_table(client)
+
+    response = client.get("/tables/")
+    assert len(response.json()) == 2
+    assert response.headers["X-Next-Cursor"]
+    # Un cliente que nunca envía `limit` llega a todas las filas siguiendo el cursor
+    assert fetch_all(client, "/tables/") == fetch_all(client, "/tables/", limit=200)
+
+
+def test_limit_above_maximum_is_rejected(client):
+    assert client.get("/orders/", params={"limit": pagination.MAX_PAGE_SIZE + 1}).status_code == 422
+
+
+def test_cursor_walks_all_pages_without_gaps(client):
+    for _ in range(5):
+        create_table(client)
+    expected = [t["id"] for t in fetch_all(client, "/tables/", limit=200)]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/tables/", params=params)
+        assert len(response.json()) <= 2
+        seen += [t["id"] for t in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == expected
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/tables/", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_cursor_keeps_rows_with_null_keys(client, run):
+    item = client.post("/menu/", json={"name": "Pan", "description": None, "price": 1.0, "category": None,
+                                       "amount": 100}).json()
+    ids = []
+    for _ in range(4):
+        order = client.post("/orders/", json={"table_code": None, "guest_name": None, "guest_phone": None,
+                                              "delivery_address": None,
+                                              "items": [{"menu_item_id": item["id"], "quantity": 1, "notes": None}]})
+        ids.append(order.json()["id"])
+
+    async def walk(descending):
+        async with primary_session() as session:
+            await session.execute(update(Order).where(Order.id.in_(ids[:2])).values(created_at=None))
+            await session.commit()
+            seen, cursor = [], None
+            while True:
+                response = Response()
+                rows = await paginate(session, select(Order).where(Order.id.in_(ids)), PageParams(limit=1, cursor=cursor),
+                                      response, keys=[Order.created_at, Order.id], descending=descending)
+                seen += [row.id for row in rows]
+                cursor = response.headers.get("X-Next-Cursor")
+                if not cursor:
+                    return seen
+
+    assert sorted(run(walk, True)) == sorted(ids)
+    assert sorted(run(walk, False)) == sorted(ids)
+    # NULL ordena como el menor valor: primero en ascendente, último en descendente
+    assert set(run(walk, False)[:2]) == set(ids[:2])
+    assert set(run(walk, True)[-2:]) == set(ids[:2])
+
+    async def restore():
+        async with primary_session() as session:
+            await session.execute(update(Order).where(Order.created_at.is_(None)).values(created_at=datetime.datetime.utcnow()))
+            await session.commit()
+    run(restore)
@@ -0,0 +1,71 @@
+import asyncio
+import os
+import tempfile
+
+from core import pubsub
+from core.pubsub import PubSub, UnixSocketBackend, hub
+from services.kitchen import kitchen_queue
+from services.menu_cache import MENU, menu_cache
+from services.menu_sync import delta_log
+from tests.test_orders import place
+from tests.conftest import create_menu_item
+
+
+async def _until(predicate, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timeout"
+        await asyncio.sleep(0.01)
+
+
+def _worker(path):
+    worker = PubSub(UnixSocketBackend(path))
+    worker.received = []
+    worker.subscribe("events", worker.received.append)
+    return worker
+
+
+def test_broker_failover_resyncs_every_worker(monkeypatch):
+    monkeypatch.setattr(pubsub, "PUBSUB_RECONNECT_DELAY", 0.05)
+    path = os.path.join(tempfile.mkdtemp(prefix="restaurant-pubsub-"), "hub.sock")
+
+    async def scenario():
+        first, second = _worker(path), _worker(path)
+        await first.start()
+        await _until(lambda: first.resyncs == 1)
+        await second.start()
+        await _until(lambda: second.resyncs == 1)
+        assert first.backend._server is not None  # el primero aloja el broker
+
+        second.publish("events", "hola", local=False)
+        await _until(lambda: first.received == ["hola"])
+
+        # Cae el worker del broker: el otro toma el lock, lo aloja y resincroniza
+        await first.stop()
+        await _until(lambda: second.resyncs == 2)
+        assert second.backend._server is not None
+
+        third = _worker(path)
+        await third.start()
+        await _until(lambda: third.resyncs == 1)
+        third.publish("events", "de nuevo", local=False)
+        await _until(lambda: second.received == ["de nuevo"])
+        await third.stop()
+        await second.stop()
+
+    asyncio.run(scenario())
+
+
+def test_resync_drops_caches_and_reloads_kitchen(client, run):
+    item = create_menu_item(client, category="parrilla")
+    order = place(client, (item["id"], 1)).json()
+    client.get("/menu/")
+    assert menu_cache.peek(MENU) is not None
+
+    # Estado perdido mientras el worker estaba desconectado
+    kitchen_queue.clear()
+    run(hub.resync)
+
+    assert menu_cache.peek(MENU) is None
+    assert delta_log.since(delta_log.version - 1)[0]["type"] == "catalog_reloaded"
+    assert order["id"] in {row["order_id"] for row in kitchen_queue.stations["parrilla"].values()}
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import db.session
+from db.base import Base
+from services.menu_cache import MENU, SnapshotCache, menu_cache
+from services.menu_search import menu_search
+from tests.conftest import create_menu_item
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def stale_replica(run, monkeypatch):
+    """Réplica con el esquema pero sin datos: lo que se lea de ella está "atrasado"."""
+    path = os.path.join(tempfile.mkdtemp(prefix="restaurant-replica-"), "replica.db")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    async def create_schema():
+        async with replica.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    run(create_schema)
+    monkeypatch.setattr(db.session, "replica_engine", replica)
+    menu_cache._invalidate_local()
+    menu_search.rows = None
+    yield replica
+    menu_cache._invalidate_local()
+    menu_search.rows = None
+    run(replica.dispose)
+
+
+def test_cache_loader_gets_a_primary_session(run):
+    cache = SnapshotCache()
+    pinned = []
+
+    async def loader(session):
+        pinned.append(session.sync_session.info.get("primary"))
+        return []
+    run(cache.get, "test", loader)
+    assert pinned == [True]
+
+
+def test_get_requests_fill_caches_from_the_primary(client, stale_replica):
+    item = create_menu_item(client, name="Tiradito de pescado")
+    menu_cache._invalidate_local(MENU)
+    menu_search.rows = None
+
+    # Un GET usa la réplica para sus lecturas, pero el snapshot se carga del primario
+    response = client.get("/menu/")
+    assert item["id"] in [row["id"] for row in response.json()]
+    hits = client.get("/menu/search", params={"q": "tiradito"}).json()
+    assert [hit["id"] for hit in hits] == [item["id"]]
+
+
+def test_session_module_imports_first():
+    # db.session importa db.base; importarlo antes no debe fallar por el ciclo
+    env = {**os.environ, "DB_SCHEMA_MODE": "off"}
+    result = subprocess.run([sys.executable, "-c", "import db.session, db.base; db.base.get_db"],
+                            cwd=APP_DIR, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,131 @@
+import asyncio
+import datetime
+
+from sqlalchemy import update
+from sqlalchemy.future import select
+
+import services.orders as order_service
+from db.session import primary_session
+from models.order import Order
+from models.report import SalesHourly
+from services import reports
+from tests.conftest import create_menu_item
+from tests.test_orders import place
+from tests.test_security import register
+
+DAY = datetime.datetime(2001, 1, 1)
+
+
+def _order_at(client, run, item, quantity, created_at) -> int:
+    """Pedido con fecha fija (horas aisladas del resto de tests), aún sin pagar."""
+    response = place(client, (item["id"], quantity))
+    assert response.status_code == 200, response.text
+    order_id = response.json()["id"]
+
+    async def backdate():
+        async with primary_session() as session:
+            await session.execute(update(Order).where(Order.id == order_id).values(created_at=created_at))
+            await session.commit()
+    run(backdate)
+    return order_id
+
+
+def _pay(client, order_id):
+    response = client.patch(f"/orders/{order_id}/status", json={"status": "paid"})
+    assert response.status_code == 200, response.text
+
+
+def _hourly(run, start, stop):
+    async def read():
+        async with primary_session() as session:
+            result = await session.execute(
+                select(SalesHourly.bucket, SalesHourly.orders, SalesHourly.revenue)
+                .where(SalesHourly.bucket >= start, SalesHourly.bucket < stop)
+                .order_by(SalesHourly.bucket)
+            )
+            return [tuple(row) for row in result]
+    return run(read)
+
+
+def test_rebuild_by_windows_matches_incremental(client, run):
+    item = create_menu_item(client, price=5.0)
+    start, stop = DAY, DAY + datetime.timedelta(days=2)
+    for quantity, created_at in ((1, DAY.replace(hour=10, minute=5)), (2, DAY.replace(hour=11, minute=40)),
+                                 (3, DAY + datetime.timedelta(days=1, hours=9))):
+        _pay(client, _order_at(client, run, item, quantity, created_at))
+    incremental = _hourly(run, start, stop)
+    assert [(b.hour, o, r) for b, o, r in incremental] == [(10, 1, 5.0), (11, 1, 10.0), (9, 1, 15.0)]
+
+    # Agregado huérfano (p. ej. un pedido borrado): la reconstrucción lo elimina
+    async def stale():
+        async with primary_session() as session:
+            session.add(SalesHourly(bucket=DAY.replace(hour=12), table_id=0, orders=7, revenue=70.0))
+            await session.commit()
+    run(stale)
+
+    assert run(reports.rebuild_rollups, start, stop, 1, 5) == {"orders": 3}
+    assert _hourly(run, start, stop) == incremental
+
+
+def test_payment_during_rebuild_is_counted_once(client, run):
+    item = create_menu_item(client, price=4.0)
+    hour = DAY + datetime.timedelta(days=5, hours=20)
+    _pay(client, _order_at(client, run, item, 1, hour))
+    late = _order_at(client, run, item, 2, hour + datetime.timedelta(minutes=30))
+
+    async def scenario():
+        async with primary_session() as rebuild:
+            await reports._rebuild_window(rebuild, hour, hour + datetime.timedelta(hours=1), 1000)
+
+            async def pay():
+                async with primary_session() as session:
+                    await order_service.set_status(session, late, "paid")
+            payment = asyncio.create_task(pay())
+            await asyncio.sleep(0.3)
+            # El pago espera a que la ventana termine de reconstruirse
+            blocked = not payment.done()
+            await rebuild.commit()
+        await payment
+        return blocked
+
+    assert run(scenario)
+    assert _hourly(run, hour, hour + datetime.timedelta(hours=1)) == [(hour, 2, 12.0)]
+
+
+def test_increments_and_rebuild_share_the_rollup_lock(client, run, monkeypatch):
+    # En SQLite el bloqueo real es el de la base; aquí se comprueba qué pide cada camino
+    taken = []
+    original = reports.lock_rollups
+
+    async def spy(db, exclusive=False):
+        taken.append(exclusive)
+        await original(db, exclusive)
+    monkeypatch.setattr(reports, "lock_rollups", spy)
+
+    item = create_menu_item(client)
+    hour = DAY + datetime.timedelta(days=9, hours=13)
+    _pay(client, _order_at(client, run, item, 1, hour))
+    assert taken == [False]
+    run(reports.rebuild_rollups, hour, hour + datetime.timedelta(hours=3), 1000, 1)
+    assert taken == [False, True, True, True]
+
+
+def test_sales_series_groups_by_local_day(client, run):
+    item = create_menu_item(client, price=3.0)
+    # America/Lima = UTC-5: 15:00Z y 01:00Z del día siguiente son las 10:00 y las 20:00 del 9 de febrero
+    local_day = datetime.datetime(2001, 2, 9)
+    for created_at in (local_day.replace(hour=15), local_day + datetime.timedelta(days=1, hours=1)):
+        _pay(client, _order_at(client, run, item, 1, created_at))
+    headers = {"Authorization": f"Bearer {register(client, role_id=1)}"}
+
+    def sales(**params):
+        response = client.get("/reports/sales", headers=headers, params=params)
+        assert response.status_code == 200, response.text
+        return [(row["bucket"], row["orders"]) for row in response.json()]
+
+    day = [("2001-02-09T00:00:00", 2)]
+    assert sales(date_from="2001-02-09T00:00:00", date_to="2001-02-10T00:00:00", group="day") == day
+    assert sales(date_from="2001-02-09T05:00:00Z", date_to="2001-02-10T05:00:00Z", group="day") == day
+    assert sales(date_from="2001-02-09T00:00:00", date_to="2001-02-10T00:00:00") == [
+        ("2001-02-09T10:00:00", 1), ("2001-02-09T20:00:00", 1),
+    ]
@@ -0,0 +1,111 @@
+import datetime
+import json
+import time
+
+from core.timezone import local_now
+from services.reservation_scheduler import reservation_scheduler
+from tests.conftest import create_reservation, create_table, fetch_all
+from tests.test_security import register
+
+
+def _free(client, table_id, **params):
+    response = client.get("/reservations/availability", params=params)
+    assert response.status_code == 200, response.text
+    (table,) = [t for t in response.json() if t["table_id"] == table_id]
+    return [(slot["start_at"], slot["end_at"]) for slot in table["free"]]
+
+
+def test_availability_converts_aware_window_to_local_time(client):
+    table = create_table(client)
+    create_reservation(client, table["id"], "2030-01-01T20:00:00", "2030-01-01T21:00:00")
+
+    expected = [("2030-01-01T19:00:00", "2030-01-01T20:00:00"), ("2030-01-01T21:00:00", "2030-01-01T22:00:00")]
+    # America/Lima = UTC-5: 00:00Z del día siguiente son las 19:00 locales
+    assert _free(client, table["id"], window_start="2030-01-02T00:00:00Z", window_end="2030-01-02T03:00:00Z") == expected
+    assert _free(client, table["id"], window_start="2030-01-01T19:00:00-05:00",
+                 window_end="2030-01-01T22:00:00-05:00") == expected
+    assert _free(client, table["id"], window_start="2030-01-01T19:00:00", window_end="2030-01-01T22:00:00") == expected
+
+
+def test_aware_reservation_is_stored_in_local_time_and_conflicts(client):
+    table = create_table(client)
+    create_reservation(client, table["id"], "2030-02-01T20:00:00", "2030-02-01T21:00:00")
+
+    # 20:30-21:30 locales expresadas en UTC
+    response = client.post("/reservations/", json={
+        "table_id": table["id"], "start_at": "2030-02-02T01:30:00Z", "end_at": "2030-02-02T02:30:00Z",
+    })
+    assert response.status_code == 409
+
+    created = create_reservation(client, table["id"], "2030-02-02T02:00:00Z", "2030-02-02T03:00:00Z")
+    assert created["start_at"] == "2030-02-01T21:00:00"
+    assert created["end_at"] == "2030-02-01T22:00:00"
+
+
+def test_list_and_export_convert_aware_filters_to_local_time(client):
+    table = create_table(client)
+    created = create_reservation(client, table["id"], "2030-03-01T20:00:00", "2030-03-01T21:00:00")
+
+    # 00:00Z-03:00Z del 2 de marzo = 19:00-22:00 en Lima
+    window = {"window_start": "2030-03-02T00:00:00Z", "window_end": "2030-03-02T03:00:00Z"}
+    rows = fetch_all(client, "/reservations/", table_id=table["id"], **window)
+    assert [r["id"] for r in rows] == [created["id"]]
+    assert fetch_all(client, "/reservations/", table_id=table["id"], window_start="2030-03-02T02:00:00Z") == []
+
+    headers = {"Authorization": f"Bearer {register(client, role_id=1)}"}
+    response = client.get("/reservations/export", headers=headers, params={
+        "format": "ndjson", "date_from": "2030-03-02T00:00:00Z", "date_to": "2030-03-02T03:00:00Z",
+    })
+    assert response.status_code == 200, response.text
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [created["id"]]
+
+
+def _status(client, reservation_id):
+    (row,) = [r for r in fetch_all(client, "/reservations/", limit=200) if r["id"] == reservation_id]
+    return row["status"]
+
+
+def test_default_deadline_keeps_local_time(client):
+    table = create_table(client)
+    created = create_reservation(client, table["id"], "2030-03-01T20:00:00", "2030-03-01T21:00:00")
+    assert created["auto_cancel_at"] == "2030-03-01T20:15:00"
+
+
+def test_sweep_is_opt_in(client, run):
+    assert not reservation_scheduler.enabled
+    run(reservation_scheduler.start)
+    assert reservation_scheduler._task is None
+
+
+def test_sweep_releases_pending_but_not_checked_in(client, run, monkeypatch):
+    monkeypatch.setattr(reservation_scheduler, "enabled", True)
+    past = (local_now() - datetime.timedelta(minutes=1)).isoformat(timespec="seconds")
+    table = create_table(client)
+    pending = create_reservation(client, table["id"], "2030-04-01T20:00:00", "2030-04-01T21:00:00",
+                                 auto_cancel_at=past)
+    seated = create_reservation(client, table["id"], "2030-04-01T21:00:00", "2030-04-01T22:00:00",
+                                auto_cancel_at=past)
+    response = client.patch(f"/reservations/{seated['id']}/status", json={"status": "seated"})
+    assert response.status_code == 200, response.text
+    assert seated["id"] not in reservation_scheduler._deadlines
+    assert pending["id"] in reservation_scheduler._deadlines
+
+    run(reservation_scheduler.start)
+    try:
+        deadline = time.monotonic() + 5
+        while _status(client, pending["id"]) != "no_show" and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        run(reservation_scheduler.stop)
+
+    assert _status(client, pending["id"]) == "no_show"
+    assert _status(client, seated["id"]) == "seated"
+    # Aunque el heap lo dispare, el UPDATE condicional no toca reservas que ya no están pending
+    assert run(reservation_scheduler.release, [seated["id"]], local_now()) == 0
+
+
+def test_status_rejects_unknown_values(client):
+    table = create_table(client)
+    created = create_reservation(client, table["id"], "2030-05-01T20:00:00", "2030-05-01T21:00:00")
+    response = client.patch(f"/reservations/{created['id']}/status", json={"status": "gone"})
+    assert response.status_code == 422
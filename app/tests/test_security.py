@@ -0,0 +1,47 @@
+import pytest
+from fastapi import HTTPException
+
+import core.security as security
+from core.principal_cache import Principal
+from core.security import create_access_token, get_current_user
+from db.session import primary_session
+from tests.conftest import next_id
+
+
+def register(client, role_id=1) -> str:
+    n = next_id()
+    response = client.post("/auth/register", json={"dni": f"dni{n}", "full_name": "Test", "email": f"u{n}@example.com",
+                                                   "phone": "000", "password": "secret123", "role_id": role_id})
+    assert response.status_code == 200, response.text
+    return response.json()["access_token"]
+
+
+@pytest.mark.parametrize("mode", ["db", "cached", "stateless"])
+def test_current_user_is_always_a_principal(client, run, monkeypatch, mode):
+    monkeypatch.setattr(security, "AUTH_MODE", mode)
+    token = register(client, role_id=2)
+
+    async def resolve():
+        async with primary_session() as session:
+            return await get_current_user(token, session)
+    principal = run(resolve)
+    assert isinstance(principal, Principal)
+    assert principal.role_id == 2
+
+
+def test_unknown_user_is_rejected(client, run, monkeypatch):
+    monkeypatch.setattr(security, "AUTH_MODE", "db")
+    token = create_access_token({"user_id": 10 ** 9, "role": 1})
+
+    async def resolve():
+        async with primary_session() as session:
+            return await get_current_user(token, session)
+    with pytest.raises(HTTPException) as exc:
+        run(resolve)
+    assert exc.value.status_code == 401
+
+
+def test_user_routes_work_with_principal(client):
+    token = register(client, role_id=1)
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/user/", headers=headers).status_code == 200
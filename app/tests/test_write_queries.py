@@ -0,0 +1,92 @@
+import contextlib
+import re
+
+import pytest
+from sqlalchemy import event
+
+from core.sql_profiler import current_profile
+from db.base import engine
+from tests.conftest import create_menu_item, create_table, next_id
+
+_COMMANDS = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE)\b", re.I)
+
+
+@pytest.fixture
+def statements():
+    """Sentencias SQL (verbo y tabla) de los requests hechos dentro del bloque `capture()`.
+
+    Solo cuentan las que corren con perfil de request (SQLProfilerMiddleware),
+    no las del dispatcher de jobs u otras tareas de fondo.
+    """
+    seen = []
+    active = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        match = _COMMANDS.match(statement)
+        if active and match and current_profile() is not None:
+            table = re.search(r"\b(?:FROM|INTO|UPDATE)\s+(\w+)", statement, re.I)
+            seen.append(f"{match.group(1).upper()} {table.group(1) if table else '?'}")
+
+    @contextlib.contextmanager
+    def capture():
+        seen.clear()
+        active.append(True)
+        try:
+            yield seen
+        finally:
+            active.clear()
+
+    event.listen(engine.sync_engine, "before_cursor_execute", listener)
+    yield capture
+    event.remove(engine.sync_engine, "before_cursor_execute", listener)
+
+
+def test_create_returns_defaults_with_a_single_insert(client, statements):
+    with statements() as seen:
+        response = client.post("/menu/", json={"name": "Causa", "description": None, "price": 12.0,
+                                               "category": "entradas"})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["amount"], body["available"]) == (0, True)
+    assert seen == ["INSERT menu_items"]
+
+    table = create_table(client)
+    with statements() as seen:
+        response = client.post("/reservations/", json={
+            "table_id": table["id"], "start_at": "2031-01-01T20:00:00", "end_at": "2031-01-01T21:00:00",
+        })
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "pending"
+    assert seen == ["SELECT tables", "SELECT reservations", "INSERT reservations"]
+
+
+def test_update_reuses_loaded_row(client, statements):
+    item = create_menu_item(client)
+    with statements() as seen:
+        response = client.put(f"/menu/{item['id']}", json={"price": 15.5})
+    assert response.status_code == 200, response.text
+    assert response.json()["price"] == 15.5
+    assert response.json()["available"] is True
+    assert seen == ["SELECT menu_items", "UPDATE menu_items"]
+
+    table_id = next_id()
+    client.post("/tables/", json={"id": table_id, "code": f"T{table_id}", "seats": 2, "location": None, "active": True})
+    with statements() as seen:
+        response = client.put(f"/tables/{table_id}", json={"id": table_id, "code": f"T{table_id}", "seats": 6,
+                                                          "location": "terraza", "active": True})
+    assert response.status_code == 200, response.text
+    assert response.json()["seats"] == 6
+    assert seen == ["SELECT tables", "UPDATE tables"]
+
+
+def test_order_response_has_generated_columns(client, statements):
+    item = create_menu_item(client, price=3.0)
+    with statements() as seen:
+        response = client.post("/orders/", json={
+            "table_code": None, "guest_name": None, "guest_phone": None, "delivery_address": None,
+            "items": [{"menu_item_id": item["id"], "quantity": 2, "notes": None}],
+        })
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["status"], body["total"]) == ("pending", 6.0)
+    assert "SELECT orders" not in seen
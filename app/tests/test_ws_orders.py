@@ -0,0 +1,88 @@
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from core.security import create_access_token
+from tests.conftest import create_menu_item
+from tests.test_orders import place
+
+
+def _url(role=None, topics=""):
+    token = create_access_token({"user_id": 1, "role": role}) if role else None
+    params = [f"token={token}"] if token else []
+    if topics:
+        params.append(f"topics={topics}")
+    return "/ws/orders" + ("?" + "&".join(params) if params else "")
+
+
+def _subscribe(ws, *topics):
+    ws.send_json({"action": "subscribe", "topics": list(topics)})
+    reply = ws.receive_json()
+    assert reply["type"] == "subscribed", reply
+    return reply
+
+
+def _order(client) -> int:
+    response = place(client, (create_menu_item(client)["id"], 1))
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def test_handshake_without_token_is_rejected(client):
+    for url in ("/ws/orders", "/ws/orders?topics=all", "/ws/orders?token=basura"):
+        with pytest.raises(WebSocketDisconnect) as exc:
+            with client.websocket_connect(url) as ws:
+                ws.receive_json()
+        assert exc.value.code == 4401
+
+
+def test_customer_is_denied_staff_topics(client):
+    with client.websocket_connect(_url(role=5)) as ws:
+        reply = _subscribe(ws, "all", "station:parrilla", "role:cocina", "table:3", "order:7", "nada")
+        assert reply["denied"] == ["all", "station:parrilla", "role:cocina", "nada"]
+        assert reply["topics"] == ["order:7", "role:cliente", "table:3"]
+
+
+def test_staff_may_subscribe_to_all_and_stations(client):
+    with client.websocket_connect(_url(role=3)) as ws:
+        reply = _subscribe(ws, "all", "station:parrilla", "role:mozo")
+        assert reply["denied"] == ["role:mozo"]
+        assert {"all", "station:parrilla", "role:cocina"} <= set(reply["topics"])
+
+
+def test_role_targeted_events_only_reach_that_role(client):
+    with client.websocket_connect(_url(role=3)) as kitchen, \
+            client.websocket_connect(_url(role=5, topics="order:999999")) as customer:
+        _subscribe(kitchen)
+        _subscribe(customer)
+        order_id = _order(client)
+
+        created = kitchen.receive_json()
+        assert created["type"] == "order_created" and created["order_id"] == order_id
+        # Lo siguiente en la cola del cliente es la respuesta a su suscripción: el evento no llegó
+        assert _subscribe(customer)["topics"] == ["order:999999", "role:cliente"]
+
+
+def test_order_topic_filters_status_updates(client):
+    first, second = _order(client), _order(client)
+    with client.websocket_connect(_url(role=5, topics=f"order:{first}")) as watcher:
+        _subscribe(watcher)
+        for order_id in (second, first):
+            response = client.patch(f"/orders/{order_id}/status", json={"status": "in_progress"})
+            assert response.status_code == 200, response.text
+
+        event = watcher.receive_json()
+        assert event["type"] == "order_status" and event["order_id"] == first
+        _subscribe(watcher)
+
+
+def test_customer_messages_are_not_published(client):
+    with client.websocket_connect(_url(role=2, topics="order:424242")) as waiter, \
+            client.websocket_connect(_url(role=5, topics="order:424242")) as customer:
+        _subscribe(waiter)
+        _subscribe(customer)
+        customer.send_json({"order_id": 424242, "status": "ready"})
+        _subscribe(customer)  # el socket procesa en orden: su mensaje ya se atendió
+        assert _subscribe(waiter)["topics"] == ["order:424242", "role:mozo"]
+
+        waiter.send_json({"order_id": 424242, "status": "ready"})
+        assert customer.receive_json() == {"order_id": 424242, "status": "ready"}
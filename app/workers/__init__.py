@@ -0,0 +1,3 @@
+# Jobs en segundo plano sin broker externo: la cola es la tabla `jobs`.
+from workers.jobs import TASKS, enqueue, job_runner, task
+from workers import tasks  # registra los tipos de job
@@ -0,0 +1,309 @@
+import asyncio
+import datetime
+import logging
+import os
+import random
+import socket
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import or_, and_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from core.metrics import registry
+from db.session import primary_session
+from models.job import Job
+
+# Jobs ejecutándose a la vez en cada worker
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "4"))
+# Procesos para jobs CPU-bound (cpu=True)
+JOB_PROCESSES = int(os.getenv("JOB_PROCESSES", "2"))
+# Cada cuánto revisa la tabla si nadie lo despierta (jobs de otros workers, reintentos)
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# Backoff exponencial: base * 2^(intento-1), con tope
+JOB_BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", "5"))
+JOB_BACKOFF_MAX = float(os.getenv("JOB_BACKOFF_MAX", "600"))
+# Un job "running" cuyo lease venció (worker caído) vuelve a ser reclamable
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "600"))
+# Mientras el job corre, su worker renueva el lease cada N segundos
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", str(JOB_LEASE_SECONDS / 3)))
+
+logger = logging.getLogger("jobs")
+
+jobs_total = registry.counter("jobs_total", "Jobs terminados por tipo y resultado", ["kind", "status"])
+job_seconds = registry.histogram("job_seconds", "Duración de los jobs", ["kind"])
+
+
+def utcnow() -> datetime.datetime:
+    return datetime.datetime.utcnow()
+
+
+class TaskSpec:
+    __slots__ = ("name", "fn", "cpu", "max_attempts")
+
+    def __init__(self, name: str, fn: Callable, cpu: bool, max_attempts: int):
+        self.name = name
+        self.fn = fn
+        self.cpu = cpu
+        self.max_attempts = max_attempts
+
+
+TASKS: Dict[str, TaskSpec] = {}
+
+
+def task(name: Optional[str] = None, cpu: bool = False, max_attempts: int = JOB_MAX_ATTEMPTS):
+    """Registra una función como tipo de job.
+
+    La función recibe el `payload` (dict) y devuelve un resultado serializable a JSON.
+    - `async def`: corre en el event loop (I/O, DB con su propia sesión).
+    - `def` con `cpu=True`: corre en el pool de procesos (debe ser una función de módulo).
+    - `def` sin `cpu`: corre en un hilo.
+    """
+    def decorator(fn):
+        TASKS[name or fn.__name__] = TaskSpec(name or fn.__name__, fn, cpu, max_attempts)
+        return fn
+    return decorator
+
+
+def lease_until(now: datetime.datetime) -> datetime.datetime:
+    """Fin del lease redondeado hacia arriba al segundo: se compara por igualdad
+    y DATETIME sin fracción (MySQL) no guarda microsegundos."""
+    lease = now + datetime.timedelta(seconds=JOB_LEASE_SECONDS)
+    if lease.microsecond:
+        lease = lease.replace(microsecond=0) + datetime.timedelta(seconds=1)
+    return lease
+
+
+def backoff(attempts: int) -> float:
+    delay = min(JOB_BACKOFF_MAX, JOB_BACKOFF_BASE * 2 ** (attempts - 1))
+    return delay + random.uniform(0, delay / 10)
+
+
+def _claimable(now: datetime.datetime):
+    return or_(
+        and_(Job.status == "queued", Job.run_after <= now),
+        and_(Job.status == "running", Job.locked_until < now),
+    )
+
+
+async def enqueue(
+    db: AsyncSession,
+    kind: str,
+    payload: Optional[dict] = None,
+    max_attempts: Optional[int] = None,
+    delay: float = 0,
+) -> Job:
+    """Guarda el job y despierta al dispatcher; el handler puede responder de inmediato."""
+    spec = TASKS.get(kind)
+    if spec is None:
+        raise ValueError(f"Unknown job kind: {kind}")
+    now = utcnow()
+    job = Job(
+        kind=kind,
+        payload=payload or {},
+        status="queued",
+        attempts=0,
+        max_attempts=max_attempts or spec.max_attempts,
+        run_after=now + datetime.timedelta(seconds=delay),
+        created_at=now,
+        updated_at=now,
+    )
+    db.add(job)
+    await db.commit()
+    job_runner.notify()
+    return job
+
+
+class JobRunner:
+    """Dispatcher asyncio: reclama jobs de la tabla `jobs` y los ejecuta.
+
+    Reclamar es un UPDATE condicional (`WHERE status = 'queued'`), así que
+    varios workers pueden compartir la tabla sin ejecutar dos veces un job.
+    El lease (`locked_by`, `locked_until`) se renueva mientras el job corre y
+    el resultado solo se guarda si el lease sigue siendo de este worker.
+    """
+
+    def __init__(self, concurrency: int = JOB_CONCURRENCY):
+        self.concurrency = concurrency
+        self.worker_id = f"{socket.gethostname()[:40]}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._leases: Dict[int, datetime.datetime] = {}  # job_id -> locked_until vigente
+        self._running: Set[asyncio.Task] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: no hereda el event loop ni las conexiones del worker
+            self._pool = ProcessPoolExecutor(JOB_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    async def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        # Los jobs interrumpidos se reintentan cuando vence su lease
+        for task in [self._task, *self._running]:
+            task.cancel()
+        await asyncio.gather(self._task, *self._running, return_exceptions=True)
+        self._task = None
+        self._wakeup = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            free = self.concurrency - len(self._running)
+            claimed = []
+            if free > 0:
+                try:
+                    claimed = await self._claim(free)
+                except Exception:
+                    logger.exception("jobs: no se pudo leer la cola")
+                for job in claimed:
+                    task = asyncio.create_task(self._execute(job))
+                    self._running.add(task)
+                    task.add_done_callback(self._done)
+            if free > 0 and len(claimed) == free:
+                continue  # puede haber más pendientes
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def _done(self, task: asyncio.Task):
+        self._running.discard(task)
+        self.notify()
+
+    async def _claim(self, limit: int) -> List[Any]:
+        now = utcnow()
+        lease = lease_until(now)
+        async with primary_session() as session:
+            result = await session.execute(
+                select(Job.id).where(_claimable(now)).order_by(Job.run_after, Job.id).limit(limit)
+            )
+            claimed = []
+            for job_id in result.scalars().all():
+                result = await session.execute(
+                    update(Job)
+                    .where(Job.id == job_id, _claimable(now))
+                    .values(
+                        status="running",
+                        attempts=Job.attempts + 1,
+                        locked_by=self.worker_id,
+                        locked_until=lease,
+                        updated_at=now,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount:
+                    claimed.append(job_id)
+            await session.commit()
+            if not claimed:
+                return []
+            for job_id in claimed:
+                self._leases[job_id] = lease
+            result = await session.execute(
+                select(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts).where(Job.id.in_(claimed))
+            )
+            return result.all()
+
+    async def _execute(self, job):
+        spec = TASKS.get(job.kind)
+        if spec is None:
+            await self._finish(job, "failed", error=f"Unknown job kind: {job.kind}")
+            return
+        payload = job.payload or {}
+        try:
+            with job_seconds.time(job.kind):
+                result = await self._call(job, spec, payload)
+        except asyncio.CancelledError:
+            self._leases.pop(job.id, None)
+            raise
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            if job.attempts < job.max_attempts:
+                logger.warning("jobs: %s #%s falló (intento %s), se reintenta: %s", job.kind, job.id, job.attempts, error)
+                run_after = utcnow() + datetime.timedelta(seconds=backoff(job.attempts))
+                await self._finish(job, "queued", error=error, run_after=run_after)
+            else:
+                logger.error("jobs: %s #%s falló definitivamente: %s", job.kind, job.id, error)
+                await self._finish(job, "failed", error=error)
+            return
+        await self._finish(job, "succeeded", result=result, error=None)
+
+    async def _call(self, job, spec: TaskSpec, payload: dict):
+        """Ejecuta la función renovando el lease mientras dura."""
+        loop = asyncio.get_running_loop()
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            if spec.cpu:
+                return await loop.run_in_executor(self._process_pool(), spec.fn, payload)
+            if asyncio.iscoroutinefunction(spec.fn):
+                return await spec.fn(payload)
+            return await loop.run_in_executor(None, spec.fn, payload)
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+    async def _heartbeat(self, job):
+        """Extiende `locked_until` mientras el lease siga siendo nuestro.
+
+        Si otro worker lo reclamó (p. ej. tras una pausa larga) deja de
+        renovarlo; `_finish` descartará el resultado.
+        """
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+            lease = self._leases.get(job.id)
+            renewed = lease_until(utcnow())
+            try:
+                async with primary_session() as session:
+                    result = await session.execute(
+                        update(Job)
+                        .where(Job.id == job.id, Job.locked_by == self.worker_id, Job.locked_until == lease)
+                        .values(locked_until=renewed)
+                        .execution_options(synchronize_session=False)
+                    )
+                    await session.commit()
+            except Exception:
+                logger.exception("jobs: no se pudo renovar el lease de %s #%s", job.kind, job.id)
+                continue
+            if not result.rowcount:
+                logger.warning("jobs: %s #%s perdió el lease", job.kind, job.id)
+                return
+            self._leases[job.id] = renewed
+
+    async def _finish(self, job, status: str, **values):
+        """Guarda el resultado solo si el job sigue bajo nuestro lease."""
+        lease = self._leases.pop(job.id, None)
+        async with primary_session() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.id == job.id, Job.locked_by == self.worker_id, Job.locked_until == lease)
+                .values(status=status, locked_by=None, locked_until=None, updated_at=utcnow(), **values)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        if not result.rowcount:
+            logger.warning("jobs: %s #%s perdió el lease, se descarta el resultado (%s)", job.kind, job.id, status)
+            return
+        if status == "queued":
+            self.notify()
+        else:
+            jobs_total.inc(1, job.kind, status)
+
+
+job_runner = JobRunner()
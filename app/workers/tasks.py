@@ -0,0 +1,34 @@
+import datetime
+import os
+
+from sqlalchemy import delete
+from db.session import primary_session
+from models.job import Job
+from services.reports import rebuild_rollups
+from workers.jobs import task
+
+# Días que se conservan los jobs terminados
+JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "7"))
+
+
+@task("purge_jobs")
+async def purge_jobs(payload: dict) -> dict:
+    """Borra los jobs terminados más antiguos que `days` (default JOB_RETENTION_DAYS)."""
+    days = int(payload.get("days", JOB_RETENTION_DAYS))
+    before = datetime.datetime.utcnow() - datetime.timedelta(days=days)
+    async with primary_session() as session:
+        result = await session.execute(
+            delete(Job).where(Job.status.in_(("succeeded", "failed")), Job.updated_at < before)
+        )
+        await session.commit()
+    return {"deleted": result.rowcount}
+
+
+def _parse_datetime(value):
+    return datetime.datetime.fromisoformat(value) if value else None
+
+
+@task("rebuild_sales_rollups", max_attempts=1)
+async def rebuild_sales_rollups(payload: dict) -> dict:
+    """Recalcula los agregados de ventas (services/reports.py) en lotes."""
+    return await rebuild_rollups(_parse_datetime(payload.get("date_from")), _parse_datetime(payload.get("date_to")))